@@ -0,0 +1,112 @@
+# 启动基准测试
+# 以 `python -X importtime main.py` 冷启动界面，测量从启动进程到首帧显示的时间，并汇总导入耗时最多的模块。
+# 中位数超过预算时以退出码 1 结束（无法启动时为 2），可直接放进 CI 或打包前的检查脚本。
+#
+#   python benchmarks/startup.py                 # 首帧计时（需要图形界面）
+#   python benchmarks/startup.py --import-only   # 只计 import main 的耗时（无需图形界面）
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import STARTUP_PROBE_ENV, STARTUP_PROBE_MARKER  # noqa: E402
+
+# 冷启动到首帧的预算（秒）
+FIRST_FRAME_BUDGET = 1.5
+# import main 的预算（秒）
+IMPORT_BUDGET = 0.4
+# 单次启动的超时时间（秒）
+RUN_TIMEOUT = 30
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出，按顶层包汇总各模块自身的导入耗时，返回 {包名: 微秒}。"""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        if not self_time.strip().isdigit():
+            continue  # 表头
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_time)
+    return totals
+
+
+def run_once(import_only):
+    """冷启动一次，返回 (耗时秒, 按顶层包汇总的导入耗时)。"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    if import_only:
+        command = [sys.executable, "-X", "importtime", "-c", "import main"]
+    else:
+        command = [sys.executable, "-X", "importtime", "main.py"]
+        env[STARTUP_PROBE_ENV] = "1"
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        if import_only:
+            proc.wait(RUN_TIMEOUT)
+            elapsed = time.perf_counter() - start
+        else:
+            # 读到首帧标记即停止计时，进程随后自行关闭窗口退出
+            for line in proc.stdout:
+                if line.strip() == STARTUP_PROBE_MARKER:
+                    break
+            else:
+                proc.wait(RUN_TIMEOUT)
+                raise RuntimeError(f"界面没有显示首帧（退出码 {proc.returncode}）:\n{proc.stderr.read()[-2000:]}")
+            elapsed = time.perf_counter() - start
+        _, stderr = proc.communicate(timeout=RUN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        raise RuntimeError(f"启动超过 {RUN_TIMEOUT} 秒没有结束")
+    if proc.returncode:
+        raise RuntimeError(f"进程异常退出（退出码 {proc.returncode}）:\n{stderr[-2000:]}")
+    return elapsed, parse_importtime(stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSA 加解密器启动基准测试")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="启动次数，取中位数（默认 5）")
+    parser.add_argument("--budget", type=float, help="预算（秒），默认首帧 %.1f、仅导入 %.1f" %
+                                                    (FIRST_FRAME_BUDGET, IMPORT_BUDGET))
+    parser.add_argument("--import-only", action="store_true", help="只测量 import main，不创建窗口")
+    parser.add_argument("--top", type=int, default=10, help="显示导入最慢的前 N 个顶层包")
+    args = parser.parse_args(argv)
+    budget = args.budget or (IMPORT_BUDGET if args.import_only else FIRST_FRAME_BUDGET)
+
+    timings = []
+    imports = {}
+    for _ in range(args.runs):
+        try:
+            elapsed, totals = run_once(args.import_only)
+        except RuntimeError as exc:
+            print(f"启动失败: {exc}", file=sys.stderr)
+            return 2
+        timings.append(elapsed)
+        for package, micros in totals.items():
+            imports.setdefault(package, []).append(micros)
+
+    median = statistics.median(timings)
+    label = "import main" if args.import_only else "冷启动到首帧"
+    print(f"{label}: 中位数 {median:.3f}秒，最快 {min(timings):.3f}秒，最慢 {max(timings):.3f}秒（{args.runs} 次）")
+    print("导入耗时最多的顶层包（中位数，含子模块）:")
+    slowest = sorted(((statistics.median(values), package) for package, values in imports.items()), reverse=True)
+    for micros, package in slowest[:args.top]:
+        print(f"  {micros / 1e6:8.3f}秒  {package}")
+
+    if median > budget:
+        print(f"超出预算: {median:.3f}秒 > {budget:.3f}秒")
+        return 1
+    print(f"在预算内: {median:.3f}秒 <= {budget:.3f}秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
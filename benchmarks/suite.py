@@ -0,0 +1,256 @@
+# 性能基准测试套件
+# 不需要图形界面，直接调用 rsa_engine 中界面所用的同一批函数：
+# 各比特数的密钥生成、单条与批量加解密吞吐、PEM 读写、共模攻击、循环攻击以及其他攻击。
+# 攻击用的密钥和密文都由固定种子生成，每次运行的工作量相同，结果可以和保存的基线比较。
+# 结果以 JSON 输出；--compare 时与基线逐项比较，中位数变慢超过容差即以退出码 1 结束（运行失败为 2）。
+#
+#   python benchmarks/suite.py -o baseline.json            # 运行全部并保存为基线
+#   python benchmarks/suite.py --compare baseline.json     # 与基线比较
+#   python benchmarks/suite.py -k attack --repeat 3        # 只运行名称包含 attack 的项目
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from math import gcd
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import gmpy2  # noqa: E402
+import rsa  # noqa: E402
+
+import rsa_engine  # noqa: E402
+from rsa_engine.keys import build_keypair  # noqa: E402
+
+# 结果文件格式版本
+RESULT_VERSION = 1
+# 所有固定数据的随机种子
+FIXTURE_SEED = 20240601
+# 默认测量的密钥比特数（界面还支持更大的比特数，可用 --keygen-bits 加上）
+KEYGEN_BITS = (512, 1024, 2048)
+# 加解密使用的密钥比特数，以及批量测试的消息条数
+CIPHER_BITS = 2048
+BATCH_MESSAGES = 200
+# 默认每项重复次数，以及与基线比较时允许的变慢比例
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+
+@dataclass(frozen=True)
+class Case:
+    """一个基准项目：run 每次调用完成 items 个操作。"""
+    name: str
+    run: Callable[[], object]
+    items: int = 1
+
+
+def fixture_prime(rng: random.Random, bits: int) -> int:
+    return int(gmpy2.next_prime(rng.getrandbits(bits) | (1 << (bits - 1))))
+
+
+def fixture_keypair(rng: random.Random, bits: int):
+    """由固定种子生成的密钥对。"""
+    while True:
+        keys = build_keypair(fixture_prime(rng, bits // 2), fixture_prime(rng, bits - bits // 2))
+        if keys is not None:
+            return keys
+
+
+def fixture_small_d(rng: random.Random, bits: int, d_bits: int):
+    """私钥 d 只有 d_bits 位的模数：返回 (e, n, d)。"""
+    p, q = fixture_prime(rng, bits // 2), fixture_prime(rng, bits // 2)
+    phi_n = (p - 1) * (q - 1)
+    d = rng.getrandbits(d_bits) | (1 << (d_bits - 1)) | 1
+    while gcd(d, phi_n) != 1:
+        d += 2
+    return int(gmpy2.invert(d, phi_n)), p * q, d
+
+
+def build_cases(keygen_bits, workdir) -> List[Case]:
+    rng = random.Random(FIXTURE_SEED)
+    cases = []
+
+    # 密钥生成（与“生成密钥”按钮在密钥池为空时的单进程路径相同，素数是随机的，取多次的中位数）
+    for bits in keygen_bits:
+        cases.append(Case(f"keygen/{bits}", lambda bits=bits: rsa_engine.generate_keypair(bits)))
+
+    # 单条与批量加解密
+    pubkey, privkey = fixture_keypair(rng, CIPHER_BITS)
+    message = b"benchmark message " * 4
+    ciphertext = rsa_engine.encrypt_bytes(message, pubkey)
+    cached = rsa_engine.cached_private_key(privkey)
+    cases.append(Case("encrypt/single", lambda: rsa_engine.encrypt_bytes(message, pubkey)))
+    cases.append(Case("decrypt/single", lambda: rsa_engine.decrypt_ciphertext(ciphertext, cached)))
+    messages = [f"第 {i} 条批量消息".encode("utf-8") for i in range(BATCH_MESSAGES)]
+    lines = [str(c) + "\n" for c in rsa_engine.encrypt_messages(messages, pubkey)]
+    cases.append(Case("encrypt/batch", lambda: rsa_engine.encrypt_messages(messages, pubkey), BATCH_MESSAGES))
+    from rsa_engine.batch import decrypt_lines
+    cases.append(Case("decrypt/batch", lambda: decrypt_lines(lines, privkey), BATCH_MESSAGES))
+    large = bytes(rng.getrandbits(8) for _ in range(64 * 1024))
+    framed = rsa_engine.encrypt_bytes(large, pubkey)
+    cases.append(Case("encrypt/blocks-64k", lambda: rsa_engine.encrypt_bytes(large, pubkey)))
+    cases.append(Case("decrypt/blocks-64k", lambda: rsa_engine.decrypt_ciphertext(framed, cached)))
+
+    # 密文格式转换：64 KB 明文的分组密文编码后再解析
+    for fmt in ("hex", "base64"):
+        cases.append(Case(f"format/{fmt}-64k",
+                          lambda fmt=fmt: rsa_engine.parse_ciphertext(rsa_engine.format_ciphertext(framed, fmt))))
+
+    # PEM 读写
+    pub_pem, priv_pem = pubkey.save_pkcs1().decode(), privkey.save_pkcs1().decode()
+    pub_path, priv_path = os.path.join(workdir, "public.pem"), os.path.join(workdir, "private.pem")
+    rsa_engine.save_keys(pub_pem, priv_pem, pub_path, priv_path)
+    cases.append(Case("pem/save", lambda: rsa_engine.save_keys(pub_pem, priv_pem, pub_path, priv_path)))
+    cases.append(Case("pem/load-public", lambda: rsa_engine.load_public_key(pub_path)))
+    cases.append(Case("pem/load-private", lambda: rsa_engine.load_private_key(priv_path)))
+
+    # 共模攻击
+    m = int.from_bytes(b"common modulus fixture", "big")
+    n = pubkey.n
+    c1, c2 = pow(m, 65537, n), pow(m, 257, n)
+    cases.append(Case("attack/common-modulus", lambda: rsa_engine.common_modulus_attack(n, c1, c2, 65537, 257)))
+
+    # 循环攻击：d 很小的 48 位模数，从 first_k 一直搜索到 d
+    e, n_cycle, d = fixture_small_d(rng, 48, 9)
+    cases.append(Case("attack/cycle", lambda: rsa_engine.cycle_attack(e, n_cycle, d + 1)))
+
+    # 循环加密攻击（广义版本，序列在模 p 下先闭合）
+    n_cyclic = fixture_prime(rng, 20) * fixture_prime(rng, 20)
+    cases.append(Case("attack/cyclic", lambda: rsa_engine.cyclic_attack(n_cyclic, 65537, 12345, 1_000_000)))
+
+    # Wiener 攻击
+    e_wiener, n_wiener, _ = fixture_small_d(rng, 1024, 240)
+    cases.append(Case("attack/wiener", lambda: rsa_engine.wiener_attack(e_wiener, n_wiener)))
+
+    # Fermat 分解：|p - q| 约为 2^(bits/4)
+    p = fixture_prime(rng, 512)
+    n_fermat = p * int(gmpy2.next_prime(p + rng.getrandbits(256)))
+    cases.append(Case("attack/fermat", lambda: rsa_engine.fermat_factor(n_fermat)))
+
+    # Håstad 广播攻击（e = 3，三个 1024 位模数）
+    m = int.from_bytes(b"broadcast fixture", "big")
+    pairs = []
+    while len(pairs) < 3:
+        key, _ = fixture_keypair(rng, 1024)
+        pairs.append((key.n, pow(m, 3, key.n)))
+    cases.append(Case("attack/hastad", lambda: rsa_engine.hastad_attack(3, pairs)))
+
+    # Pollard rho 分解 80 位模数
+    n_rho = fixture_prime(rng, 40) * fixture_prime(rng, 40)
+    cases.append(Case("attack/pollard-rho", lambda: rsa_engine.pollard_rho_brent(n_rho)))
+
+    # 批量 GCD（单进程，256 个 512 位模数，其中两个共享素因子）
+    shared = fixture_prime(rng, 256)
+    moduli = [fixture_prime(rng, 256) * fixture_prime(rng, 256) for _ in range(254)]
+    moduli += [shared * fixture_prime(rng, 256), shared * fixture_prime(rng, 256)]
+    cases.append(Case("attack/batch-gcd", lambda: rsa_engine.batch_gcd(moduli, workdir=workdir), len(moduli)))
+    return cases
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    """重复运行 repeat 次（先预热一次），返回耗时统计。"""
+    case.run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    result = {"median": median, "min": min(timings), "max": max(timings), "runs": repeat, "items": case.items}
+    if case.items > 1:
+        result["per_second"] = case.items / median if median else float("inf")
+    return result
+
+
+def metadata() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "gmpy2": gmpy2.version(),
+        "rsa": rsa.__version__,
+        "seed": FIXTURE_SEED,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """逐项比较中位数，返回变慢超过容差的项目名；比较结果输出到标准错误。"""
+    regressions = []
+    print(f"{'项目':<24}{'基线':>12}{'本次':>12}{'变化':>10}", file=sys.stderr)
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<24}{'-':>12}{result['median'] * 1000:>10.3f}ms{'新增':>10}", file=sys.stderr)
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        if ratio > 1 + tolerance:
+            verdict = "变慢"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            verdict = "变快"
+        else:
+            verdict = ""
+        print(f"{name:<24}{base['median'] * 1000:>10.3f}ms{result['median'] * 1000:>10.3f}ms"
+              f"{(ratio - 1) * 100:>+9.1f}% {verdict}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSA 加解密器性能基准测试")
+    parser.add_argument("-o", "--output", help="把 JSON 结果写入文件（默认输出到标准输出）")
+    parser.add_argument("--compare", metavar="BASELINE", help="与基线 JSON 比较，变慢超过容差时退出码为 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="允许的变慢比例（默认 %.2f）" % DEFAULT_TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每项重复次数，取中位数（默认 %d）" %
+                                                                          DEFAULT_REPEAT)
+    parser.add_argument("-k", "--filter", default="", help="只运行名称包含该字符串的项目")
+    parser.add_argument("--keygen-bits", type=int, nargs="+", default=KEYGEN_BITS, help="密钥生成测量的比特数")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"无法读取基线 {args.compare}: {exc}", file=sys.stderr)
+            return 2
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="rsa-bench-") as workdir:
+        try:
+            cases = [case for case in build_cases(args.keygen_bits, workdir) if args.filter in case.name]
+            for case in cases:
+                results[case.name] = measure(case, args.repeat)
+                print(f"{case.name:<24}{results[case.name]['median'] * 1000:>10.3f}ms", file=sys.stderr)
+        except Exception as exc:
+            print(f"基准测试失败: {exc!r}", file=sys.stderr)
+            return 2
+
+    report = {"version": RESULT_VERSION, "meta": metadata(), "results": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} 个项目变慢超过 {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+        print("没有超过容差的退化", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
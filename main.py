@@ -1,32 +1,53 @@
 # 导入tkinter库，用于创建GUI
-# 导入base64库，用于编码和解码二进制数据为文本格式
-import base64
 # 文件路径操作或操作系统级别的功能
+import multiprocessing
 import os
 import sys
 import time
 import tkinter as tk
-# 从math库导入gcd函数，用于求两个数的最大公约数
-from math import e, gcd
 # 从tkinter中导入特定组件
 from tkinter import filedialog, messagebox, Toplevel, ttk
 
-# 导入rsa库，用于执行RSA加密/解密操作
-import rsa
-# 从PIL库导入Image, ImageTk, 和 ImageDraw，用于图像处理
-from PIL import Image, ImageTk
-# 从cryptography.hazmat.backends库导入default_backend，用于提供默认后端实现
-from cryptography.hazmat.backends import default_backend
-# 从cryptography.hazmat.primitives库导入serialization，用于序列化密钥
-from cryptography.hazmat.primitives import serialization
-# 从gmpy2库导入gcdext（扩展欧几里得算法）和powmod（模幂运算），用于数学计算
-from gmpy2 import gcdext
-# 从libnum库导入n2s函数，可能用于数字到字符串的转换
-from libnum import n2s
-# 从pyasn1.codec.der库导入encoder，用于将ASN.1对象编码为DER格式
-from pyasn1.codec.der import encoder as der_encoder
-# 从pyasn1.type库导入univ和namedtype，用于ASN.1结构的定义
-from pyasn1.type import univ, namedtype
+# 导入与界面无关的计算引擎，界面只负责收集输入、提交后台任务和显示结果
+# 启动时只导入主界面用到的部分；关于窗口（PIL）、攻击面板、PEM 读写和文件加密在第一次使用时才导入
+from rsa_engine import (JobRunner, KeyCache, KeyPool, check_prime_pair, ciphertext_bytes, decrypt_ciphertext,
+                        encrypt_bytes, format_ciphertext, generate_keypair_parallel, keys_from_parameters,
+                        needs_blocks, parse_ciphertext, span)
+
+# 后台任务轮询间隔（毫秒），约 60 fps
+JOB_POLL_MS = 16
+
+# 可选的模数比特数
+KEY_SIZES = (128, 256, 512, 1024, 2048, 3072, 4096, 8192)
+# 素数类型：界面显示名称 -> 引擎参数
+PRIME_KIND_LABELS = {"普通素数": "normal", "强素数": "strong", "安全素数": "safe"}
+# 密文格式：界面显示名称 -> 引擎参数（解密时自动识别格式）
+CIPHERTEXT_FORMAT_LABELS = {"十进制": "decimal", "十六进制": "hex", "Base64": "base64", "分组帧": "frame",
+                            "原始二进制": "raw"}
+# 文本框每页显示的字符数，更长的结果分页追加，避免一次插入过长的文本卡住界面
+TEXT_PAGE_CHARS = 64 * 1024
+# 密钥池：预生成的比特数（更大的密钥按需并行生成）、每种比特数保持的密钥数和低水位
+KEY_POOL_SIZES = (128, 256, 512, 1024, 2048)
+KEY_POOL_TARGET = 4
+KEY_POOL_LOW_WATER = 2
+# 密钥池默认不落盘；设置该环境变量（文件路径）后，退出时把剩余的私钥以明文写入该文件（权限 0600），下次启动时载入
+KEY_POOL_FILE_ENV = "RSA_KEY_POOL_FILE"
+# 混合加密文件的默认扩展名
+HYBRID_SUFFIX = ".rsae"
+# 循环攻击默认的 k 搜索上限和检查点文件
+CYCLE_K_BOUND = 1_000_000
+CYCLE_CHECKPOINT_FILE = "cycle_attack.json"
+# 循环加密攻击默认的迭代上限
+CYCLIC_ITERATIONS = 1_000_000
+# 分解类攻击（Fermat 等）默认的时间预算（秒）
+FACTOR_BUDGET = 10.0
+# 性能面板的刷新间隔（毫秒）
+PERFORMANCE_REFRESH_MS = 1000
+# 密钥库文件：每次保存公私钥都追加一条记录
+KEY_STORE_FILE = "keystore.dat"
+# 设置该环境变量时，首帧显示后输出标记并退出，供启动基准测试计时
+STARTUP_PROBE_ENV = "RSA_STARTUP_PROBE"
+STARTUP_PROBE_MARKER = "first-frame"
 
 
 def resource_path(relative_path):
@@ -45,50 +66,24 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-# 公钥 PEM 格式生成函数
-# region
-# 定义一个ASN.1结构体，表示RSA公钥
-class RSAPublicKey(univ.Sequence):
-    # 定义序列中包含的组件类型
-    componentType = namedtype.NamedTypes(
-        # 模数（大整数）
-        namedtype.NamedType('modulus', univ.Integer()),
-        # 公共指数
-        namedtype.NamedType('publicExponent', univ.Integer())
-    )
-
-
-def create_pem_public_key(e, n):
-    # 创建一个空的RSA公钥实例
-    rsa_pub_key = RSAPublicKey()
-
-    # 设置模数
-    rsa_pub_key.setComponentByName('modulus', n)
-
-    # 设置公共指数
-    rsa_pub_key.setComponentByName('publicExponent', e)
-
-    # 将ASN.1对象编码为DER格式
-    der_encoded = der_encoder.encode(rsa_pub_key)
-
-    # 对DER编码的数据进行Base64编码
-    b64_encoded = base64.b64encode(der_encoded).decode('utf-8')
-
-    # 构造PEM格式的字符串
-    pem_public_key = f"-----BEGIN RSA PUBLIC KEY-----\n{b64_encoded}\n-----END RSA PUBLIC KEY-----"
-
-    # 返回PEM格式的公钥
-    return pem_public_key
-
-
-# endregion
 class RsaApp:
 
     def __init__(self, master):
         # 保存主窗口对象
         self.pubkey = None
+        self.privkey = None
         self.master = master
 
+        # 后台任务调度器，密钥生成和攻击都在线程池/进程池中执行
+        self.jobs = JobRunner()
+        # 预生成密钥池，点击"生成密钥"时直接取用
+        self.key_pool = KeyPool(KEY_POOL_SIZES, target=KEY_POOL_TARGET, low_water=KEY_POOL_LOW_WATER,
+                                path=os.environ.get(KEY_POOL_FILE_ENV) or None)
+        # 已解析私钥的缓存，重复解密时跳过 PEM/ASN.1 解析
+        self.key_cache = KeyCache()
+        # 密钥库，第一次保存或打开密钥列表时才扫描
+        self.key_store = None
+
         # 设置主窗口标题
         self.master.title("RSA加密解密器")
 
@@ -114,10 +109,15 @@ class RsaApp:
         tk.Radiobutton(key_gen_frame, text="手动输入", variable=self.key_gen_method_var, value='manual',
                        command=self.toggle_key_inputs).grid(row=0, column=2, sticky="w")
 
+        # 素数类型选择（仅自动生成时使用）
+        self.prime_kind_var = tk.StringVar(value="普通素数")
+        tk.Label(key_gen_frame, text="素数类型:").grid(row=0, column=3, sticky="w", padx=(10, 0))
+        tk.OptionMenu(key_gen_frame, self.prime_kind_var, *PRIME_KIND_LABELS).grid(row=0, column=4, sticky="w")
+
         # 模数比特数选择
         self.bit_size_var = tk.IntVar(value=1024)  # 默认模数比特数为128位
         tk.Label(main_frame, text="选择模数比特数:").grid(row=1, column=0, sticky="w", padx=5)
-        tk.OptionMenu(main_frame, self.bit_size_var, 128, 256, 512, 1024, 2048).grid(row=1, column=1, sticky="ew")
+        tk.OptionMenu(main_frame, self.bit_size_var, *KEY_SIZES).grid(row=1, column=1, sticky="ew")
 
         # 创建一个新的框架用于田字格布局
         entries_frame = tk.Frame(main_frame)
@@ -143,6 +143,11 @@ class RsaApp:
         self.q_entry = tk.Entry(entries_frame, state="disabled")  # 默认禁用
         self.q_entry.grid(row=1, column=3, sticky="ew", padx=5, pady=5)
 
+        # 手动模式下验证 p、q 是否可用
+        self.validate_button = tk.Button(entries_frame, text="验证 p/q", command=self.validate_primes,
+                                         state="disabled")
+        self.validate_button.grid(row=2, column=3, sticky="e", padx=5)
+
         # 调整网格权重，使某些行和列可以扩展
         entries_frame.grid_rowconfigure(0, weight=1)
         entries_frame.grid_rowconfigure(1, weight=1)
@@ -167,6 +172,9 @@ class RsaApp:
                                                                                                             column=0)
         tk.Radiobutton(output_frame, text="文件输出", variable=self.output_method_var, value='file').grid(row=0,
                                                                                                           column=1)
+        tk.Label(output_frame, text="密文格式:").grid(row=0, column=2, padx=(10, 0))
+        self.ciphertext_format_var = tk.StringVar(value="十进制")
+        tk.OptionMenu(output_frame, self.ciphertext_format_var, *CIPHERTEXT_FORMAT_LABELS).grid(row=0, column=3)
 
         # 输入内容文本框
         tk.Label(main_frame, text="输入内容:").grid(row=6, column=0, sticky="nw", padx=5)
@@ -193,6 +201,26 @@ class RsaApp:
                                                                                                  padx=5)
         tk.Button(button_frame, text="保存公私钥", command=self.save_keys).grid(row=0, column=6, padx=5)
         tk.Button(button_frame, text="关于", command=self.show_about).grid(row=0, column=7, padx=5)
+        tk.Button(button_frame, text="文件加密", command=self.encrypt_file_click).grid(row=1, column=0, padx=5, pady=5)
+        tk.Button(button_frame, text="文件解密", command=self.decrypt_file_click).grid(row=1, column=1, padx=5, pady=5)
+        tk.Button(button_frame, text="批量加密", command=self.batch_encrypt_click).grid(row=1, column=2, padx=5, pady=5)
+        tk.Button(button_frame, text="批量解密", command=self.batch_decrypt_click).grid(row=1, column=3, padx=5, pady=5)
+        tk.Button(button_frame, text="共享因子扫描", command=self.shared_factor_click).grid(row=1, column=4, padx=5,
+                                                                                                  pady=5)
+        tk.Button(button_frame, text="广播攻击", command=self.toggle_broadcast_interface).grid(row=1, column=5, padx=5,
+                                                                                                pady=5)
+        tk.Button(button_frame, text="密钥库", command=self.show_key_store).grid(row=1, column=6, padx=5, pady=5)
+        tk.Button(button_frame, text="性能", command=self.show_performance).grid(row=1, column=7, padx=5, pady=5)
+
+        # 后台任务状态栏
+        status_frame = tk.Frame(main_frame)
+        status_frame.grid(row=9, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        status_frame.grid_columnconfigure(1, weight=1)
+        self.status_var = tk.StringVar(value="就绪")
+        tk.Label(status_frame, textvariable=self.status_var, anchor="w").grid(row=0, column=0, sticky="w")
+        self.progress_bar = ttk.Progressbar(status_frame, mode="determinate", maximum=1.0)
+        self.progress_bar.grid(row=0, column=1, sticky="ew", padx=5)
+        tk.Button(status_frame, text="取消任务", command=self.cancel_jobs).grid(row=0, column=2, padx=5)
 
         # 调整网格权重，使某些行和列可以扩展
         main_frame.grid_rowconfigure(3, weight=1)  # 公钥文本框
@@ -204,9 +232,84 @@ class RsaApp:
         # 初始化为 None，第一次点击时再创建
         self.common_modulus_frame = None
         self.private_key_frame = None
+        self.broadcast_frame = None
+        # 私钥计算面板中最近提交的攻击任务
+        self.attack_job = None
+
+        # 开始轮询后台任务，关闭窗口时停止所有任务
+        self.master.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.master.after(JOB_POLL_MS, self.poll_jobs)
+
+        # 窗口第一次绘制完成后再生成初始密钥，避免密钥生成推迟首帧
+        self.master.bind("<Map>", self.on_first_frame, add="+")
+
+    def on_first_frame(self, event):
+        """主窗口第一次显示后生成初始密钥，随后在后台补充密钥池。"""
+        if event.widget is not self.master:
+            return  # 子控件的 <Map> 事件也会传到主窗口的绑定上
+        self.master.unbind("<Map>")
+        if os.environ.get(STARTUP_PROBE_ENV):
+            # 启动基准测试：报告首帧已显示并立即退出（见 benchmarks/startup.py）
+            print(STARTUP_PROBE_MARKER, flush=True)
+            self.master.after_idle(self.on_close)
+            return
+        self.master.after_idle(self.generate_keys)
+        self.master.after_idle(self.key_pool.refill)
+
+    # 后台任务
+    # region
+
+    def poll_jobs(self):
+        """
+        分发后台任务的进度和结果，并刷新状态栏。
+        通过 master.after 周期调用，所有回调都在 Tk 主线程中执行。
+        """
+        try:
+            self.jobs.poll()
+            running = self.jobs.running()
+            if running:
+                job = running[-1]
+                text = f"{job.name}: {job.message}" if job.message else f"{job.name} 运行中..."
+                if len(running) > 1:
+                    text += f"（共 {len(running)} 个任务）"
+                self.status_var.set(text)
+                fraction = job.fraction
+                if fraction is None:
+                    if self.progress_bar.cget("mode") != "indeterminate":
+                        self.progress_bar.config(mode="indeterminate")
+                        self.progress_bar.start(JOB_POLL_MS)
+                else:
+                    if self.progress_bar.cget("mode") != "determinate":
+                        self.progress_bar.stop()
+                        self.progress_bar.config(mode="determinate")
+                    self.progress_bar["value"] = fraction
+            elif self.status_var.get() != "就绪":
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate")
+                self.progress_bar["value"] = 0
+                self.status_var.set("就绪")
+        finally:
+            # 回调或刷新状态栏出错时也要继续轮询，否则进度条和状态栏会永久停住
+            self.master.after(JOB_POLL_MS, self.poll_jobs)
+
+    def run_job(self, fn, *args, name="", mode="process", on_done=None, **kwargs):
+        """提交后台任务，出错时统一弹窗提示。"""
+        return self.jobs.submit(fn, *args, name=name, mode=mode, on_done=on_done,
+                                on_error=lambda exc: messagebox.showerror("错误", str(exc)), **kwargs)
+
+    def cancel_jobs(self):
+        """取消所有正在运行的后台任务。"""
+        self.jobs.cancel_all()
+
+    def on_close(self):
+        """关闭窗口前停止后台任务。"""
+        self.jobs.shutdown()
+        self.key_pool.close()
+        if self.key_store is not None:
+            self.key_store.close()
+        self.master.destroy()
 
-        # 初始化生成密钥
-        self.generate_keys()
+    # endregion
 
     # 关于
     def show_about(self):
@@ -226,7 +329,8 @@ class RsaApp:
         icon_path = resource_path('logo.ico')  # 获取图标文件路径
         about_window.iconbitmap(icon_path)  # 设置窗口图标
 
-        # 加载背景图片
+        # 加载背景图片，PIL 只有关于窗口用到，在这里才导入
+        from PIL import Image, ImageTk
         jpg_path = resource_path('tr.jpg')  # 获取背景图片路径
         background_image = Image.open(jpg_path)  # 打开背景图片
         # 将PIL图像转换为Tkinter可以使用的PhotoImage
@@ -263,14 +367,76 @@ class RsaApp:
         # 使用默认浏览器打开指定URL
         webbrowser.open(url)
 
+    def show_performance(self):
+        """
+        打开性能面板：列出各操作及其阶段（如“加密/powmod”）最近的 p50/p99 耗时，每秒刷新；
+        选中一项后可以对它的下一次执行做 cProfile 分析，结果写入 profiles 目录。
+        """
+        from rsa_engine import tracer
+        window = Toplevel(self.master)
+        window.title("性能")
+
+        columns = ("count", "p50", "p99", "mean", "max")
+        table = ttk.Treeview(window, columns=columns, height=15)
+        table.heading("#0", text="操作")
+        table.column("#0", width=260)
+        for column, title in zip(columns, ("次数", "p50 (毫秒)", "p99 (毫秒)", "平均 (毫秒)", "最大 (毫秒)")):
+            table.heading(column, text=title)
+            table.column(column, width=90, anchor="e")
+        table.grid(row=0, column=0, columnspan=3, sticky="nsew", padx=5, pady=5)
+        profile_var = tk.StringVar(value="选中一项后点击“分析下一次”，该操作下一次执行时会写出 cProfile 结果")
+        tk.Label(window, textvariable=profile_var, anchor="w").grid(row=1, column=0, columnspan=3, sticky="ew", padx=5)
+
+        def refresh():
+            if not window.winfo_exists():
+                return
+            selected = table.selection()
+            table.delete(*table.get_children())
+            for stats in tracer.stats():
+                table.insert("", tk.END, iid=stats.name, text=stats.name,
+                             values=(stats.count, f"{stats.p50 * 1000:.3f}", f"{stats.p99 * 1000:.3f}",
+                                     f"{stats.mean * 1000:.3f}", f"{stats.max * 1000:.3f}"))
+            table.selection_set([iid for iid in selected if table.exists(iid)])
+            if tracer.last_profile:
+                profile_var.set(f"最近的分析结果: {os.path.abspath(tracer.last_profile)}")
+
+        def poll():
+            if window.winfo_exists():
+                refresh()
+                window.after(PERFORMANCE_REFRESH_MS, poll)
+
+        def arm_profile():
+            for name in table.selection():
+                tracer.arm_profile(name)
+                profile_var.set(f"将在“{name}”下一次执行时做性能分析")
+
+        def reset():
+            tracer.reset()
+            refresh()
+
+        tk.Button(window, text="分析下一次", command=arm_profile).grid(row=2, column=0, pady=5)
+        tk.Button(window, text="重置", command=reset).grid(row=2, column=1, pady=5)
+        tk.Button(window, text="关闭", command=window.destroy).grid(row=2, column=2, pady=5)
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(0, weight=1)
+        poll()
+
     # rsa加密解密算法逻辑
     # region
 
+    def get_key_store(self):
+        """返回密钥库，第一次使用时打开。"""
+        if self.key_store is None:
+            from rsa_engine import KeyStore
+            self.key_store = KeyStore(KEY_STORE_FILE)
+        return self.key_store
+
     def save_keys(self):
         """
-        直接保存公私钥文本框的内容为 PEM 格式文件。
-        公钥保存为 public.pem，私钥保存为 private.pem。
+        把公私钥文本框的内容记入密钥库（以前保存的密钥都会保留），
+        同时导出为 PEM 格式文件：公钥保存为 public.pem，私钥保存为 private.pem。
         """
+        from rsa_engine import save_keys
         try:
             # 获取公私钥文本框的内容
             pub_key = self.pub_key_entry.get('1.0', 'end').strip()  # 获取公钥内容
@@ -281,19 +447,58 @@ class RsaApp:
                 messagebox.showerror("错误", "公私钥信息不能为空！")
                 return
 
-            # 保存公钥为 public.pem
-            with open("public.pem", "w", encoding="utf-8") as pub_file:
-                pub_file.write(pub_key)
+            with span("保存密钥"):
+                entry = self.get_key_store().add_pem(pub_key, priv_key)
 
-            # 保存私钥为 private.pem
-            with open("private.pem", "w", encoding="utf-8") as priv_file:
-                priv_file.write(priv_key)
+                # 公钥保存为 public.pem，私钥保存为 private.pem
+                save_keys(pub_key, priv_key)
 
-            messagebox.showinfo("成功", "公私钥已分别保存为 public.pem 和 private.pem")
+            messagebox.showinfo("成功", f"公私钥已记入密钥库（指纹 {entry.fingerprint[:16]}…），"
+                                        f"并分别保存为 public.pem 和 private.pem")
 
         except Exception as e:
             messagebox.showerror("错误", f"保存失败: {e}")
 
+    def show_key_store(self):
+        """打开密钥列表：按指纹前缀、标签或比特数搜索，选中后载入为当前密钥。"""
+        key_store = self.get_key_store()
+        window = Toplevel(self.master)
+        window.title("密钥库")
+
+        search_var = tk.StringVar()
+        tk.Label(window, text="搜索:").grid(row=0, column=0, sticky="e", padx=5, pady=5)
+        tk.Entry(window, textvariable=search_var).grid(row=0, column=1, sticky="ew", padx=5, pady=5)
+
+        key_list = tk.Listbox(window, width=70, height=15, font=("Courier", 10))
+        key_list.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=5)
+        scrollbar = tk.Scrollbar(window, command=key_list.yview)
+        scrollbar.grid(row=1, column=2, sticky="ns")
+        key_list.config(yscrollcommand=scrollbar.set)
+        shown = []
+
+        def refresh(*_):
+            shown[:] = key_store.search(search_var.get())
+            key_list.delete(0, tk.END)
+            for entry in shown:
+                created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.created))
+                kind = "公私钥" if entry.has_private else "仅公钥"
+                key_list.insert(tk.END, f"{entry.fingerprint[:16]}  {entry.bits:>5} 位  {created}  {kind}  {entry.label}")
+
+        def load_selected(*_):
+            selection = key_list.curselection()
+            if not selection:
+                return
+            self.pubkey, self.privkey = key_store.get(shown[selection[0]].fingerprint)
+            self.display_keys()
+            window.destroy()
+
+        search_var.trace_add("write", refresh)
+        key_list.bind("<Double-Button-1>", load_selected)
+        tk.Button(window, text="载入", command=load_selected).grid(row=2, column=0, columnspan=2, pady=5)
+        window.grid_columnconfigure(1, weight=1)
+        window.grid_rowconfigure(1, weight=1)
+        refresh()
+
     def toggle_common_modulus_interface(self):
         """
         切换共模攻击界面的显示和隐藏。
@@ -311,7 +516,17 @@ class RsaApp:
         """
         if self.key_gen_method_var.get() == 'auto':
             bit_size = self.bit_size_var.get()  # 获取用户选择的模数比特数
-            self.pubkey, self.privkey = rsa.newkeys(bit_size)  # 使用rsa库生成密钥对
+            kind = PRIME_KIND_LABELS[self.prime_kind_var.get()]
+            # 普通素数优先从密钥池中取出预生成的密钥对
+            keys = self.key_pool.take(bit_size) if kind == "normal" else None
+            if keys is not None:
+                with span(f"生成 {bit_size} 位密钥（密钥池）"):
+                    self.on_keys_generated(keys)
+                return
+            # 密钥池为空时在进程池的所有核心上并行搜索 p、q（先筛后测），完成后再显示
+            self.run_job(generate_keypair_parallel, bit_size, self.jobs.processes, self.jobs.manager, kind=kind,
+                         name=f"生成 {bit_size} 位密钥", mode="thread", on_done=self.on_keys_generated)
+            return
         else:
             # 手动模式，根据提供的参数生成公钥，如果可能则生成私钥
             try:
@@ -321,53 +536,67 @@ class RsaApp:
                 # 检查是否提供了 p 和 q
                 p = int(self.p_entry.get().strip()) if self.p_entry.get().strip() else None
                 q = int(self.q_entry.get().strip()) if self.q_entry.get().strip() else None
-
-                if p is not None and q is not None:
-                    if p * q != n:
-                        messagebox.showerror("输入错误", "p 和 q 的乘积必须等于 n。")
-                        return  # 退出函数，不生成密钥
-
-                    # 如果提供了 p 和 q，并且 n 是 p 和 q 的乘积，则计算私钥
-                    phi_n = (p - 1) * (q - 1)
-                    if gcd(e, phi_n) == 1:
-                        d = self.mod_inverse(e, phi_n)
-                        # 检查是否已存在私钥
-                        if self.privkey is not None:
-                            response = messagebox.askyesno("警告", "已存在私钥，是否替换？")
-                            if response:
-                                self.privkey = rsa.PrivateKey(n, e, d, p, q)
-                            else:
-                                return  # 保持现有私钥不变
-                        else:
-                            self.privkey = rsa.PrivateKey(n, e, d, p, q)
-                    else:
-                        messagebox.showerror("错误", "e 必须与 φ(n) 互质")
-                else:
-                    # 如果没有提供有效的 p 和 q，则不生成私钥
-                    pass  # 不生成私钥，保持现有私钥不变
-
-                # 生成公钥
-                self.pubkey = rsa.PublicKey(n, e)
-
             except ValueError:
                 messagebox.showerror("输入错误", "请输入有效的整数 e、n、p 和 q。")
-            except Exception as e:
-                messagebox.showerror("错误", str(e))
+                return
+
+            try:
+                with span("生成密钥（手动）"):
+                    pubkey, privkey = keys_from_parameters(n, e, p, q)
+            except ValueError as exc:
+                messagebox.showerror("输入错误", str(exc))
+                return  # 退出函数，不生成密钥
+
+            # 没有提供 p 和 q 时不生成私钥，保持现有私钥不变；已存在私钥时询问是否替换
+            if privkey is not None:
+                if self.privkey is not None and not messagebox.askyesno("警告", "已存在私钥，是否替换？"):
+                    return  # 保持现有私钥不变
+                self.privkey = privkey
+            self.pubkey = pubkey
 
         self.display_keys()  # 显示生成的公钥和私钥
+
+    def validate_primes(self):
+        """
+        手动模式下检查 p、q：是否为素数、是否相等、乘积是否等于 n、e 是否与 φ(n) 互质、是否过于接近。
+        """
+        try:
+            p = int(self.p_entry.get().strip())
+            q = int(self.q_entry.get().strip())
+            e = int(self.e_entry.get().strip()) if self.e_entry.get().strip() else None
+            n = int(self.n_entry.get().strip()) if self.n_entry.get().strip() else None
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的整数 p 和 q。")
+            return
+
+        problems = check_prime_pair(p, q, e, n)
+        if problems:
+            messagebox.showwarning("验证结果", "\n".join(problems))
+        else:
+            messagebox.showinfo("验证结果", "p 和 q 均为素数，可以用于生成密钥。")
+
+    def on_keys_generated(self, keys):
+        """后台密钥生成完成后保存并显示密钥对。"""
+        self.pubkey, self.privkey = keys
+        self.display_keys()
+
     def display_keys(self):
         """
         显示公钥和私钥。
         公钥总是显示在界面上，而私钥只在存在时显示。
         """
+        with span("PEM 序列化"):
+            pub_pem = self.pubkey.save_pkcs1().decode('utf-8')
+            priv_pem = self.privkey.save_pkcs1().decode('utf-8') if self.privkey else None
+
         # 显示公钥
         self.pub_key_entry.delete('1.0', 'end')
-        self.pub_key_entry.insert('1.0', self.pubkey.save_pkcs1().decode('utf-8'))
+        self.pub_key_entry.insert('1.0', pub_pem)
 
         # 显示私钥，如果私钥存在
         self.priv_key_entry.delete('1.0', 'end')
-        if self.privkey:
-            self.priv_key_entry.insert('1.0', self.privkey.save_pkcs1().decode('utf-8'))
+        if priv_pem:
+            self.priv_key_entry.insert('1.0', priv_pem)
         else:
             self.priv_key_entry.insert('1.0', "无可用私钥")
 
@@ -382,58 +611,211 @@ class RsaApp:
             self.n_entry.config(state='disabled')
             self.p_entry.config(state='disabled')
             self.q_entry.config(state='disabled')
+            self.validate_button.config(state='disabled')
         else:
             # 手动模式下启用输入框
             self.e_entry.config(state='normal')
             self.n_entry.config(state='normal')
             self.p_entry.config(state='normal')
             self.q_entry.config(state='normal')
+            self.validate_button.config(state='normal')
 
     def select_file(self):
         """
-        选择文件并读取其内容到输入框中。
+        选择文件并读取其内容到输入框中；原始二进制密文（如 encrypted.bin）转为十六进制显示。
         """
         filename = filedialog.askopenfilename()
         if filename:
-            with open(filename, 'r') as file:
-                self.in_entry.delete('1.0', tk.END)
-                self.in_entry.insert('1.0', file.read())
+            with span("读取文件"), open(filename, 'rb') as file:
+                data = file.read()
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                content = format_ciphertext(data, "hex")
+            self.in_entry.delete('1.0', tk.END)
+            self.in_entry.insert('1.0', content)
 
     def encode_click(self):
         """
         处理加密点击事件。
-        将输入文本加密，并将结果以数字形式显示。
+        将输入文本加密，并按选择的密文格式显示；超过单个分组容量时改用分组模式并行加密。
         """
         input_text = self.get_input()
         if input_text:
+            data = input_text.encode('utf-8')
+            start_time = time.perf_counter()
+            if needs_blocks(data, self.pubkey):
+                # 分组模式：在进程池中并行加密各分组，结果为帧格式
+                self.run_job(encrypt_bytes, data, self.pubkey, self.jobs.processes, name="分组加密", mode="thread",
+                             on_done=lambda ciphertext: self.on_encrypted(ciphertext, start_time))
+                return
             try:
-                start_time = time.perf_counter()
-                encrypted_integer = int.from_bytes(rsa.encrypt(input_text.encode('utf-8'), self.pubkey),
-                                                   byteorder='big')
-                end_time = time.perf_counter()
-                result = f"加密结果（数字形式）:\n{encrypted_integer}\n\n加密时间: {end_time - start_time:.6f}秒"
-                self.output_result(result, 'encrypted.txt')
+                with span("加密"):  # 只记录加密本身，不含显示结果的时间
+                    ciphertext = encrypt_bytes(data, self.pubkey)
             except Exception as e:
                 messagebox.showerror("错误", str(e))
+                return
+            self.on_encrypted(ciphertext, start_time)
+
+    def on_encrypted(self, ciphertext, start_time):
+        """显示加密结果。"""
+        end_time = time.perf_counter()
+        label = self.ciphertext_format_var.get()
+        fmt = CIPHERTEXT_FORMAT_LABELS[label]
+        block_size = (self.pubkey.n.bit_length() + 7) // 8
+        if fmt == "raw":
+            # 原始二进制只写入文件，文本框中以十六进制显示
+            content = ciphertext_bytes(ciphertext, block_size)
+            text = format_ciphertext(ciphertext, "hex", block_size)
+            label, filename = "原始二进制，以十六进制显示", 'encrypted.bin'
+        else:
+            content = text = format_ciphertext(ciphertext, fmt, block_size)
+            filename = 'encrypted.txt'
+            if fmt == "decimal" and isinstance(ciphertext, bytes):
+                label = "Base64"  # 分组密文没有十进制形式
+        if isinstance(ciphertext, bytes):
+            result = (f"加密结果（分组密文，{label}）:\n{text}\n\n"
+                      f"分组数: {len(ciphertext) // block_size}\n加密时间: {end_time - start_time:.6f}秒")
+        else:
+            result = f"加密结果（{label}）:\n{text}\n\n加密时间: {end_time - start_time:.6f}秒"
+        self.output_result(result, filename, content)
 
     def decode_click(self):
         """
         处理解密点击事件。
-        将输入的数字解密为原始文本。
+        自动识别密文格式（十进制、十六进制、Base64、分组帧）并解密为原始文本；分组密文在进程池中并行解密。
         """
         input_text = self.get_input()
         priv_key_str = self.priv_key_entry.get('1.0', tk.END).strip()
         if input_text and priv_key_str:
             try:
-                encrypted_bytes = int(input_text).to_bytes((int(input_text).bit_length() + 7) // 8, byteorder='big')
-                privkey = rsa.PrivateKey.load_pkcs1(priv_key_str.encode('utf-8'))
+                privkey = self.key_cache.get_private(priv_key_str)  # 命中缓存时不再解析 PEM
                 start_time = time.perf_counter()
-                decrypted_text = rsa.decrypt(encrypted_bytes, privkey).decode('utf-8')
-                end_time = time.perf_counter()
-                result = f"解密结果:\n{decrypted_text}\n\n解密时间: {end_time - start_time:.6f}秒"
-                self.output_result(result, 'decrypted.txt')
+                ciphertext = parse_ciphertext(input_text)
+                if isinstance(ciphertext, bytes):
+                    # 分组解密的耗时由 JobRunner 按任务名“分组解密”记录
+                    self.run_job(decrypt_ciphertext, ciphertext, privkey.key, self.jobs.processes, name="分组解密",
+                                 mode="thread", on_done=lambda data: self.on_decrypted(data, start_time))
+                    return
+                with span("解密"):  # 解析密文单独记为 parse，这里只记录解密本身，不含显示结果的时间
+                    data = decrypt_ciphertext(ciphertext, privkey)
             except Exception as e:
                 messagebox.showerror("错误", str(e))
+                return
+            self.on_decrypted(data, start_time)
+
+    def on_decrypted(self, data, start_time):
+        """显示解密结果。"""
+        end_time = time.perf_counter()
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            messagebox.showerror("错误", f"解密结果不是 UTF-8 文本（{len(data)} 字节），可能用错了私钥")
+            return
+        result = f"解密结果:\n{text}\n\n解密时间: {end_time - start_time:.6f}秒"
+        self.output_result(result, 'decrypted.txt', text)
+
+    def encrypt_file_click(self):
+        """
+        选择文件并用当前公钥做混合加密（RSA 封装会话密钥 + AES-GCM 流式加密），
+        文件内容直接在磁盘之间处理，不经过文本框。
+        """
+        from rsa_engine import encrypt_file
+        src = filedialog.askopenfilename(title="选择要加密的文件")
+        if not src:
+            return
+        dst = filedialog.asksaveasfilename(title="保存加密文件", initialfile=os.path.basename(src) + HYBRID_SUFFIX)
+        if not dst:
+            return
+
+        self.run_job(encrypt_file, src, dst, self.pubkey, name="文件加密", mode="thread",
+                     on_done=lambda size: messagebox.showinfo("文件加密", f"已加密到 {dst}（{size} 字节）"))
+
+    def decrypt_file_click(self):
+        """选择混合加密文件并用私钥文本框中的私钥解密到磁盘。"""
+        from rsa_engine import decrypt_file
+        priv_key_str = self.priv_key_entry.get('1.0', tk.END).strip()
+        src = filedialog.askopenfilename(title="选择要解密的文件",
+                                         filetypes=(("加密文件", "*" + HYBRID_SUFFIX), ("所有文件", "*.*")))
+        if not src:
+            return
+        initial = src[:-len(HYBRID_SUFFIX)] if src.endswith(HYBRID_SUFFIX) else src + ".dec"
+        dst = filedialog.asksaveasfilename(title="保存解密文件", initialfile=os.path.basename(initial))
+        if not dst:
+            return
+
+        try:
+            privkey = self.key_cache.get_private(priv_key_str).key
+        except Exception as e:
+            messagebox.showerror("错误", f"无法解析私钥: {e}")
+            return
+        self.run_job(decrypt_file, src, dst, privkey, name="文件解密", mode="thread",
+                     on_done=lambda size: messagebox.showinfo("文件解密", f"已解密到 {dst}（{size} 字节）"))
+
+    def batch_encrypt_click(self):
+        """
+        用当前公钥批量加密每行一条消息的文件，填充和模幂在进程池中分块批量完成，
+        结果按输入顺序每行一个十进制密文写出（encrypted.txt 格式）。
+        """
+        from rsa_engine import encrypt_file_lines
+        src = filedialog.askopenfilename(title="选择明文文件（每行一条消息）",
+                                         filetypes=(("文本文件", "*.txt"), ("所有文件", "*.*")))
+        if not src:
+            return
+        dst = filedialog.asksaveasfilename(title="保存加密结果", initialfile="encrypted.txt")
+        if not dst:
+            return
+
+        self.run_job(encrypt_file_lines, src, dst, self.pubkey, self.jobs.processes, self.jobs.max_workers,
+                     name="批量加密", mode="thread", on_done=self.on_batch_done)
+
+    def batch_decrypt_click(self):
+        """
+        批量解密每行一个十进制密文的文件（encrypted.txt 格式），在进程池中分块并行解密，
+        结果按输入顺序逐行写入输出文件。
+        """
+        from rsa_engine import decrypt_file_lines
+        priv_key_str = self.priv_key_entry.get('1.0', tk.END).strip()
+        src = filedialog.askopenfilename(title="选择密文文件（每行一个密文）",
+                                         filetypes=(("文本文件", "*.txt"), ("所有文件", "*.*")))
+        if not src:
+            return
+        dst = filedialog.asksaveasfilename(title="保存解密结果", initialfile="decrypted.txt")
+        if not dst:
+            return
+
+        try:
+            privkey = self.key_cache.get_private(priv_key_str).key
+        except Exception as e:
+            messagebox.showerror("错误", f"无法解析私钥: {e}")
+            return
+        self.run_job(decrypt_file_lines, src, dst, privkey, self.jobs.processes, self.jobs.max_workers,
+                     name="批量解密", mode="thread", on_done=self.on_batch_done)
+
+    def shared_factor_click(self):
+        """
+        选择一个目录，用批量 GCD（乘积树 + 余数树）找出其中与其他公钥共享素因子的所有模数，
+        分解结果显示在输出框中。
+        """
+        from rsa_engine import scan_shared_factors
+        directory = filedialog.askdirectory(title="选择公钥所在的目录")
+        if not directory:
+            return
+        self.run_job(scan_shared_factors, directory, self.jobs.processes, self.jobs.max_workers, name="共享因子扫描",
+                     mode="thread", on_done=self.on_shared_factors_done)
+
+    def on_shared_factors_done(self, results):
+        """列出共享素因子扫描分解出的模数。"""
+        lines = [f"共有 {len(results)} 个模数与其他公钥共享素因子，已全部分解"]
+        for result in results:
+            lines.append(f"{result.source}:\n  p = {result.p}\n  q = {result.q}")
+        self.out_entry.delete('1.0', tk.END)
+        self.out_entry.insert('1.0', "\n".join(lines))
+
+    def on_batch_done(self, batch_result):
+        """显示批处理的统计信息。"""
+        self.out_entry.delete('1.0', tk.END)
+        self.out_entry.insert('1.0', batch_result.summary())
 
     def get_input(self):
         """
@@ -441,28 +823,41 @@ class RsaApp:
         """
         return self.in_entry.get('1.0', tk.END).strip()
 
-    def output_result(self, result, filename=None):
+    def show_text(self, widget, text):
+        """在文本框中显示 text；超过 TEXT_PAGE_CHARS 时先显示第一页，点击末尾的提示再追加下一页。"""
+        widget.delete('1.0', tk.END)
+        self.append_text_page(widget, text, 0)
+
+    def append_text_page(self, widget, text, start):
+        """从 start 开始追加一页文本，还有剩余时在末尾放置“显示下一页”的提示。"""
+        if widget.tag_ranges("more"):
+            widget.delete("more.first", "more.last")
+        end = start + TEXT_PAGE_CHARS
+        widget.insert(tk.END, text[start:end])
+        if end < len(text):
+            widget.insert(tk.END, f"\n…… 还有 {len(text) - end} 个字符，点击显示下一页", "more")
+            widget.tag_config("more", foreground="blue", underline=True)
+            widget.tag_bind("more", "<Button-1>", lambda event: self.append_text_page(widget, text, end))
+
+    def output_result(self, result, filename=None, content=None):
         """
         显示结果并在需要时保存到文件。
+        content 为写入文件的内容（字节串按二进制写入），为空时写入完整的结果。
         """
-        # 显示完整的结果到文本框
-        self.out_entry.delete('1.0', tk.END)
-        self.out_entry.insert('1.0', result)
+        # 结果较长时分页显示到文本框
+        self.show_text(self.out_entry, result)
 
         # 如果选择文件输出
         if self.output_method_var.get() == 'file' and filename:
-            # 分割字符串，排除首尾部分
-            parts = result.split('\n')
-            # 加密数字结果位于中间，取第二个元素（索引1）
-            if len(parts) > 1:
-                encrypted_number = parts[1].strip()  # 移除可能的前后空格
-
-                # 保存加密数字结果到文件
-                with open(filename, 'w') as file:
-                    file.write(encrypted_number)
-                messagebox.showinfo("文件保存", f"结果已保存到 {filename}")
-            else:
-                messagebox.showwarning("文件保存", "没有找到加密结果。")
+            if content is None:
+                content = result
+            try:
+                with span("写入文件"), open(filename, 'wb' if isinstance(content, bytes) else 'w') as file:
+                    file.write(content)
+            except OSError as e:
+                messagebox.showerror("错误", f"无法保存到 {filename}: {e}")
+                return
+            messagebox.showinfo("文件保存", f"结果已保存到 {filename}")
 
     def save_to_file(self, filename, content):
         """
@@ -548,12 +943,16 @@ class RsaApp:
         tk.Button(self.common_modulus_frame, text="解密", command=self.decrypt_common_modulus).grid(row=9, column=0,
                                                                                                     columnspan=2,
                                                                                                     padx=5, pady=5)
+        # 语料库模式：扫描整个目录的公钥和密文，对所有共享模数的分组批量攻击
+        tk.Button(self.common_modulus_frame, text="语料库模式", command=self.common_modulus_corpus).grid(
+            row=10, column=0, columnspan=2, padx=5, pady=5)
 
     def decrypt_common_modulus(self):
         """
         执行共模攻击解密操作。
         根据输入的模数、密文和公钥指数进行解密。
         """
+        from rsa_engine import common_modulus_attack, shared_modulus
         try:
             n = self.entry_n.get()
             c1 = int(self.entry_c1.get())
@@ -569,32 +968,68 @@ class RsaApp:
                 n1 = int(self.entry_n1.get())
                 n2 = int(self.entry_n2.get())
 
-                if n1 != n2:
-                    messagebox.showerror("错误", "模数 n1 和 n2 不相同！")
+                try:
+                    n = shared_modulus(n1, n2)  # 如果 n1 和 n2 相同，则使用 n1（或者 n2）作为 n
+                except ValueError as exc:
+                    messagebox.showerror("错误", str(exc))
                     return
-                n = n1  # 如果 n1 和 n2 相同，则使用 n1（或者 n2）作为 n
 
-            # 解密过程
-            s = gcdext(e1, e2)  # 求解 e1 和 e2 的扩展欧几里得
-            m = int(pow(c1, s[1], n) * pow(c2, s[2], n) % n)  # 解密公式
-            result = n2s(m)  # 转换成字符串
-            self.entry_result.delete(0, tk.END)
-            self.entry_result.insert(0, result)
+            # 解密过程在后台执行
+            self.run_job(common_modulus_attack, n, c1, c2, e1, e2, name="共模攻击",
+                         on_done=self.on_common_modulus_done)
 
         except ValueError:
             messagebox.showerror("输入错误", "请输入有效的数字！")
 
+    def on_common_modulus_done(self, m):
+        """显示共模攻击恢复出的明文。"""
+        from rsa_engine import int_to_bytes
+        result = int_to_bytes(m)  # 转换成字符串
+        self.entry_result.delete(0, tk.END)
+        self.entry_result.insert(0, result)
+
+    def common_modulus_corpus(self):
+        """
+        选择一个目录，扫描其中的 PEM 公钥（name.pem）和同名密文文件（name.txt，每行一个十进制密文），
+        按模数建立索引后在进程池中并行攻击所有共享模数的分组，结果显示在输出框中。
+        """
+        from rsa_engine import attack_corpus
+        directory = filedialog.askdirectory(title="选择公钥和密文所在的目录")
+        if not directory:
+            return
+        self.run_job(attack_corpus, directory, self.jobs.processes, name="共模攻击（语料库）", mode="thread",
+                     on_done=self.on_corpus_done)
+
+    def on_corpus_done(self, results):
+        """在输出框中列出每个共享模数分组的攻击结果。"""
+        from rsa_engine import int_to_bytes
+        lines = [f"共找到 {len(results)} 个共享模数的分组，"
+                 f"恢复明文 {sum(result.plaintext is not None for result in results)} 个"]
+        for result in results:
+            header = f"n = {str(result.n)[:16]}…（消息槽 {result.slot + 1}）: {', '.join(result.sources)}"
+            if result.plaintext is not None:
+                text = int_to_bytes(result.plaintext).decode("utf-8", errors="replace")
+                lines.append(f"{header}\n  明文: {text}")
+            elif result.reason is not None:
+                lines.append(f"{header}\n  无法攻击: {result.reason}")
+            else:
+                lines.append(f"{header}\n  指数的最大公约数为 {result.g}，只恢复出 m^{result.g} mod n = {result.power}")
+            if result.key is not None:
+                lines.append(f"  密文与 n 不互质，已分解 n: p = {result.key.p}, q = {result.key.q}")
+        self.out_entry.delete('1.0', tk.END)
+        self.out_entry.insert('1.0', "\n".join(lines))
+
     def load_public_key1(self):
         """
         加载第一个公钥文件并解析 e1 和 n1。
         """
+        from rsa_engine import load_public_key
         filename = filedialog.askopenfilename(title="选择第一个公钥文件",
                                               filetypes=(("PEM 文件", "*.pem"), ("所有文件", "*.*")))
         if filename:
             try:
-                with open(filename, 'rb') as f:
-                    pubkey_data = f.read()
-                    pubkey = rsa.PublicKey.load_pkcs1(pubkey_data)
+                with span("加载公钥"):
+                    pubkey = load_public_key(filename)
 
                 # 将 n 填充到 n1
                 self.entry_n1.delete(0, tk.END)
@@ -612,13 +1047,13 @@ class RsaApp:
         """
         加载第二个公钥文件并解析 e2 和 n2。
         """
+        from rsa_engine import load_public_key
         filename = filedialog.askopenfilename(title="选择第二个公钥文件",
                                               filetypes=(("PEM 文件", "*.pem"), ("所有文件", "*.*")))
         if filename:
             try:
-                with open(filename, 'rb') as f:
-                    pubkey_data = f.read()
-                    pubkey = rsa.PublicKey.load_pkcs1(pubkey_data)
+                with span("加载公钥"):
+                    pubkey = load_public_key(filename)
 
                 # 将 n 填充到 n2
                 self.entry_n2.delete(0, tk.END)
@@ -648,6 +1083,101 @@ class RsaApp:
 
     # endregion
 
+    # 广播攻击逻辑
+    # region
+
+    def toggle_broadcast_interface(self):
+        """切换广播攻击界面的显示与隐藏，第一次调用时创建。"""
+        if self.broadcast_frame is None:
+            self.create_broadcast_interface()
+
+        if self.broadcast_frame.winfo_ismapped():
+            self.broadcast_frame.grid_remove()
+        else:
+            self.broadcast_frame.grid(row=13, column=0, columnspan=2, sticky="nsew")
+
+    def create_broadcast_interface(self):
+        """
+        创建广播攻击界面：同一明文用同一个小指数 e 在多个模数下加密，
+        每行填一组“模数 n 密文 c”，也可以加载 PEM 公钥自动填入 n。
+        """
+        self.broadcast_frame = tk.Frame(self.master)
+
+        # 公钥指数 e 输入框
+        tk.Label(self.broadcast_frame, text="公钥指数 e:").grid(row=0, column=0, sticky="e")
+        self.entry_broadcast_e = tk.Entry(self.broadcast_frame)
+        self.entry_broadcast_e.grid(row=0, column=1, sticky="w")
+
+        # 模数和密文，每行一组
+        tk.Label(self.broadcast_frame, text="n 和 c（每行一组）:").grid(row=1, column=0, sticky="ne")
+        self.broadcast_pairs_entry = tk.Text(self.broadcast_frame, height=6, width=60, wrap=tk.NONE)
+        self.broadcast_pairs_entry.grid(row=1, column=1)
+
+        # 解密结果显示框
+        tk.Label(self.broadcast_frame, text="解密结果:").grid(row=2, column=0, sticky="e")
+        self.entry_broadcast_result = tk.Entry(self.broadcast_frame)
+        self.entry_broadcast_result.grid(row=2, column=1, sticky="ew")
+
+        tk.Button(self.broadcast_frame, text="加载公钥", command=self.load_broadcast_keys).grid(row=3, column=0,
+                                                                                                padx=5, pady=5)
+        tk.Button(self.broadcast_frame, text="解密", command=self.perform_broadcast_attack).grid(row=3, column=1,
+                                                                                                 padx=5, pady=5)
+
+    def load_broadcast_keys(self):
+        """
+        加载一个或多个 PEM 公钥（与共模攻击加载公钥相同的解析方式），每个公钥追加一行模数；
+        公钥旁边有同名 .txt 密文文件时同时填入其中的第一条密文，否则需要手动补上密文。
+        """
+        from rsa_engine import load_public_key
+        from rsa_engine.corpus import CIPHERTEXT_SUFFIX, read_ciphertexts
+        filenames = filedialog.askopenfilenames(title="选择公钥文件",
+                                                filetypes=(("PEM 文件", "*.pem"), ("所有文件", "*.*")))
+        for filename in filenames:
+            try:
+                with span("加载公钥"):
+                    pubkey = load_public_key(filename)
+            except Exception as e:
+                messagebox.showerror("加载失败", f"无法解析公钥文件 {filename}: {e}")
+                return
+
+            if not self.entry_broadcast_e.get():
+                self.entry_broadcast_e.insert(0, str(pubkey.e))
+            elif self.entry_broadcast_e.get() != str(pubkey.e):
+                messagebox.showwarning("指数不一致", f"{filename} 的指数 e = {pubkey.e} 与已填写的不同，广播攻击要求 e 相同。")
+
+            ciphertext_path = os.path.splitext(filename)[0] + CIPHERTEXT_SUFFIX
+            ciphertexts = read_ciphertexts(ciphertext_path) if os.path.exists(ciphertext_path) else []
+            c = next((value for value in ciphertexts if value is not None), "")
+            self.broadcast_pairs_entry.insert(tk.END, f"{pubkey.n} {c}\n")
+
+    def perform_broadcast_attack(self):
+        """用中国剩余定理合并所有密文后开 e 次方根恢复明文；只有一组时按 m^e < n 直接开方。"""
+        from rsa_engine import hastad_attack
+        try:
+            e = int(self.entry_broadcast_e.get())
+            pairs = []
+            for line in self.broadcast_pairs_entry.get('1.0', tk.END).splitlines():
+                if line.strip():
+                    n, c = line.split()
+                    pairs.append((int(n), int(c)))
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的数字，每行一个模数 n 和一个密文 c，用空格分隔！")
+            return
+
+        self.run_job(hastad_attack, e, pairs, name="广播攻击", on_done=self.on_broadcast_done)
+
+    def on_broadcast_done(self, m):
+        """显示广播攻击恢复出的明文。"""
+        from rsa_engine import int_to_bytes
+        if m is None:
+            messagebox.showerror("失败", "合并后的 m^e 不是完全 e 次方：密文组数可能少于 e，或者明文经过了填充。")
+            return
+        result = int_to_bytes(m)  # 转换成字符串
+        self.entry_broadcast_result.delete(0, tk.END)
+        self.entry_broadcast_result.insert(0, result)
+
+    # endregion
+
     # 循环攻击逻辑
     # region
 
@@ -675,126 +1205,250 @@ class RsaApp:
         self.entry_e = tk.Entry(self.private_key_frame)
         self.entry_e.grid(row=1, column=1)
 
+        # 输入框 c（循环加密攻击使用）
+        tk.Label(self.private_key_frame, text="密文 c:").grid(row=2, column=0, sticky="e")
+        self.entry_cyclic_c = tk.Entry(self.private_key_frame)
+        self.entry_cyclic_c.grid(row=2, column=1)
+
         # 显示找到的 p
-        tk.Label(self.private_key_frame, text="质数 p:").grid(row=2, column=0, sticky="e")
+        tk.Label(self.private_key_frame, text="质数 p:").grid(row=3, column=0, sticky="e")
         self.entry_p = tk.Entry(self.private_key_frame)
-        self.entry_p.grid(row=2, column=1)
+        self.entry_p.grid(row=3, column=1)
 
         # 显示找到的 q
-        tk.Label(self.private_key_frame, text="质数 q:").grid(row=3, column=0, sticky="e")
+        tk.Label(self.private_key_frame, text="质数 q:").grid(row=4, column=0, sticky="e")
         self.entry_q = tk.Entry(self.private_key_frame)
-        self.entry_q.grid(row=3, column=1)
+        self.entry_q.grid(row=4, column=1)
 
         # 显示私钥 d
-        tk.Label(self.private_key_frame, text="私钥 d:").grid(row=4, column=0, sticky="e")
+        tk.Label(self.private_key_frame, text="私钥 d:").grid(row=5, column=0, sticky="e")
         self.entry_d = tk.Entry(self.private_key_frame)
-        self.entry_d.grid(row=4, column=1)
+        self.entry_d.grid(row=5, column=1)
 
         # 显示找到的 k
-        tk.Label(self.private_key_frame, text="找到的 k:").grid(row=5, column=0, sticky="e")
+        tk.Label(self.private_key_frame, text="找到的 k:").grid(row=6, column=0, sticky="e")
         self.entry_k = tk.Entry(self.private_key_frame)
-        self.entry_k.grid(row=5, column=1)
+        self.entry_k.grid(row=6, column=1)
+
+        # 显示循环加密攻击恢复的明文
+        tk.Label(self.private_key_frame, text="明文 m:").grid(row=7, column=0, sticky="e")
+        self.entry_cyclic_m = tk.Entry(self.private_key_frame)
+        self.entry_cyclic_m.grid(row=7, column=1)
+
+        # k 的搜索上限
+        tk.Label(self.private_key_frame, text="搜索上限 k:").grid(row=8, column=0, sticky="e")
+        self.entry_k_bound = tk.Entry(self.private_key_frame)
+        self.entry_k_bound.insert(0, str(CYCLE_K_BOUND))
+        self.entry_k_bound.grid(row=8, column=1)
+
+        # 循环加密攻击的迭代上限
+        tk.Label(self.private_key_frame, text="迭代上限:").grid(row=9, column=0, sticky="e")
+        self.entry_cyclic_budget = tk.Entry(self.private_key_frame)
+        self.entry_cyclic_budget.insert(0, str(CYCLIC_ITERATIONS))
+        self.entry_cyclic_budget.grid(row=9, column=1)
+
+        # 分解类攻击的时间预算
+        tk.Label(self.private_key_frame, text="时间预算(秒):").grid(row=10, column=0, sticky="e")
+        self.entry_factor_budget = tk.Entry(self.private_key_frame)
+        self.entry_factor_budget.insert(0, str(FACTOR_BUDGET))
+        self.entry_factor_budget.grid(row=10, column=1)
+
+        # 攻击进度
+        self.cycle_progress_var = tk.StringVar()
+        tk.Label(self.private_key_frame, textvariable=self.cycle_progress_var).grid(row=11, column=0, columnspan=2)
 
         # 按钮
-        tk.Button(self.private_key_frame, text="执行循环攻击", command=self.perform_cycle_attack).grid(row=6, column=0, columnspan=2, pady=10)
+        tk.Button(self.private_key_frame, text="执行循环攻击", command=self.perform_cycle_attack).grid(row=12, column=0,
+                                                                                                     pady=5)
+        tk.Button(self.private_key_frame, text="Wiener 攻击", command=self.perform_wiener_attack).grid(row=12, column=1,
+                                                                                                    pady=5)
+        tk.Button(self.private_key_frame, text="循环加密攻击", command=self.perform_cyclic_attack).grid(row=13, column=0,
+                                                                                                      pady=5)
+        tk.Button(self.private_key_frame, text="Fermat 分解", command=self.perform_fermat_attack).grid(row=13, column=1,
+                                                                                                    pady=5)
+        tk.Button(self.private_key_frame, text="并发分解", command=self.perform_factor_race).grid(row=14, column=0,
+                                                                                                pady=5)
+        tk.Button(self.private_key_frame, text="取消", command=self.cancel_attack).grid(row=14, column=1, pady=5)
+
+    def run_attack(self, fn, *args, **kwargs):
+        """提交面板中的攻击任务，进度显示在面板里，可以用面板的“取消”按钮单独取消。"""
+        self.cycle_progress_var.set("")
+        self.attack_job = self.run_job(fn, *args, on_progress=self.on_cycle_progress, **kwargs)
+
+    def cancel_attack(self):
+        """取消面板中正在运行的攻击任务。"""
+        if self.attack_job is not None:
+            self.attack_job.cancel()
+            self.cycle_progress_var.set("已取消")
 
     def perform_cycle_attack(self):
-        """执行基于循环攻击逻辑的 RSA 参数恢复。"""
+        """
+        执行基于循环攻击逻辑的 RSA 参数恢复。
+        k 按区间分散到进程池的所有核心上搜索，可随时取消；同一组 e、n 再次搜索时从检查点继续。
+        """
+        from rsa_engine import cycle_attack_parallel
+        try:
+            e = int(self.entry_e.get())
+            n = int(self.entry_n.get())
+            bound = int(self.entry_k_bound.get())
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的数字！")
+            return
+
+        self.run_attack(cycle_attack_parallel, e, n, self.jobs.processes, self.jobs.manager, bound,
+                        self.jobs.max_workers, CYCLE_CHECKPOINT_FILE, name="循环攻击", mode="thread",
+                        on_done=self.on_cycle_attack_done)
+
+    def on_cycle_progress(self, job):
+        """在面板中显示攻击进度（k/秒、当前范围或迭代次数）。"""
+        self.cycle_progress_var.set(f"{job.name}: {job.done}/{job.total}，{job.message}")
+
+    def perform_cyclic_attack(self):
+        """
+        循环加密攻击：对密文 c 反复做公钥加密直到回到 c，前一项即为明文；
+        迭代过程中批量检查 gcd(c^(e^i) - c, n)，能提前分解 n 时同时填入 p、q、d。
+        """
+        from rsa_engine import cyclic_attack
+        try:
+            e = int(self.entry_e.get())
+            n = int(self.entry_n.get())
+            c = int(self.entry_cyclic_c.get())
+            budget = int(self.entry_cyclic_budget.get())
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的数字！")
+            return
+
+        self.run_attack(cyclic_attack, n, e, c, budget, name="循环加密攻击", on_done=self.on_cyclic_attack_done)
+
+    def on_cyclic_attack_done(self, result):
+        """显示循环加密攻击恢复的明文，分解出 n 时同时显示 p、q、d。"""
+        if result is None:
+            messagebox.showerror("失败", "在迭代上限内序列没有回到密文 c，可以提高迭代上限后重试。")
+            return
+        self.entry_cyclic_m.delete(0, tk.END)
+        self.entry_cyclic_m.insert(0, str(result.plaintext))
+        if result.key is not None:
+            self.show_recovered_key(result.key)
+            messagebox.showinfo("成功", f"第 {result.iterations} 次迭代时分解了 n，已恢复明文和私钥。")
+        else:
+            messagebox.showinfo("成功", f"序列在第 {result.iterations} 次迭代时回到 c，已恢复明文。")
+
+    def perform_wiener_attack(self):
+        """私钥 d 较小时，用 e/n 的连分数渐近分数恢复 p、q、d、k。"""
+        from rsa_engine import wiener_attack
         try:
             e = int(self.entry_e.get())
             n = int(self.entry_n.get())
-            for k in range(1, 10000):  # 遍历可能的 k 值
-                candidate = e * k - 1
-                if candidate % 2 != 0:  # 必须是偶数
-                    continue
-                        
-
-                phi_n_candidates = []
-                for i in range(2, int(candidate ** 0.5) + 1):  # 因数分解
-                    if candidate % i == 0:
-                        phi_n_candidates.append(i)
-                        phi_n_candidates.append(candidate // i)
-
-                for phi_n in phi_n_candidates:
-                    p = self.solve_quadratic(phi_n, n)
-                    if p is not None:
-                        q = n // p
-                        if p * q == n:
-                            # 找到 p, q，计算私钥 d
-                            phi_n = (p - 1) * (q - 1)
-                            d = self.mod_inverse(e, phi_n)
-
-                            # 显示结果
-                            self.entry_p.delete(0, tk.END)
-                            self.entry_p.insert(0, str(p))
-
-                            self.entry_q.delete(0, tk.END)
-                            self.entry_q.insert(0, str(q))
-
-                            self.entry_d.delete(0, tk.END)
-                            self.entry_d.insert(0, str(d))
-                            
-                            self.entry_k.delete(0, tk.END)
-                            self.entry_k.insert(0, str(k))
-
-                            messagebox.showinfo("成功", "循环攻击成功！")
-                            return
-
-            messagebox.showerror("失败", "循环攻击未能找到有效的因子。")
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的数字！")
+            return
 
+        self.run_attack(wiener_attack, e, n, name="Wiener 攻击", on_done=self.on_wiener_attack_done)
+
+    def on_wiener_attack_done(self, found):
+        """显示 Wiener 攻击找到的 p、q、d、k。"""
+        if found is None:
+            messagebox.showerror("失败", "Wiener 攻击失败：私钥 d 不够小，无法从 e/n 的连分数中恢复。")
+            return
+        self.show_recovered_key(found)
+        messagebox.showinfo("成功", "Wiener 攻击成功！")
+
+    def perform_fermat_attack(self):
+        """p、q 很接近时用 Fermat 分解 n，在时间预算内找到时填入 p、q、d。"""
+        from rsa_engine import fermat_attack
+        try:
+            e = int(self.entry_e.get())
+            n = int(self.entry_n.get())
+            budget = float(self.entry_factor_budget.get())
         except ValueError:
             messagebox.showerror("输入错误", "请输入有效的数字！")
+            return
 
-    def solve_quadratic(self, phi_n, n):
-        """
-        求解关于 p 和 q 的二次方程。
-        φ(n) = (p - 1) * (q - 1) = pq - (p + q) + 1
-        n = p * q
-        """
-        discriminant = (n - phi_n + 1) ** 2 - 4 * n
-        if discriminant < 0:
-            return None  # 无解，判别式为负数
-
-        sqrt_d = int(discriminant ** 0.5)
-        if sqrt_d * sqrt_d != discriminant:
-            return None  # 判别式非完全平方数，无解
-
-        # 计算可能的 p 和 q
-        p1 = (n - phi_n + 1 + sqrt_d) // 2
-        p2 = (n - phi_n + 1 - sqrt_d) // 2
-
-        # 检查 p 和 q 是否有效
-        if p1 > 0 and n % p1 == 0:
-            return p1
-        if p2 > 0 and n % p2 == 0:
-            return p2
-
-        return None  # 未找到有效的 p 或 q
-
-    def mod_inverse(self, a, m):
-        """使用扩展欧几里得算法求模逆。"""
-        m0, x0, x1 = m, 0, 1
-        if m == 1:
-            return 0
-        while a > 1:
-            q = a // m
-            m, a = a % m, m
-            x0, x1 = x1 - q * x0, x0
-        if x1 < 0:
-            x1 += m0
-        return x1
+        self.run_attack(fermat_attack, e, n, budget, name="Fermat 分解", on_done=self.on_fermat_attack_done)
+
+    def on_fermat_attack_done(self, found):
+        """显示 Fermat 分解得到的 p、q、d。"""
+        if found is None:
+            messagebox.showerror("失败", "Fermat 分解在时间预算内没有找到因子：p、q 相距太远，可以提高时间预算后重试。")
+            return
+        self.show_recovered_key(found)
+        messagebox.showinfo("成功", "Fermat 分解成功！")
+
+    def perform_factor_race(self):
+        """
+        在进程池中同时运行 Pollard rho、p-1、Williams p+1 和 ECM 分解 n，每个方法各用一份时间预算，
+        先找到因子的方法胜出，其余子任务随即停止。
+        """
+        from rsa_engine import factor_attack
+        try:
+            e = int(self.entry_e.get())
+            n = int(self.entry_n.get())
+            budget = float(self.entry_factor_budget.get())
+        except ValueError:
+            messagebox.showerror("输入错误", "请输入有效的数字！")
+            return
+
+        self.run_attack(factor_attack, e, n, self.jobs.processes, self.jobs.manager, budget, name="并发分解",
+                        mode="thread", on_done=lambda found: self.on_factor_race_done(e, n, found))
+
+    def on_factor_race_done(self, e, n, found):
+        """填入分解得到的 p、q、d，并像手动输入 p、q 那样重建密钥对，在主界面显示 PEM。"""
+        if found is None:
+            messagebox.showerror("失败", "所有分解方法都在时间预算内失败，可以提高时间预算后重试。")
+            return
+        method, key = found
+        self.show_recovered_key(key)
+        pubkey, privkey = keys_from_parameters(n, e, key.p, key.q)
+        if self.privkey is not None and not messagebox.askyesno("警告", f"{method} 分解成功，已存在私钥，是否替换？"):
+            return  # 保持现有私钥不变，p、q、d 仍显示在面板中
+        self.pubkey, self.privkey = pubkey, privkey
+        self.display_keys()
+        messagebox.showinfo("成功", f"{method} 分解成功！")
+
+    def on_cycle_attack_done(self, found):
+        """显示循环攻击找到的 p、q、d、k。"""
+        if found is None:
+            messagebox.showerror("失败", "循环攻击未能找到有效的因子，可以提高搜索上限后从检查点继续搜索。")
+            return
+
+        self.show_recovered_key(found)
+        messagebox.showinfo("成功", "循环攻击成功！")
+
+    def show_recovered_key(self, found):
+        """把攻击恢复出的 p、q、d、k 填入私钥计算界面。"""
+        # 显示结果
+        self.entry_p.delete(0, tk.END)
+        self.entry_p.insert(0, str(found.p))
+
+        self.entry_q.delete(0, tk.END)
+        self.entry_q.insert(0, str(found.q))
+
+        self.entry_d.delete(0, tk.END)
+        self.entry_d.insert(0, str(found.d))
+
+        self.entry_k.delete(0, tk.END)
+        if found.k is not None:
+            self.entry_k.insert(0, str(found.k))
 
     # endregion
 
 
 # 启动主窗口
-# 创建一个 Tkinter 主窗口
-root = tk.Tk()
-# 获取图标文件的绝对路径
-icon_path = resource_path('logo.ico')
-# 设置主窗口的图标
-root.iconbitmap(icon_path)
-# 实例化 RsaApp 类，并传入主窗口对象
-app = RsaApp(root)
-# 启动 Tkinter 事件循环，使窗口保持显示状态
-root.mainloop()
+# 进程池在 Windows 上以 spawn 方式重新导入本模块，因此窗口只在直接运行时创建
+if __name__ == '__main__':
+    # 支持 PyInstaller 打包后的多进程
+    multiprocessing.freeze_support()
+    # 带命令行参数运行时（包括打包后的可执行文件）不创建窗口，交给命令行接口处理
+    if len(sys.argv) > 1:
+        from rsa_engine.cli import main as cli_main
+        sys.exit(cli_main())
+    # 创建一个 Tkinter 主窗口
+    root = tk.Tk()
+    # 获取图标文件的绝对路径
+    icon_path = resource_path('logo.ico')
+    # 设置主窗口的图标
+    root.iconbitmap(icon_path)
+    # 实例化 RsaApp 类，并传入主窗口对象
+    app = RsaApp(root)
+    # 启动 Tkinter 事件循环，使窗口保持显示状态
+    root.mainloop()
@@ -1,6 +1,7 @@
 ﻿# RSAKeyCalculator.spec
 
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
 a = Analysis(
     ['main.py'],
@@ -10,7 +11,8 @@ a = Analysis(
         ('logo.ico', '.'),
         ('tr.jpg', '.')  # 确保这里使用了正确的文件名和扩展名
     ],
-    hiddenimports=[],
+    # rsa_engine 的子模块在第一次使用时才导入，静态分析看不到，需要显式打包
+    hiddenimports=collect_submodules('rsa_engine'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,50 @@
+# RSA 计算引擎
+# 与 tkinter 界面无关的密钥生成、加解密、攻击算法和后台任务调度，可在工作进程、批处理和服务中安全导入。
+# 包本身不导入任何子模块：第一次访问某个名称时才导入它所在的子模块（PEP 562），
+# 这样界面启动时不会为攻击面板、PEM 导出和文件加密提前加载 libnum、pyasn1、cryptography。
+import importlib
+
+# 公开名称 -> 所在子模块
+_EXPORTS = {
+    "attacks": ("RecoveredKey", "combine_exponents", "common_modulus_attack", "continued_fraction", "convergents",
+                "int_to_bytes", "mod_inverse", "root_of_power", "shared_modulus", "solve_quadratic", "wiener_attack"),
+    "batch": ("BatchResult", "decrypt_file_lines", "encrypt_file_lines", "encrypt_messages", "pad_messages"),
+    "batchgcd": ("MappedLevel", "SharedFactor", "batch_gcd", "read_moduli", "scan_shared_factors", "shared_factors"),
+    "blockmode": ("block_capacity", "decrypt_blocks", "encrypt_blocks", "is_frame", "pack_frame", "unpack_frame"),
+    "broadcast": ("crt", "hastad_attack", "product_tree"),
+    "cipher": ("CIPHERTEXT_FORMATS", "Ciphertext", "ciphertext_bytes", "decrypt_ciphertext",
+               "detect_ciphertext_format", "encrypt_bytes", "format_ciphertext", "needs_blocks", "parse_ciphertext"),
+    "corpus": ("CorpusEntry", "CorpusResult", "attack_corpus", "build_index"),
+    "cyclic": ("CyclicResult", "cyclic_attack"),
+    "factor": ("DEFAULT_METHOD_BUDGET", "FACTOR_METHODS", "divisors", "ecm", "factor_attack", "factor_race", "factorint",
+               "pollard_pm1", "pollard_rho_brent", "williams_pp1"),
+    "fermat": ("DEFAULT_FERMAT_BUDGET", "fermat_attack", "fermat_factor"),
+    "hybrid": ("decrypt_file", "encrypt_file"),
+    "jobs": ("Job", "JobCancelled", "JobContext", "JobRunner"),
+    "keycache": ("CachedPrivateKey", "KeyCache", "cached_private_key", "fingerprint"),
+    "keypool": ("KeyPool",),
+    "keystore": ("KeyEntry", "KeyStore", "der_integers", "key_fingerprint"),
+    "keys": ("KeyPair", "build_keypair", "find_primes_parallel", "generate_keypair", "generate_keypair_parallel",
+             "keys_from_parameters", "search_prime"),
+    "ksearch": ("DEFAULT_K_BOUND", "cycle_attack", "cycle_attack_parallel", "search_k_range"),
+    "pem": ("create_pem_public_key", "load_private_key", "load_public_key", "save_keys"),
+    "primes": ("PRIME_KINDS", "check_prime_pair", "generate_prime", "is_probable_prime"),
+    "service": ("RpcError", "RsaService", "ServiceClient", "start_service"),
+    "tracing": ("OperationStats", "Tracer", "span", "tracer"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # 之后的访问不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
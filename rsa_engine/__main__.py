@@ -0,0 +1,9 @@
+# python -m rsa_engine：命令行入口，见 cli.py
+import multiprocessing
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
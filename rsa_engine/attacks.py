@@ -0,0 +1,161 @@
+# RSA 攻击算法
+# 不依赖 tkinter，可以在工作进程中直接导入执行。
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import rsa
+from gmpy2 import gcd, gcdext, invert, iroot, is_square, isqrt, mpz, powmod
+from libnum import n2s
+
+
+@dataclass(frozen=True)
+class RecoveredKey:
+    """攻击恢复出的私钥参数；k 为满足 e·d = k·φ(n) + 1 的系数（未知时为 None）。"""
+    p: int
+    q: int
+    d: int
+    k: Optional[int] = None
+
+    @property
+    def n(self) -> int:
+        return self.p * self.q
+
+    def private_key(self, e: int) -> rsa.PrivateKey:
+        """构造对应的 rsa.PrivateKey，可直接导出 PEM。"""
+        return rsa.PrivateKey(self.n, e, self.d, self.p, self.q)
+
+
+def mod_inverse(a: int, m: int) -> int:
+    """使用扩展欧几里得算法求模逆。"""
+    m0, x0, x1 = m, 0, 1
+    if m == 1:
+        return 0
+    while a > 1:
+        q = a // m
+        m, a = a % m, m
+        x0, x1 = x1 - q * x0, x0
+    if x1 < 0:
+        x1 += m0
+    return x1
+
+
+def solve_quadratic(phi_n: int, n: int) -> Optional[int]:
+    """
+    求解关于 p 和 q 的二次方程。
+    φ(n) = (p - 1) * (q - 1) = pq - (p + q) + 1
+    n = p * q
+    判别式用 gmpy2 做精确的整数平方根，任意大小的 n 都不会溢出浮点数。
+    """
+    s = mpz(n) - phi_n + 1  # p + q
+    discriminant = s * s - 4 * n
+    if discriminant < 0 or not is_square(discriminant):
+        return None  # 判别式为负数或非完全平方数，无解
+
+    # 计算可能的 p 和 q
+    sqrt_d = isqrt(discriminant)
+    for p in ((s + sqrt_d) // 2, (s - sqrt_d) // 2):
+        # 检查 p 和 q 是否有效
+        if p > 1 and n % p == 0:
+            return int(p)
+
+    return None  # 未找到有效的 p 或 q
+
+
+def continued_fraction(a: int, b: int) -> List[int]:
+    """a/b 的连分数展开 [a0; a1, a2, ...]。"""
+    terms = []
+    while b:
+        q, r = divmod(a, b)
+        terms.append(q)
+        a, b = b, r
+    return terms
+
+
+def convergents(terms: List[int]) -> Iterator[Tuple[int, int]]:
+    """依次给出连分数的渐近分数 (分子, 分母)。"""
+    h_prev, h = 0, 1
+    k_prev, k = 1, 0
+    for a in terms:
+        h_prev, h = h, a * h + h_prev
+        k_prev, k = k, a * k + k_prev
+        yield h, k
+
+
+def wiener_attack(e: int, n: int, ctx=None) -> Optional[RecoveredKey]:
+    """
+    Wiener 攻击：d < n^(1/4) / 3 时，k/d 必定是 e/n 的某个渐近分数。
+    逐个检查渐近分数对应的 φ(n) 候选，共 O(log n) 步；找到时返回 RecoveredKey，否则返回 None。
+    """
+    terms = continued_fraction(e, n)
+    for index, (k, d) in enumerate(convergents(terms)):
+        if ctx is not None:
+            ctx.check()
+            ctx.report(index + 1, len(terms), f"第 {index + 1} 个渐近分数")
+
+        if k == 0 or (e * d - 1) % k:
+            continue  # e·d - 1 必须是 k 的倍数
+        p = solve_quadratic((e * d - 1) // k, n)
+        if p is not None:
+            return RecoveredKey(p, n // p, d, k)
+
+    return None
+
+
+def shared_modulus(n1: int, n2: int) -> int:
+    """共模攻击要求两个公钥的模数相同。"""
+    if n1 != n2:
+        raise ValueError("模数 n1 和 n2 不相同！")
+    return n1
+
+
+def combine_exponents(n: int, pairs: Sequence[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    同一明文 m 在模数 n 下用多个指数加密得到 [(e_i, c_i)]。
+    用扩展欧几里得逐个合并：求 Σ a_i·e_i = g = gcd(e_1, ..., e_k)，则 m^g = Π c_i^a_i (mod n)。
+    返回 (g, m^g mod n)；系数为负时需要 c_i 的模逆，c_i 与 n 不互质时抛出 ValueError。
+    """
+    n = mpz(n)
+    g, power = mpz(pairs[0][0]), mpz(pairs[0][1]) % n
+    for e, c in pairs[1:]:
+        if g == 1:
+            break
+        new_g, a, b = gcdext(g, e)
+        if new_g == g:
+            continue  # 这个指数不能缩小 gcd，跳过
+        power = _signed_powmod(power, a, n) * _signed_powmod(mpz(c), b, n) % n
+        g = new_g
+    return int(g), int(power)
+
+
+def _signed_powmod(base, exponent, n):
+    """支持负指数的模幂：负指数先求模逆。"""
+    if exponent >= 0:
+        return powmod(base, exponent, n)
+    if gcd(base, n) != 1:
+        raise ValueError("密文与模数不互质，无法求模逆（但可以用 gcd 直接分解 n）")
+    return powmod(invert(base, n), -exponent, n)
+
+
+def root_of_power(g: int, power: int, n: int) -> Optional[int]:
+    """由 m^g mod n 恢复 m：g = 1 时直接返回，m^g < n 时开 g 次方根，否则返回 None。"""
+    if g == 1:
+        return power
+    root, exact = iroot(mpz(power), g)
+    return int(root) if exact else None
+
+
+def common_modulus_attack(n: int, c1: int, c2: int, e1: int, e2: int, ctx=None) -> int:
+    """
+    共模攻击：同一明文在同一模数 n 下用 e1、e2 加密时，直接恢复明文整数。
+    gcd(e1, e2) = g > 1 时只能得到 m^g，明文足够短（m^g < n）时再开 g 次方根。
+    """
+    g, power = combine_exponents(n, [(e1, c1), (e2, c2)])  # 求解 e1 和 e2 的扩展欧几里得
+    m = root_of_power(g, power, n)
+    if m is None:
+        raise ValueError(f"gcd(e1, e2) = {g}，只能恢复 m^{g} mod n，且无法开 {g} 次方根")
+    return m
+
+
+def int_to_bytes(m: int) -> bytes:
+    """把恢复出的明文整数转换为字节串。"""
+    return n2s(m)
@@ -0,0 +1,272 @@
+# 批量处理
+# 流式读取每行一条记录的文件，按块分发到进程池加密或解密，按输入顺序写出结果，并统计吞吐量和失败行。
+# 密文文件每行一个十进制密文（与 encrypted.txt 格式相同）；
+# 明文文件每行一条消息，加密时原样使用（不做任何转义）；
+# 解密结果中含有换行的消息写成 ESCAPED_LINE_PREFIX 开头的转义行（见 plaintext_line），
+# 加密时遇到这种行先还原，因此解密结果文件再加密、解密可以逐字节还原。
+import os
+import time
+from collections import deque
+from typing import List, Sequence
+
+import rsa.common
+from gmpy2 import mpz, powmod
+
+from .keycache import cached_private_key
+
+# 每个子任务处理的行数
+BATCH_CHUNK_LINES = 256
+# PKCS#1 v1.5 填充的最小随机字节数
+MIN_PADDING = 8
+# 转义行的前缀：ASCII 记录分隔符（与 RFC 7464 JSON 文本序列的记录前缀相同），普通文本中不会出现
+ESCAPED_LINE_PREFIX = "\x1e"
+
+
+class BatchResult:
+    """批处理统计：总行数、失败行 [(行号, 原因)]、耗时（秒）。"""
+
+    def __init__(self):
+        self.total = 0
+        self.failed = []
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return self.total - len(self.failed)
+
+    @property
+    def throughput(self) -> float:
+        """每秒处理的行数。"""
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        text = (f"共 {self.total} 行，成功 {self.succeeded} 行，失败 {len(self.failed)} 行\n"
+                f"耗时: {self.elapsed:.3f}秒，吞吐量: {self.throughput:.0f} 行/秒")
+        if self.failed:
+            shown = "\n".join(f"第 {line_no} 行: {reason}" for line_no, reason in self.failed[:10])
+            text += f"\n失败行:\n{shown}"
+            if len(self.failed) > 10:
+                text += f"\n……另有 {len(self.failed) - 10} 行"
+        return text
+
+
+def escape_line(text: str) -> str:
+    """把明文中的反斜杠和换行转义，保证输出仍是每行一条。"""
+    return text.replace("\\", "\\\\").replace("\r", "\\r").replace("\n", "\\n")
+
+
+def unescape_line(line: str) -> str:
+    """escape_line 的逆操作。"""
+    if "\\" not in line:
+        return line
+    out = []
+    chars = iter(line)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars, "")
+            char = {"n": "\n", "r": "\r", "\\": "\\"}.get(escaped, "\\" + escaped)
+        out.append(char)
+    return "".join(out)
+
+
+def plaintext_line(text: str) -> str:
+    """
+    把一条明文写成一行：不含换行且不以 ESCAPED_LINE_PREFIX 开头时原样输出，
+    否则输出前缀加 escape_line 转义后的文本。
+    """
+    if "\n" in text or "\r" in text or text.startswith(ESCAPED_LINE_PREFIX):
+        return ESCAPED_LINE_PREFIX + escape_line(text)
+    return text
+
+
+def line_plaintext(line: str) -> str:
+    """plaintext_line 的逆操作；不以前缀开头的行原样返回，其中的反斜杠不做处理。"""
+    if line.startswith(ESCAPED_LINE_PREFIX):
+        return unescape_line(line[len(ESCAPED_LINE_PREFIX):])
+    return line
+
+
+def _random_nonzero(size) -> bytes:
+    """一次性取出 size 个非零随机字节，供整批消息的填充切分使用。"""
+    pool = b""
+    while len(pool) < size:
+        pool += os.urandom(size - len(pool) + 64).translate(None, b"\x00")
+    return pool[:size]
+
+
+def pad_messages(messages: Sequence[bytes], block_size) -> List[int]:
+    """
+    批量做 PKCS#1 v1.5 加密填充（00 02 | 非零随机串 | 00 | 消息）并转换为整数。
+    所有消息的随机填充来自同一次 os.urandom 调用。
+    """
+    capacity = block_size - 3 - MIN_PADDING
+    for message in messages:
+        if len(message) > capacity:
+            raise OverflowError(f"消息长度 {len(message)} 超过单个分组容量 {capacity} 字节")
+    padding = _random_nonzero(sum(block_size - 3 - len(message) for message in messages))
+    values = []
+    offset = 0
+    for message in messages:
+        size = block_size - 3 - len(message)
+        block = b"\x00\x02" + padding[offset:offset + size] + b"\x00" + message
+        offset += size
+        values.append(mpz(int.from_bytes(block, "big")))
+    return values
+
+
+def encrypt_chunk(messages, e, n, block_size):
+    """工作进程：批量填充后用 gmpy2.powmod 加密，返回密文整数列表。"""
+    e, n = mpz(e), mpz(n)
+    return [int(powmod(m, e, n)) for m in pad_messages(messages, block_size)]
+
+
+def encrypt_messages(messages: Sequence, pubkey, executor=None, chunk_size=BATCH_CHUNK_LINES, ctx=None) -> List[int]:
+    """
+    用同一个公钥批量加密消息列表（str 按 UTF-8 编码），返回与输入顺序一致的密文整数。
+    executor 为进程池时按 chunk_size 条一块并行处理。
+    """
+    messages = [m.encode("utf-8") if isinstance(m, str) else m for m in messages]
+    block_size = rsa.common.byte_size(pubkey.n)
+    chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+    count = len(chunks)
+    if executor is None:
+        results = (encrypt_chunk(chunk, pubkey.e, pubkey.n, block_size) for chunk in chunks)
+    else:
+        results = executor.map(encrypt_chunk, chunks, [pubkey.e] * count, [pubkey.n] * count, [block_size] * count)
+
+    ciphertexts = []
+    for index, result in enumerate(results):
+        ciphertexts.extend(result)
+        if ctx is not None:
+            ctx.check()
+            ctx.report(index + 1, count, f"{len(ciphertexts)} 条")
+    return ciphertexts
+
+
+def _decode_line(line) -> str:
+    """文件中读出的一行（字节串）严格按 UTF-8 解码，不是有效的 UTF-8 时抛出 ValueError；str 原样返回。"""
+    if isinstance(line, str):
+        return line
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"不是有效的 UTF-8 文本（第 {exc.start + 1} 字节）") from None
+
+
+def encrypt_lines(lines, pubkey):
+    """
+    工作进程：加密一批明文行（字节串或 str），返回 [(十进制密文, 失败原因)]。
+    可以加密的行一起批量填充和模幂，超长或不是 UTF-8 的行单独记为失败。
+    """
+    block_size = rsa.common.byte_size(pubkey.n)
+    capacity = block_size - 3 - MIN_PADDING
+    messages, reasons = [], []
+    for line in lines:
+        try:
+            message = line_plaintext(_decode_line(line).removesuffix("\n").removesuffix("\r")).encode("utf-8")
+        except ValueError as exc:
+            message, reason = None, str(exc)
+        else:
+            reason = None if len(message) <= capacity else f"消息长度 {len(message)} 超过单个分组容量 {capacity} 字节"
+        messages.append(message)
+        reasons.append(reason)
+    ciphertexts = iter(encrypt_chunk([m for m, r in zip(messages, reasons) if r is None], pubkey.e, pubkey.n,
+                                     block_size))
+    return [(mpz(next(ciphertexts)).digits(), None) if reason is None else ("", reason) for reason in reasons]
+
+
+def decrypt_lines(lines, privkey):
+    """
+    工作进程：解密一批十进制密文行（字节串或 str）。
+    返回 [(明文行, 失败原因)]，成功时失败原因为 None，失败时明文行为空串。
+    """
+    key = cached_private_key(privkey)
+    results = []
+    for line in lines:
+        try:
+            line = _decode_line(line).strip()
+        except ValueError as exc:
+            results.append(("", str(exc)))
+            continue
+        if not line:
+            results.append(("", "空行"))
+            continue
+        try:
+            results.append((plaintext_line(key.decrypt(mpz(line)).decode("utf-8")), None))
+        except UnicodeDecodeError:
+            results.append(("", "解密结果不是 UTF-8 文本，无法写成一行明文"))
+        except Exception as exc:
+            results.append(("", str(exc) or type(exc).__name__))
+    return results
+
+
+def _read_chunks(src, chunk_lines, position):
+    """
+    按 chunk_lines 行一块读取文件，position[0] 记录已读取的字节数。
+    各行保持为字节串，由工作进程严格解码：不是 UTF-8 的行记为失败，而不是被替换字符悄悄改写。
+    """
+    with open(src, "rb") as f:
+        chunk = []
+        for raw in f:
+            position[0] += len(raw)
+            chunk.append(raw)
+            if len(chunk) == chunk_lines:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _process_file_lines(worker, key, src, dst, executor, workers, chunk_lines, ctx) -> BatchResult:
+    """
+    逐块读取 src，用 worker(块, key) 处理后按输入顺序写入 dst，失败的行输出为空行。
+    executor 为进程池时最多同时提交 2 × workers 个块，内存占用与文件大小无关。
+    """
+    result = BatchResult()
+    start = time.perf_counter()
+    size = os.path.getsize(src)
+    position = [0]
+    max_in_flight = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+
+    with open(dst, "w", encoding="utf-8", newline="\n") as out:
+        def flush(chunk_result):
+            for text, reason in chunk_result:
+                result.total += 1
+                if reason is not None:
+                    result.failed.append((result.total, reason))
+                out.write(text + "\n")
+            if ctx is not None:
+                ctx.check()
+                rate = result.total / (time.perf_counter() - start or 1e-9)
+                ctx.report(position[0], size, f"{result.total} 行，{rate:.0f} 行/秒")
+
+        try:
+            for chunk in _read_chunks(src, chunk_lines, position):
+                if executor is None:
+                    flush(worker(chunk, key))
+                    continue
+                pending.append(executor.submit(worker, chunk, key))
+                if len(pending) >= max_in_flight:
+                    flush(pending.popleft().result())
+            while pending:
+                flush(pending.popleft().result())
+        finally:
+            # 取消或出错时撤销尚未开始的子任务
+            for future in pending:
+                future.cancel()
+
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def decrypt_file_lines(src, dst, privkey, executor=None, workers=None, chunk_lines=BATCH_CHUNK_LINES,
+                       ctx=None) -> BatchResult:
+    """批量解密：每行一个十进制密文，输出每行一条明文（含换行的明文按 plaintext_line 转义）。"""
+    return _process_file_lines(decrypt_lines, privkey, src, dst, executor, workers, chunk_lines, ctx)
+
+
+def encrypt_file_lines(src, dst, pubkey, executor=None, workers=None, chunk_lines=BATCH_CHUNK_LINES,
+                       ctx=None) -> BatchResult:
+    """批量加密：每行一条明文（原样加密，转义行先还原），输出每行一个十进制密文（encrypted.txt 格式）。"""
+    return _process_file_lines(encrypt_lines, pubkey, src, dst, executor, workers, chunk_lines, ctx)
@@ -0,0 +1,264 @@
+# 批量 GCD（共享素因子扫描）
+# 用乘积树和余数树在拟线性时间内找出与其他任意模数共享素因子的所有模数（Bernstein 的 batch GCD）：
+#   乘积树  P = Π n_i，逐层两两相乘；
+#   余数树  自顶向下求 P mod n_i^2，叶子处 gcd((P mod n_i^2) / n_i, n_i) > 1 即说明 n_i 与其他模数共享因子。
+# 每一层拆成若干切片在进程池中并行计算，切片结果写入磁盘文件并通过 mmap 按需读取，
+# 工作进程只加载自己用到的元素，十万个 2048 位模数也不需要把整棵树放在内存里。
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from dataclasses import dataclass
+from math import gcd
+from typing import List, Optional, Sequence, Tuple
+
+import gmpy2
+from gmpy2 import mpz
+
+from .corpus import KEY_SUFFIX, PARSE_CHUNK, parse_files
+
+# 层文件的魔数、头部（魔数 + 元素数）和偏移表项的格式
+LEVEL_MAGIC = b"RBG1"
+LEVEL_HEADER = struct.Struct(">4sQ")
+OFFSET = struct.Struct(">Q")
+
+
+@dataclass(frozen=True)
+class SharedFactor:
+    """与其他模数共享素因子的模数及其分解结果。"""
+    index: int
+    source: str
+    n: int
+    p: int
+    q: int
+
+
+def write_level_part(path: str, values: Sequence) -> int:
+    """把一组大整数写成切片文件：头部 | (count + 1) 个偏移 | 各元素的 gmpy2 二进制表示。"""
+    blobs = [gmpy2.to_binary(mpz(value)) for value in values]
+    with open(path, "wb") as f:
+        f.write(LEVEL_HEADER.pack(LEVEL_MAGIC, len(blobs)))
+        offset = 0
+        for blob in blobs:
+            f.write(OFFSET.pack(offset))
+            offset += len(blob)
+        f.write(OFFSET.pack(offset))
+        for blob in blobs:
+            f.write(blob)
+    return len(blobs)
+
+
+class MappedLevel:
+    """
+    一层树的只读视图，由若干按顺序排列的切片文件组成，每个文件通过 mmap 映射，元素在访问时才解码。
+    parts 为 [(路径, 元素数)]。
+    """
+
+    def __init__(self, parts: Sequence[Tuple[str, int]]):
+        self.parts = list(parts)
+        self._starts = []
+        total = 0
+        for _, count in self.parts:
+            self._starts.append(total)
+            total += count
+        self._length = total
+        self._maps = {}
+
+    def __len__(self):
+        return self._length
+
+    def _map(self, part):
+        mapped = self._maps.get(part)
+        if mapped is None:
+            with open(self.parts[part][0], "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, _ = LEVEL_HEADER.unpack_from(mapped, 0)
+            if magic != LEVEL_MAGIC:
+                raise ValueError(f"不是批量 GCD 的层文件: {self.parts[part][0]}")
+            self._maps[part] = mapped
+        return mapped
+
+    def __getitem__(self, index) -> mpz:
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        part = bisect.bisect_right(self._starts, index) - 1
+        mapped = self._map(part)
+        local = index - self._starts[part]
+        base = LEVEL_HEADER.size + OFFSET.size * (self.parts[part][1] + 1)
+        start = OFFSET.unpack_from(mapped, LEVEL_HEADER.size + OFFSET.size * local)[0]
+        end = OFFSET.unpack_from(mapped, LEVEL_HEADER.size + OFFSET.size * (local + 1))[0]
+        return gmpy2.from_binary(mapped[base + start:base + end])
+
+    def close(self):
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+
+def product_slice(parts, start: int, stop: int, out_path: str) -> int:
+    """工作进程：计算上一层第 [start, stop) 个父节点（两两相乘，落单的直接上移），写入 out_path。"""
+    level = MappedLevel(parts)
+    try:
+        values = []
+        for i in range(start, stop):
+            left = level[2 * i]
+            values.append(left * level[2 * i + 1] if 2 * i + 1 < len(level) else left)
+        return write_level_part(out_path, values)
+    finally:
+        level.close()
+
+
+def remainder_slice(parent_parts, level_parts, start: int, stop: int, out_path: str) -> int:
+    """工作进程：余数树中第 [start, stop) 个节点的 rem_i = rem_parent(i // 2) mod L_i^2，写入 out_path。"""
+    parent, level = MappedLevel(parent_parts), MappedLevel(level_parts)
+    try:
+        values = []
+        for i in range(start, stop):
+            value = level[i]
+            values.append(parent[i // 2] % (value * value))
+        return write_level_part(out_path, values)
+    finally:
+        parent.close()
+        level.close()
+
+
+def leaf_slice(parent_parts, level_parts, start: int, stop: int) -> List[Tuple[int, int]]:
+    """工作进程：叶子处计算 gcd((P mod n_i^2) / n_i, n_i)，只返回大于 1 的 [(i, gcd)]。"""
+    parent, level = MappedLevel(parent_parts), MappedLevel(level_parts)
+    try:
+        found = []
+        for i in range(start, stop):
+            n = level[i]
+            g = gmpy2.gcd(parent[i // 2] % (n * n) // n, n)
+            if g != 1:
+                found.append((i, int(g)))
+        return found
+    finally:
+        parent.close()
+        level.close()
+
+
+def _slices(count: int, pieces: int):
+    """把 [0, count) 均匀切成最多 pieces 段。"""
+    size = max(1, -(-count // pieces))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def _run(executor, fn, calls):
+    """executor 为 None 时在当前进程中依次执行。"""
+    if executor is None:
+        return [fn(*args) for args in calls]
+    return [future.result() for future in [executor.submit(fn, *args) for args in calls]]
+
+
+def batch_gcd(moduli: Sequence[int], executor=None, workers: Optional[int] = None,
+              workdir: Optional[str] = None, ctx=None) -> List[int]:
+    """
+    返回每个模数与其余所有模数乘积的 gcd（没有共享因子时为 1）。
+    树的每一层切成 2 × workers 段并行计算，层文件写在 workdir（默认临时目录）中，用完即删除。
+    """
+    workers = workers or os.cpu_count() or 1
+    pieces = 2 * workers
+    root = tempfile.mkdtemp(prefix="batchgcd-", dir=workdir)
+    try:
+        # 叶子层：模数本身
+        leaves = []
+        for j, (start, stop) in enumerate(_slices(len(moduli), pieces)):
+            path = os.path.join(root, f"product0-{j}.bin")
+            leaves.append((path, write_level_part(path, moduli[start:stop])))
+        tree = [leaves]
+
+        # 乘积树，自底向上
+        depth = max(1, (len(moduli) - 1).bit_length())
+        while sum(count for _, count in tree[-1]) > 1:
+            count = (sum(count for _, count in tree[-1]) + 1) // 2
+            slices = _slices(count, pieces)
+            paths = [os.path.join(root, f"product{len(tree)}-{j}.bin") for j in range(len(slices))]
+            counts = _run(executor, product_slice,
+                          [(tree[-1], start, stop, path) for (start, stop), path in zip(slices, paths)])
+            tree.append(list(zip(paths, counts)))
+            if ctx is not None:
+                ctx.check()
+                ctx.report(len(tree) - 1, 2 * depth, f"乘积树第 {len(tree) - 1}/{depth} 层")
+
+        # 余数树，自顶向下；根节点的余数就是乘积本身
+        remainders = tree[-1]
+        for height in range(len(tree) - 2, 0, -1):
+            count = sum(count for _, count in tree[height])
+            slices = _slices(count, pieces)
+            paths = [os.path.join(root, f"remainder{height}-{j}.bin") for j in range(len(slices))]
+            counts = _run(executor, remainder_slice,
+                          [(remainders, tree[height], start, stop, path) for (start, stop), path in zip(slices, paths)])
+            # 父节点的余数和乘积都不再需要（根节点的余数与乘积是同一个文件）
+            _remove_parts(remainders)
+            _remove_parts(tree[height + 1])
+            remainders = list(zip(paths, counts))
+            if ctx is not None:
+                ctx.check()
+                ctx.report(2 * depth - height, 2 * depth, f"余数树第 {height}/{depth} 层")
+
+        slices = _slices(len(moduli), pieces)
+        gcds = [1] * len(moduli)
+        for found in _run(executor, leaf_slice, [(remainders, tree[0], start, stop) for start, stop in slices]):
+            for index, g in found:
+                gcds[index] = g
+        if ctx is not None:
+            ctx.report(2 * depth, 2 * depth, "完成")
+        return gcds
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _remove_parts(parts):
+    """删除不再需要的层文件，控制磁盘占用。"""
+    for path, _ in parts:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def shared_factors(moduli: Sequence[int], gcds: Sequence[int],
+                   sources: Optional[Sequence[str]] = None) -> List[SharedFactor]:
+    """
+    由 batch_gcd 的结果分解模数。
+    gcd 等于 n 本身时（两个素因子都与其他模数共享，或模数重复）逐个与其他模数求 gcd 找出单个素因子；
+    完全重复的模数无法由此分解，不计入结果。
+    """
+    results = []
+    for index, (n, g) in enumerate(zip(moduli, gcds)):
+        if g == 1:
+            continue
+        if g == n:
+            g = next((h for other in moduli if other != n for h in (gcd(n, other),) if 1 < h < n), n)
+            if g == n:
+                continue
+        source = sources[index] if sources is not None else str(index)
+        results.append(SharedFactor(index, source, n, g, n // g))
+    return results
+
+
+def read_moduli(directory: str, executor=None) -> Tuple[List[int], List[str]]:
+    """读取目录（含子目录）中所有 PEM 公钥的模数，返回 (模数列表, 相对路径列表)。"""
+    key_paths = sorted(os.path.join(root, name) for root, _, names in os.walk(directory)
+                       for name in names if name.lower().endswith(KEY_SUFFIX))
+    chunks = [key_paths[i:i + PARSE_CHUNK] for i in range(0, len(key_paths), PARSE_CHUNK)]
+    results = map(parse_files, chunks) if executor is None else executor.map(parse_files, chunks)
+    moduli, sources = [], []
+    for parsed in results:
+        for n, _, _, key_path in parsed:
+            moduli.append(n)
+            sources.append(os.path.relpath(key_path, directory))
+    return moduli, sources
+
+
+def scan_shared_factors(directory: str, executor=None, workers: Optional[int] = None,
+                        workdir: Optional[str] = None, ctx=None) -> List[SharedFactor]:
+    """扫描目录中的公钥，返回所有能通过共享素因子分解的模数。"""
+    moduli, sources = read_moduli(directory, executor)
+    if len(moduli) < 2:
+        return []
+    gcds = batch_gcd(moduli, executor, workers, workdir, ctx)
+    return shared_factors(moduli, gcds, sources)
@@ -0,0 +1,92 @@
+# 分组加密
+# 把超过单个模数容量的明文按 PKCS#1 v1.5 的 k - 11 字节切分成多个分组，
+# 分组可以在进程池中并行加解密，结果打包为紧凑的帧格式：
+#   magic(4) | 分组字节数 k(2) | 分组数(4) | 分组 1 | 分组 2 | ...
+# 每个密文分组恰好 k 字节，因此不需要额外的长度字段。
+import struct
+from typing import List, Tuple
+
+import rsa
+import rsa.common
+
+from .keycache import cached_private_key
+
+FRAME_MAGIC = b"RSB1"
+FRAME_HEADER = struct.Struct(">4sHI")
+# PKCS#1 v1.5 填充至少占用 11 字节
+PADDING_OVERHEAD = 11
+# 每个子任务处理的分组数
+CHUNK_BLOCKS = 32
+
+
+def block_capacity(pubkey) -> int:
+    """单个分组可以容纳的明文字节数。"""
+    return rsa.common.byte_size(pubkey.n) - PADDING_OVERHEAD
+
+
+def split_blocks(data: bytes, capacity: int) -> List[bytes]:
+    """按容量切分明文，空明文也保留一个空分组。"""
+    return [data[i:i + capacity] for i in range(0, len(data), capacity)] or [b""]
+
+
+def pack_frame(block_size: int, blocks: List[bytes]) -> bytes:
+    """打包密文分组。"""
+    return FRAME_HEADER.pack(FRAME_MAGIC, block_size, len(blocks)) + b"".join(blocks)
+
+
+def is_frame(data: bytes) -> bool:
+    return data[:len(FRAME_MAGIC)] == FRAME_MAGIC
+
+
+def unpack_frame(data: bytes) -> Tuple[int, List[bytes]]:
+    """解析帧，返回 (分组字节数, 分组列表)。"""
+    if len(data) < FRAME_HEADER.size or not is_frame(data):
+        raise ValueError("不是有效的分组密文")
+    _, block_size, count = FRAME_HEADER.unpack_from(data)
+    body = memoryview(data)[FRAME_HEADER.size:]
+    if len(body) != block_size * count:
+        raise ValueError("分组密文长度与帧头不一致")
+    return block_size, [bytes(body[i:i + block_size]) for i in range(0, len(body), block_size)]
+
+
+def encrypt_chunk(blocks, pubkey):
+    """工作进程：加密一批明文分组。"""
+    return [rsa.encrypt(block, pubkey) for block in blocks]
+
+
+def decrypt_chunk(blocks, privkey):
+    """工作进程：用缓存的 CRT 参数解密一批密文分组。"""
+    key = cached_private_key(privkey)
+    return [key.decrypt(block) for block in blocks]
+
+
+def _map_chunks(fn, blocks, key, executor, ctx):
+    """把分组按 CHUNK_BLOCKS 切片分发到进程池，按原顺序拼接结果。"""
+    chunks = [blocks[i:i + CHUNK_BLOCKS] for i in range(0, len(blocks), CHUNK_BLOCKS)]
+    if executor is None or len(chunks) == 1:
+        results = (fn(chunk, key) for chunk in chunks)
+    else:
+        results = executor.map(fn, chunks, [key] * len(chunks))
+
+    output = []
+    for index, result in enumerate(results):
+        if ctx is not None:
+            ctx.check()
+            ctx.report(index + 1, len(chunks), f"分组 {len(output) + len(result)}/{len(blocks)}")
+        output.extend(result)
+    return output
+
+
+def encrypt_blocks(data: bytes, pubkey, executor=None, ctx=None) -> bytes:
+    """分组加密任意长度的明文，返回帧格式的密文。"""
+    blocks = split_blocks(data, block_capacity(pubkey))
+    encrypted = _map_chunks(encrypt_chunk, blocks, pubkey, executor, ctx)
+    return pack_frame(rsa.common.byte_size(pubkey.n), encrypted)
+
+
+def decrypt_blocks(frame: bytes, privkey, executor=None, ctx=None) -> bytes:
+    """解密帧格式的密文，返回拼接后的明文。"""
+    block_size, blocks = unpack_frame(frame)
+    if block_size != rsa.common.byte_size(privkey.n):
+        raise ValueError("分组大小与私钥模数不匹配")
+    return b"".join(_map_chunks(decrypt_chunk, blocks, privkey, executor, ctx))
@@ -0,0 +1,72 @@
+# Håstad 广播攻击（低加密指数攻击）
+# 同一明文 m 用同一个小指数 e 在 k 个两两互质的模数下加密：c_i = m^e mod n_i。
+# k ≥ e 时 m^e < Π n_i，用中国剩余定理求出 m^e mod Π n_i 就是 m^e 本身，再开 e 次整数方根即可；
+# 只有一条密文且 m^e < n 时直接对 c 开方。
+# CRT 在乘积树上完成：余数树求 (N / n_i) mod n_i，再自底向上合并 Σ v_i · N / n_i，复杂度是拟线性的。
+from typing import List, Optional, Sequence, Tuple
+
+from gmpy2 import gcd, invert, iroot, mpz
+
+
+def product_tree(values: Sequence[int]) -> List[List[mpz]]:
+    """自底向上逐层两两相乘，tree[0] 为叶子，tree[-1] 为只有一个元素的根。"""
+    tree = [[mpz(value) for value in values]]
+    while len(tree[-1]) > 1:
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)])
+    return tree
+
+
+def crt(residues: Sequence[int], moduli: Sequence[int]) -> Tuple[int, int]:
+    """
+    求 x ≡ residues[i] (mod moduli[i]) 在 [0, N) 内的解，返回 (x, N)，N 为全部模数之积。
+    模数必须两两互质，否则抛出 ValueError。
+    """
+    if not moduli or len(residues) != len(moduli):
+        raise ValueError("密文和模数的数量必须相同且不能为空")
+    tree = product_tree(moduli)
+    total = tree[-1][0]
+
+    # 余数树：自顶向下求 N mod n_i^2，叶子处 (N mod n_i^2) / n_i = (N / n_i) mod n_i
+    remainders = [total]
+    for level in reversed(tree[:-1]):
+        remainders = [remainders[i // 2] % (value * value) for i, value in enumerate(level)]
+
+    # 叶子：v_i = c_i · (N / n_i)^(-1) mod n_i
+    values = []
+    for residue, n, remainder in zip(residues, tree[0], remainders):
+        cofactor = remainder // n
+        if gcd(cofactor, n) != 1:
+            raise ValueError(f"模数 {str(int(n))[:16]}… 与其他模数不互质，不能使用中国剩余定理")
+        values.append(residue * invert(cofactor, n) % n)
+
+    # 自底向上合并：父节点的值 = 左值 × 右乘积 + 右值 × 左乘积，根节点即 Σ v_i · N / n_i
+    for level in tree[:-1]:
+        values = [values[i] * level[i + 1] + values[i + 1] * level[i] if i + 1 < len(level) else values[i]
+                  for i in range(0, len(level), 2)]
+    return int(values[0] % total), int(total)
+
+
+def hastad_attack(e: int, pairs: Sequence[Tuple[int, int]], ctx=None) -> Optional[int]:
+    """
+    Håstad 广播攻击：pairs 为 [(n_i, c_i)]，都是同一明文用指数 e 加密的结果。
+    只有一对时按 m^e < n 直接开方；否则用 CRT 合并后开 e 次方根。
+    恢复出的 m^e 不是完全 e 次方（密文太少或明文经过了填充）时返回 None。
+    """
+    if e < 2:
+        raise ValueError("公钥指数 e 必须大于 1")
+    pairs = list(dict.fromkeys((int(n), int(c)) for n, c in pairs))  # 去掉重复的 (n, c)
+    if not pairs:
+        raise ValueError("至少需要一组模数和密文")
+    if ctx is not None:
+        ctx.check()
+        ctx.report(0, 2, f"合并 {len(pairs)} 组密文")
+    if len(pairs) == 1:
+        power = pairs[0][1]
+    else:
+        power, _ = crt([c for _, c in pairs], [n for n, _ in pairs])
+    if ctx is not None:
+        ctx.check()
+        ctx.report(1, 2, f"开 {e} 次方根")
+    root, exact = iroot(mpz(power), e)
+    return int(root) if exact else None
@@ -0,0 +1,140 @@
+# 文本加解密
+# 单个分组的明文得到一个密文整数，超过单个分组容量时使用分组模式（帧格式字节串）。
+# 密文可以输出为十进制、十六进制、Base64、分组帧或原始二进制，解析时自动识别格式。
+# 十六进制、Base64 和字节串之间的转换都是线性时间；十进制转换交给 gmpy2（次二次复杂度，
+# 不受 sys.set_int_max_str_digits 的位数限制），只用于单个分组。
+import base64
+import binascii
+import string
+from typing import Optional, Union
+
+import rsa
+import rsa.common
+from gmpy2 import mpz, powmod
+
+from .batch import pad_messages
+from .blockmode import block_capacity, decrypt_blocks, encrypt_blocks, is_frame, pack_frame
+from .keycache import CachedPrivateKey, cached_private_key
+from .tracing import span
+
+# 解析后的密文：十进制整数（单个分组）或帧格式字节串（分组模式）
+Ciphertext = Union[int, bytes]
+# 密文格式：decimal 十进制整数（encrypted.txt 原有的格式）| hex 带 0x 前缀的十六进制 | base64 Base64 |
+# frame 分组帧的 Base64（单个分组也打包成帧）| raw 原始二进制（只用于写文件）
+CIPHERTEXT_FORMATS = ("decimal", "hex", "base64", "frame", "raw")
+# 十六进制密文的前缀
+HEX_PREFIX = "0x"
+
+
+def needs_blocks(data: bytes, pubkey: rsa.PublicKey) -> bool:
+    """明文超过单个分组容量时需要分组模式。"""
+    return len(data) > block_capacity(pubkey)
+
+
+def encrypt_bytes(data: bytes, pubkey: rsa.PublicKey, executor=None, ctx=None) -> Ciphertext:
+    """加密字节串：单个分组返回密文整数，否则返回帧格式密文。"""
+    if needs_blocks(data, pubkey):
+        return encrypt_blocks(data, pubkey, executor, ctx)
+    with span("pad"):
+        m = pad_messages([data], rsa.common.byte_size(pubkey.n))[0]
+    with span("powmod"):
+        return int(powmod(m, pubkey.e, pubkey.n))
+
+
+def decrypt_ciphertext(ciphertext: Ciphertext, privkey: Union[CachedPrivateKey, rsa.PrivateKey], executor=None,
+                       ctx=None) -> bytes:
+    """解密 encrypt_bytes 的结果。"""
+    if isinstance(privkey, rsa.PrivateKey):
+        privkey = cached_private_key(privkey)
+    if isinstance(ciphertext, bytes):
+        return decrypt_blocks(ciphertext, privkey.key, executor, ctx)
+    return privkey.decrypt(ciphertext)
+
+
+def ciphertext_bytes(ciphertext: Ciphertext, block_size: Optional[int] = None) -> bytes:
+    """密文的字节形式：帧原样返回，整数转为 block_size 字节（默认最短长度）的大端字节串。"""
+    if isinstance(ciphertext, (bytes, bytearray)):
+        return bytes(ciphertext)
+    ciphertext = int(ciphertext)
+    return ciphertext.to_bytes(block_size or max(1, (ciphertext.bit_length() + 7) // 8), "big")
+
+
+def format_ciphertext(ciphertext: Ciphertext, fmt: str = "decimal", block_size: Optional[int] = None) -> str:
+    """
+    按 fmt 输出密文的文本形式，fmt 为 CIPHERTEXT_FORMATS 中除 raw 以外的一种。
+    分组密文没有十进制形式，decimal 时输出帧的 Base64（与以前相同）；frame 需要 block_size 才能把单个分组打包成帧。
+    """
+    if fmt not in CIPHERTEXT_FORMATS or fmt == "raw":
+        raise ValueError(f"不支持的文本密文格式: {fmt}")
+    with span("encode"):
+        if fmt == "decimal" and not isinstance(ciphertext, (bytes, bytearray)):
+            return mpz(ciphertext).digits(10)
+        if fmt == "frame" and not isinstance(ciphertext, (bytes, bytearray)):
+            if not block_size:
+                raise ValueError("打包分组帧需要分组字节数")
+            ciphertext = pack_frame(block_size, [ciphertext_bytes(ciphertext, block_size)])
+        data = ciphertext_bytes(ciphertext, block_size)
+        if fmt == "hex":
+            return HEX_PREFIX + data.hex()
+        return base64.b64encode(data).decode('ascii')
+
+
+def _compact(text: str) -> str:
+    """去掉所有空白（文本框会自动换行，复制来的密文可能带有换行）。"""
+    return "".join(text.split())
+
+
+def detect_ciphertext_format(data: Union[str, bytes]) -> str:
+    """
+    识别密文的格式：字节串中的帧或非 ASCII 内容为 raw，其余按文本判断：
+    纯数字为 decimal，0x 前缀或只含十六进制字符为 hex，Base64 解码后是帧为 frame，否则为 base64。
+    无法识别时抛出 ValueError。
+    """
+    if isinstance(data, (bytes, bytearray)):
+        if is_frame(data):
+            return "raw"
+        try:
+            data = bytes(data).decode("ascii")
+        except UnicodeDecodeError:
+            return "raw"
+    text = _compact(data)
+    if not text:
+        raise ValueError("密文为空")
+    if text.isascii() and text.isdigit():
+        return "decimal"
+    if text[:len(HEX_PREFIX)].lower() == HEX_PREFIX or all(ch in string.hexdigits for ch in text):
+        return "hex"
+    try:
+        head = base64.b64decode(text[:8], validate=True)
+    except ValueError:
+        raise ValueError("无法识别的密文格式（支持十进制、十六进制、Base64、分组帧和原始二进制）") from None
+    return "frame" if is_frame(head) else "base64"
+
+
+def _from_bytes(data: bytes) -> Ciphertext:
+    """字节形式的密文：帧原样返回，否则视为单个分组的大端整数。"""
+    if not data:
+        raise ValueError("密文为空")
+    return data if is_frame(data) else int.from_bytes(data, "big")
+
+
+def parse_ciphertext(data: Union[str, bytes]) -> Ciphertext:
+    """format_ciphertext 和 ciphertext_bytes 的逆操作，自动识别格式，无法识别时抛出 ValueError。"""
+    with span("parse"):
+        fmt = detect_ciphertext_format(data)
+        if fmt == "raw":
+            return _from_bytes(bytes(data))
+        text = _compact(data.decode("ascii") if isinstance(data, (bytes, bytearray)) else data)
+        if fmt == "decimal":
+            return int(mpz(text))
+        if fmt == "hex":
+            if text[:len(HEX_PREFIX)].lower() == HEX_PREFIX:
+                text = text[len(HEX_PREFIX):]
+            try:
+                return _from_bytes(bytes.fromhex(text))
+            except ValueError:
+                raise ValueError("十六进制密文长度为奇数或包含非法字符") from None
+        try:
+            return _from_bytes(base64.b64decode(text, validate=True))
+        except binascii.Error:
+            raise ValueError("Base64 密文不完整或包含非法字符") from None
@@ -0,0 +1,651 @@
+# 命令行接口
+# 不依赖 tkinter，可以在没有图形界面的服务器上运行：python -m rsa_engine <命令> ...
+#   keygen          生成密钥对，写出 public.pem / private.pem
+#   encrypt         加密文件（整个文件为一条消息，或 --lines 每行一条），密文与 encrypted.txt 格式相同
+#   decrypt         解密上述密文，自动识别密文格式
+#   common-modulus  共模攻击：直接给出 n、e1、e2、c1、c2，或扫描 name.pem / name.txt 语料库目录
+#   cycle           循环攻击：由公钥恢复 p、q、d
+#   serve           常驻的本地 JSON-RPC 服务（见 service.py）
+# 输入可以是文件、目录（递归）或通配符；多个文件分批提交给 -j 个工作进程，小文件很多时也能用满所有核心。
+# 没有 -o 时结果写到标准输出，多个输入时每行为“路径<TAB>结果”；失败信息和统计写到标准错误。
+import argparse
+import glob
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import rsa
+import rsa.common
+from pyasn1.error import PyAsn1Error
+
+from .batch import decrypt_file_lines, encrypt_file_lines, plaintext_line
+from .cipher import CIPHERTEXT_FORMATS, ciphertext_bytes, decrypt_ciphertext, encrypt_bytes, format_ciphertext, \
+    parse_ciphertext
+from .keycache import cached_private_key
+from .primes import PRIME_KINDS
+
+# 退出码：全部成功 | 部分输入失败或攻击没有结果 | 参数、密钥或输入路径错误 | 被 Ctrl-C 中断
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+# 每个子任务最多处理的文件数；文件较少时缩小批次，保证每个工作进程都分到任务
+FILE_CHUNK = 64
+# 加密/解密输出文件的扩展名
+ENCRYPTED_SUFFIX = ".enc"
+DECRYPTED_SUFFIX = ".dec"
+# 循环攻击恢复出的私钥文件的扩展名
+RECOVERED_SUFFIX = ".private.pem"
+# 表示标准输入的文件名
+STDIN = "-"
+# 默认的密钥比特数
+DEFAULT_KEY_BITS = 2048
+
+
+# region 输入展开与并行分发
+
+def _walk(directory: str) -> Iterator[str]:
+    """按名称顺序递归列出目录下的文件。"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+
+def _glob_root(pattern: str) -> str:
+    """通配符中第一个含通配符的路径段之前的目录，作为相对路径的起点。"""
+    parts = []
+    for part in pattern.replace("\\", "/").split("/"):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return "/".join(parts) or "."
+
+
+def expand_inputs(patterns: Sequence[str]) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    把文件、目录（递归）和通配符展开为 [(文件路径, 相对路径)]，相对路径用于在输出目录中保持原有的目录结构；
+    "-" 表示标准输入。同时返回没有匹配到任何文件的参数。
+    """
+    files, missing = [], []
+    for pattern in patterns:
+        if pattern == STDIN:
+            matched = [(STDIN, "stdin")]
+        elif os.path.isdir(pattern):
+            matched = [(path, os.path.relpath(path, pattern)) for path in _walk(pattern)]
+        elif glob.has_magic(pattern):
+            root = _glob_root(pattern)
+            matched = [(path, os.path.relpath(path, root)) for path in sorted(glob.glob(pattern, recursive=True))
+                       if os.path.isfile(path)]
+        else:
+            matched = [(pattern, os.path.basename(pattern))] if os.path.isfile(pattern) else []
+        if not matched:
+            missing.append(pattern)
+        files.extend(matched)
+    return files, missing
+
+
+def map_batches(executor, workers: int, fn, items: Sequence, *args) -> Iterator:
+    """
+    把 items 分批交给 fn(批次, *args)，按输入顺序逐个产出 fn 返回列表中的结果。
+    批次大小不超过 FILE_CHUNK，且至少分成 4 × workers 批；同时最多 2 × workers 个批次在运行，内存占用有上限。
+    """
+    size = max(1, min(FILE_CHUNK, math.ceil(len(items) / (4 * workers))))
+    batches = (items[i:i + size] for i in range(0, len(items), size))
+    if executor is None:
+        for batch in batches:
+            yield from fn(batch, *args)
+        return
+    pending = deque()
+    try:
+        for batch in batches:
+            pending.append(executor.submit(fn, batch, *args))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # 中断或出错时撤销尚未开始的批次
+        for future in pending:
+            future.cancel()
+
+
+def _read(path: str) -> bytes:
+    if path == STDIN:
+        return sys.stdin.buffer.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _output_path(out_dir: str, relative: str, suffix: str) -> str:
+    path = os.path.join(out_dir, relative + suffix)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return path
+
+
+def _strip_suffix(relative: str, suffix: str, fallback: str) -> str:
+    """去掉加密时添加的扩展名；没有该扩展名时改为添加 fallback。"""
+    return relative[:-len(suffix)] if relative.endswith(suffix) else relative + fallback
+
+# endregion
+
+
+# region 工作进程任务
+
+def encrypt_files(batch, pubkey, fmt, out_dir):
+    """
+    工作进程：加密一批文件，每个文件整体作为一条消息，超过单个分组容量时使用分组模式。
+    返回 [(路径, 结果, 错误)]；有输出目录时写入文件并返回目标路径，否则返回密文文本。
+    """
+    block_size = rsa.common.byte_size(pubkey.n)
+    results = []
+    for path, relative in batch:
+        try:
+            ciphertext = encrypt_bytes(_read(path), pubkey)
+            if fmt == "raw":
+                content, mode = ciphertext_bytes(ciphertext, block_size), "wb"
+            else:
+                content, mode = format_ciphertext(ciphertext, fmt, block_size), "w"
+            if out_dir is None:
+                results.append((path, content, None))
+                continue
+            dst = _output_path(out_dir, relative, ENCRYPTED_SUFFIX)
+            with open(dst, mode) as f:
+                f.write(content)
+            results.append((path, dst, None))
+        except Exception as e:
+            results.append((path, None, str(e) or type(e).__name__))
+    return results
+
+
+def decrypt_files(batch, privkey, out_dir):
+    """工作进程：解密一批密文文件（格式自动识别），返回 [(路径, 明文字节串或目标路径, 错误)]。"""
+    key = cached_private_key(privkey)
+    results = []
+    for path, relative in batch:
+        try:
+            plaintext = decrypt_ciphertext(parse_ciphertext(_read(path)), key)
+            if out_dir is None:
+                results.append((path, plaintext, None))
+                continue
+            dst = _output_path(out_dir, _strip_suffix(relative, ENCRYPTED_SUFFIX, DECRYPTED_SUFFIX), "")
+            with open(dst, "wb") as f:
+                f.write(plaintext)
+            results.append((path, dst, None))
+        except Exception as e:
+            results.append((path, None, str(e) or type(e).__name__))
+    return results
+
+
+def process_line_files(batch, key, decrypt, out_dir):
+    """工作进程：逐个批量加密或解密每行一条记录的文件，返回 [(路径, BatchResult 或目标路径, 错误)]。"""
+    results = []
+    for path, relative in batch:
+        try:
+            if decrypt:
+                dst = _output_path(out_dir, _strip_suffix(relative, ENCRYPTED_SUFFIX, DECRYPTED_SUFFIX), "")
+                results.append((path, decrypt_file_lines(path, dst, key), None))
+            else:
+                dst = _output_path(out_dir, relative, ENCRYPTED_SUFFIX)
+                results.append((path, encrypt_file_lines(path, dst, key), None))
+        except Exception as e:
+            results.append((path, None, str(e) or type(e).__name__))
+    return results
+
+
+def cycle_keys(batch, bound):
+    """工作进程：对一批公钥文件逐个做单进程循环攻击，返回 [(路径, (e, RecoveredKey 或 None), 错误)]。"""
+    from .ksearch import cycle_attack
+    results = []
+    for path, _ in batch:
+        try:
+            with open(path, "rb") as f:
+                pubkey = rsa.PublicKey.load_pkcs1(f.read())
+            results.append((path, (pubkey.e, cycle_attack(pubkey.e, pubkey.n, bound)), None))
+        except Exception as e:
+            results.append((path, None, str(e) or type(e).__name__))
+    return results
+
+# endregion
+
+
+# region 命令
+
+class Reporter:
+    """统计成功和失败的输入，把失败原因写到标准错误。"""
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        self.succeeded = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def ok(self):
+        self.succeeded += 1
+
+    def fail(self, path: str, reason: str):
+        self.failed += 1
+        print(f"{path}: {reason}", file=sys.stderr)
+
+    def finish(self, what: str = "个文件") -> int:
+        if not self.quiet:
+            elapsed = time.perf_counter() - self.started
+            print(f"共 {self.succeeded + self.failed} {what}，成功 {self.succeeded}，失败 {self.failed}，"
+                  f"耗时 {elapsed:.3f}秒", file=sys.stderr)
+        return EXIT_FAILED if self.failed else EXIT_OK
+
+
+@contextmanager
+def worker_pool(workers: int, with_manager: bool = False):
+    """
+    workers 大于 1 时提供 (进程池, Manager 或 None)，否则为 (None, None)，在当前进程中执行。
+    退出时先撤销未开始的子任务并等待进程池关闭，再关闭 Manager：已排队的子任务仍会引用 Manager 的停止事件。
+    """
+    if workers <= 1:
+        yield None, None
+        return
+    with ExitStack() as stack:
+        manager = stack.enter_context(multiprocessing.Manager()) if with_manager else None
+        executor = ProcessPoolExecutor(max_workers=workers)
+        stack.callback(executor.shutdown, cancel_futures=True)
+        yield executor, manager
+
+
+def _write_stdout(path: str, content, single: bool):
+    """单个输入时原样输出结果；多个输入时每行输出“路径<TAB>结果”，含换行的明文按 plaintext_line 转义。"""
+    if single:
+        if isinstance(content, bytes):
+            sys.stdout.flush()
+            sys.stdout.buffer.write(content)
+        else:
+            sys.stdout.write(content + "\n")
+        return
+    if isinstance(content, bytes):
+        content = plaintext_line(content.decode("utf-8", errors="replace"))
+    sys.stdout.write(f"{path}\t{content}\n")
+
+
+def _load_key(loader, path: str):
+    """读取 PEM 密钥；文件不存在或内容损坏（包括截断的 ASN.1）时输出原因并以 EXIT_USAGE 退出。"""
+    try:
+        with open(path, "rb") as f:
+            return loader(f.read())
+    except (OSError, ValueError, IndexError, TypeError, PyAsn1Error) as e:
+        raise SystemExit(_usage_error(f"无法读取密钥 {path}: {str(e) or type(e).__name__}"))
+
+
+def _usage_error(message: str) -> int:
+    print(message, file=sys.stderr)
+    return EXIT_USAGE
+
+
+def _inputs(patterns) -> Optional[List[Tuple[str, str]]]:
+    files, missing = expand_inputs(patterns)
+    for pattern in missing:
+        print(f"{pattern}: 没有匹配的文件", file=sys.stderr)
+    return None if missing else files
+
+
+def cmd_keygen(args) -> int:
+    from .keys import generate_keypair, generate_keypair_parallel
+    from .pem import save_keys
+
+    def save(keys, directory):
+        os.makedirs(directory, exist_ok=True)
+        pubkey, privkey = keys
+        save_keys(pubkey.save_pkcs1().decode("utf-8"), privkey.save_pkcs1().decode("utf-8"),
+                  os.path.join(directory, "public.pem"), os.path.join(directory, "private.pem"))
+        print(directory)
+
+    started = time.perf_counter()
+    with worker_pool(args.jobs, with_manager=args.count == 1) as (executor, manager):
+        if args.count == 1:
+            if executor is None:
+                keys = generate_keypair(args.bits, args.kind)
+            else:
+                # 单个密钥：p、q 的素数搜索分散到所有工作进程
+                keys = generate_keypair_parallel(args.bits, executor, manager, args.jobs, args.kind)
+            save(keys, args.output)
+        else:
+            # 多个密钥：每个工作进程独立生成，写到 output/1、output/2 ……（编号按数量补零）
+            width = len(str(args.count))
+            bits, kinds = [args.bits] * args.count, [args.kind] * args.count
+            generated = map(generate_keypair, bits, kinds) if executor is None else \
+                executor.map(generate_keypair, bits, kinds)
+            for index, keys in enumerate(generated, 1):
+                save(keys, os.path.join(args.output, str(index).zfill(width)))
+    if not args.quiet:
+        print(f"生成 {args.count} 个 {args.bits} 位密钥对，耗时 {time.perf_counter() - started:.3f}秒", file=sys.stderr)
+    return EXIT_OK
+
+
+def _run_files(args, worker, key, *extra) -> int:
+    """加密/解密命令的公共部分：展开输入，分批并行处理，按输入顺序输出结果。"""
+    files = _inputs(args.inputs)
+    if files is None:
+        return EXIT_USAGE
+    if args.lines and any(path == STDIN for path, _ in files):
+        return _usage_error("--lines 不支持标准输入")
+    reporter = Reporter(args.quiet)
+    single = len(files) == 1 and not args.lines
+    # 只有一个文件（包括标准输入）且不按行处理时直接在当前进程中完成
+    with worker_pool(1 if single else args.jobs) as (executor, _):
+        if args.lines:
+            decrypt = worker is decrypt_files
+            if len(files) == 1:
+                # 只有一个文件时在文件内部按行块并行
+                outcomes = process_line_file(files[0], key, decrypt, args.output, executor, args.jobs)
+            else:
+                outcomes = map_batches(executor, args.jobs, process_line_files, files, key, decrypt, args.output)
+            for path, result, error in outcomes:
+                if error is not None:
+                    reporter.fail(path, error)
+                elif result.failed:
+                    reporter.fail(path, f"{len(result.failed)} 行失败（第一处: 第 {result.failed[0][0]} 行，"
+                                        f"{result.failed[0][1]}）")
+                else:
+                    reporter.ok()
+        else:
+            for path, result, error in map_batches(executor, args.jobs, worker, files, key, *extra, args.output):
+                if error is not None:
+                    reporter.fail(path, error)
+                    continue
+                reporter.ok()
+                if args.output is None:
+                    _write_stdout(path, result, single)
+    sys.stdout.flush()
+    return reporter.finish()
+
+
+def process_line_file(file, key, decrypt, out_dir, executor, workers):
+    """单个按行文件：在当前进程中读写，行块分发到进程池。"""
+    path, relative = file
+    try:
+        if decrypt:
+            dst = _output_path(out_dir, _strip_suffix(relative, ENCRYPTED_SUFFIX, DECRYPTED_SUFFIX), "")
+            result = decrypt_file_lines(path, dst, key, executor, workers)
+        else:
+            result = encrypt_file_lines(path, _output_path(out_dir, relative, ENCRYPTED_SUFFIX), key, executor,
+                                        workers)
+        return [(path, result, None)]
+    except Exception as e:
+        return [(path, None, str(e) or type(e).__name__)]
+
+
+def cmd_encrypt(args) -> int:
+    pubkey = _load_key(rsa.PublicKey.load_pkcs1, args.key)
+    return _run_files(args, encrypt_files, pubkey, args.format)
+
+
+def cmd_decrypt(args) -> int:
+    privkey = _load_key(rsa.PrivateKey.load_pkcs1, args.key)
+    return _run_files(args, decrypt_files, privkey)
+
+
+def _plaintext(m: int) -> str:
+    """恢复出的明文整数按 UTF-8 显示，含换行时按 plaintext_line 转义。"""
+    from .attacks import int_to_bytes
+    return plaintext_line(int_to_bytes(m).decode("utf-8", errors="replace"))
+
+
+def cmd_common_modulus(args) -> int:
+    from .attacks import common_modulus_attack
+    from .corpus import attack_corpus
+
+    explicit = (args.n, args.e1, args.e2, args.c1, args.c2)
+    if any(value is not None for value in explicit):
+        if any(value is None for value in explicit) or args.directories:
+            return _usage_error("直接攻击需要同时给出 -n、--e1、--e2、--c1、--c2，且不能再指定目录")
+        try:
+            m = common_modulus_attack(args.n, args.c1, args.c2, args.e1, args.e2)
+        except ValueError as e:
+            print(f"共模攻击失败: {e}", file=sys.stderr)
+            return EXIT_FAILED
+        print(_plaintext(m))
+        return EXIT_OK
+
+    if not args.directories:
+        return _usage_error("需要语料库目录，或用 -n、--e1、--e2、--c1、--c2 直接给出参数")
+    missing = [directory for directory in args.directories if not os.path.isdir(directory)]
+    if missing:
+        return _usage_error(f"不是目录: {', '.join(missing)}")
+
+    reporter = Reporter(args.quiet)
+    with worker_pool(args.jobs) as (executor, _):
+        for directory in args.directories:
+            for result in attack_corpus(directory, executor):
+                sources = ",".join(os.path.join(directory, source) for source in result.sources)
+                if result.plaintext is None:
+                    reporter.fail(f"{sources} 第 {result.slot + 1} 行",
+                                  result.reason or f"gcd(e) = {result.g}，只能恢复 m^{result.g} mod n")
+                    continue
+                reporter.ok()
+                sys.stdout.write(f"{sources}\t{result.slot + 1}\t{_plaintext(result.plaintext)}\n")
+    sys.stdout.flush()
+    # 没有任何共享模数的分组也视为攻击没有结果
+    code = reporter.finish("组共享模数的密文")
+    return code if reporter.succeeded else EXIT_FAILED
+
+
+def _report_recovered(path: str, e: int, found, out_dir: Optional[str], relative: str):
+    sys.stdout.write(f"{path}\tp={found.p}\tq={found.q}\td={found.d}\n")
+    if out_dir is not None:
+        relative = relative[:-len(".pem")] if relative.endswith(".pem") else relative
+        with open(_output_path(out_dir, relative, RECOVERED_SUFFIX), "wb") as f:
+            f.write(found.private_key(e).save_pkcs1())
+
+
+def cmd_cycle(args) -> int:
+    from .ksearch import cycle_attack, cycle_attack_parallel
+
+    reporter = Reporter(args.quiet)
+    if args.n is not None or args.e is not None:
+        if args.n is None or args.e is None or args.keys:
+            return _usage_error("直接攻击需要同时给出 -e 和 -n，且不能再指定公钥文件")
+        path, relative, e, n = "n", "n", args.e, args.n
+    else:
+        if not args.keys:
+            return _usage_error("需要公钥文件、目录或通配符，或用 -e、-n 直接给出参数")
+        files = _inputs(args.keys)
+        if files is None:
+            return EXIT_USAGE
+        if len(files) > 1:
+            return _cycle_many(args, files, reporter)
+        path, relative = files[0]
+        pubkey = _load_key(rsa.PublicKey.load_pkcs1, path)
+        e, n = pubkey.e, pubkey.n
+
+    # 单个公钥：k 的搜索区间分散到所有工作进程，可以从检查点继续
+    with worker_pool(args.jobs, with_manager=True) as (executor, manager):
+        if executor is None:
+            found = cycle_attack(e, n, args.bound)
+        else:
+            found = cycle_attack_parallel(e, n, executor, manager, args.bound, args.jobs, args.checkpoint)
+    if found is None:
+        hint = "，可以提高 --bound 后从检查点继续" if args.checkpoint and executor is not None else "，可以提高 --bound"
+        reporter.fail(path, f"k < {args.bound} 内没有找到{hint}")
+    else:
+        reporter.ok()
+        _report_recovered(path, e, found, args.output, relative)
+    sys.stdout.flush()
+    return reporter.finish("个公钥")
+
+
+def _cycle_many(args, files, reporter) -> int:
+    """多个公钥：每个工作进程独立攻击一批公钥。"""
+    relative_of = dict(files)
+    with worker_pool(args.jobs) as (executor, _):
+        for path, outcome, error in map_batches(executor, args.jobs, cycle_keys, files, args.bound):
+            if error is not None:
+                reporter.fail(path, error)
+            elif outcome[1] is None:
+                reporter.fail(path, f"k < {args.bound} 内没有找到")
+            else:
+                reporter.ok()
+                _report_recovered(path, outcome[0], outcome[1], args.output, relative_of[path])
+    sys.stdout.flush()
+    return reporter.finish("个公钥")
+
+
+def cmd_serve(args) -> int:
+    """
+    在 Unix 套接字或本机端口上运行 JSON-RPC 服务，直到 Ctrl-C 或收到 SIGTERM。
+    默认监听只有当前用户可以连接的 Unix 套接字；没有身份验证的 TCP 端口需要用 --port 明确指定。
+    """
+    import asyncio
+    import signal
+    import socket
+    from .keypool import KeyPool
+    from .keystore import KeyStore
+    from .service import SERVICE_POOL_SIZES, SERVICE_PORT, RsaService, default_socket_path, remove_socket, \
+        start_service
+
+    socket_path, port = args.socket, args.port
+    if socket_path is None and port is None:
+        if hasattr(socket, "AF_UNIX"):
+            socket_path = default_socket_path()
+        else:
+            port = SERVICE_PORT  # Windows 等没有 Unix 套接字的平台只能退回到本机 TCP 端口
+    started = False
+
+    async def run(service):
+        nonlocal started
+        try:
+            server = await start_service(service, socket_path, args.host, port)
+        except OSError as e:
+            return _usage_error(f"无法启动服务: {e}")
+        started = True
+        address = socket_path or "%s:%d" % server.sockets[0].getsockname()[:2]
+        print(f"服务已启动: {address}，{args.jobs} 个工作进程", file=sys.stderr)
+        stop = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        except NotImplementedError:
+            pass  # Windows 的事件循环不支持信号处理，只能用 Ctrl-C 停止
+        async with server:
+            await stop.wait()
+        return EXIT_OK
+
+    # 即使只有一个工作进程也放在进程池中，运算期间 asyncio 前端仍能接收请求
+    executor = ProcessPoolExecutor(max_workers=args.jobs)
+    key_pool = None if args.no_key_pool else KeyPool(SERVICE_POOL_SIZES)
+    key_store = KeyStore(args.key_store) if args.key_store else None
+    try:
+        if key_pool is not None:
+            key_pool.refill()
+        return asyncio.run(run(RsaService(executor, key_pool, key_store)))
+    finally:
+        executor.shutdown(cancel_futures=True)
+        if key_pool is not None:
+            key_pool.close()
+        if key_store is not None:
+            key_store.close()
+        if started and socket_path:
+            remove_socket(socket_path)
+
+# endregion
+
+
+def _integer(text: str) -> int:
+    """十进制或 0x 前缀的十六进制整数。"""
+    try:
+        return int(text, 16) if text[:2].lower() == "0x" else int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是整数: {text}") from None
+
+
+def _ciphertext(text: str) -> int:
+    """单个分组的密文，格式自动识别。"""
+    try:
+        value = parse_ciphertext(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    if not isinstance(value, int):
+        raise argparse.ArgumentTypeError("共模攻击只接受单个分组的密文")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from .ksearch import DEFAULT_K_BOUND
+
+    parser = argparse.ArgumentParser(prog="python -m rsa_engine", description="RSA 加解密与攻击（命令行）")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="工作进程数（默认为 CPU 核心数，1 表示在当前进程中执行）")
+    common.add_argument("-q", "--quiet", action="store_true", help="不在标准错误输出统计信息")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    keygen = commands.add_parser("keygen", parents=[common], help="生成密钥对")
+    keygen.add_argument("-b", "--bits", type=int, default=DEFAULT_KEY_BITS, help="模数比特数")
+    keygen.add_argument("--kind", choices=PRIME_KINDS, default="normal", help="素数类型")
+    keygen.add_argument("-n", "--count", type=int, default=1, help="生成的密钥对数量，多于 1 个时写入编号子目录")
+    keygen.add_argument("-o", "--output", default=".", help="输出目录（默认当前目录）")
+    keygen.set_defaults(handler=cmd_keygen)
+
+    for name, helptext, default_key in (("encrypt", "加密文件", "public.pem"), ("decrypt", "解密文件", "private.pem")):
+        sub = commands.add_parser(name, parents=[common], help=helptext)
+        sub.add_argument("inputs", nargs="+", help="文件、目录（递归）或通配符")
+        sub.add_argument("-k", "--key", default=default_key, help=f"PEM 密钥文件（默认 {default_key}）")
+        sub.add_argument("-o", "--output", help="输出目录，保持输入的相对路径；省略时写到标准输出")
+        sub.add_argument("--lines", action="store_true",
+                         help="每行一条记录（与批量加解密相同的格式），需要 -o")
+        if name == "encrypt":
+            sub.add_argument("-f", "--format", choices=CIPHERTEXT_FORMATS, default="decimal",
+                             help="密文格式（默认十进制，与 encrypted.txt 相同；raw 需要 -o）")
+        sub.set_defaults(handler=cmd_encrypt if name == "encrypt" else cmd_decrypt)
+
+    modulus = commands.add_parser("common-modulus", parents=[common], help="共模攻击")
+    modulus.add_argument("directories", nargs="*", help="语料库目录：name.pem 的密文放在 name.txt 中，每行一个")
+    modulus.add_argument("-n", type=_integer, help="模数")
+    modulus.add_argument("--e1", type=_integer, help="第一个公钥指数")
+    modulus.add_argument("--e2", type=_integer, help="第二个公钥指数")
+    modulus.add_argument("--c1", type=_ciphertext, help="用 e1 加密的密文")
+    modulus.add_argument("--c2", type=_ciphertext, help="用 e2 加密的密文")
+    modulus.set_defaults(handler=cmd_common_modulus)
+
+    cycle = commands.add_parser("cycle", parents=[common], help="循环攻击")
+    cycle.add_argument("keys", nargs="*", help="PEM 公钥文件、目录（递归）或通配符")
+    cycle.add_argument("-e", type=_integer, help="公钥指数")
+    cycle.add_argument("-n", type=_integer, help="模数")
+    cycle.add_argument("--bound", type=int, default=DEFAULT_K_BOUND, help="k 的搜索上限")
+    cycle.add_argument("--checkpoint", help="单个公钥时的检查点文件，中断后可以继续")
+    cycle.add_argument("-o", "--output", help="把恢复出的私钥写入该目录（name.private.pem）")
+    cycle.set_defaults(handler=cmd_cycle)
+
+    from .service import SERVICE_SOCKET_NAME
+    serve = commands.add_parser("serve", parents=[common], help="本地 JSON-RPC 服务")
+    serve.add_argument("--socket", help=f"Unix 套接字路径（优先于 TCP 端口；默认为 $XDG_RUNTIME_DIR 或主目录下的 "
+                                        f"{SERVICE_SOCKET_NAME}，权限 0600）")
+    serve.add_argument("--host", default="127.0.0.1", help="TCP 监听地址（默认只监听本机）")
+    serve.add_argument("--port", type=int,
+                       help="改为监听 TCP 端口（0 为随机端口）；TCP 没有身份验证，本机的任何用户都能连接并使用服务中的私钥")
+    serve.add_argument("--key-store", help="密钥库文件，内存中找不到的 key_id 会到这里查找")
+    serve.add_argument("--no-key-pool", action="store_true", help="不预生成密钥")
+    serve.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "jobs", 1) < 1:
+        parser.error("-j 必须大于 0")
+    if getattr(args, "lines", False) and args.output is None:
+        parser.error("--lines 需要 -o 输出目录")
+    if getattr(args, "format", None) == "raw" and args.output is None:
+        parser.error("raw 格式需要 -o 输出目录")
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        print("已中断", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # 标准输出被提前关闭（例如管道到 head），不再输出
+        sys.stderr.close()
+        return EXIT_FAILED
@@ -0,0 +1,184 @@
+# 共模攻击语料库
+# 扫描一个目录下的 PEM 公钥和密文，按模数建立哈希索引，对所有共享模数的分组自动执行共模攻击。
+# 目录约定：公钥 name.pem 的密文放在同名的 name.txt 中，每行一个十进制密文（encrypted.txt 格式）；
+# 不同公钥的密文文件中第 i 行被视为同一条明文（第 i 个消息槽）的密文。
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import reduce
+from math import gcd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import rsa
+from gmpy2 import invert, powmod
+
+from .attacks import RecoveredKey, combine_exponents, root_of_power
+from .cipher import parse_ciphertext
+
+# 公钥和密文文件的扩展名
+KEY_SUFFIX = ".pem"
+CIPHERTEXT_SUFFIX = ".txt"
+# 每个子任务解析的公钥文件数 / 攻击的分组数
+PARSE_CHUNK = 256
+GROUP_CHUNK = 64
+
+
+@dataclass(frozen=True)
+class CorpusEntry:
+    """索引中的一条记录：某个公钥指数下的一条密文。"""
+    e: int
+    c: int
+    source: str
+
+
+@dataclass(frozen=True)
+class CorpusResult:
+    """
+    一个共享模数分组（同一消息槽）的攻击结果。
+    plaintext 为恢复出的明文整数；无法完全恢复时为 None，此时 power = m^g mod n，g 为所用指数的最大公约数。
+    key 在某条密文与 n 不互质、顺带分解了 n 时给出。
+    reason 在分组无法攻击（如密文 c ≡ 0 mod n，无法求模逆）时给出原因，此时 power 也为 None。
+    """
+    n: int
+    slot: int
+    sources: Tuple[str, ...]
+    g: int
+    power: Optional[int]
+    plaintext: Optional[int]
+    key: Optional[RecoveredKey] = None
+    reason: Optional[str] = None
+
+
+def read_ciphertexts(path: str) -> List[Optional[int]]:
+    """
+    读取密文文件，每行一个密文（十进制，也接受十六进制或 Base64 的单个分组）；
+    空行、分组帧或无法解析的行记为 None，保持行号与消息槽一致。
+    """
+    values = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.isdigit():
+                values.append(int(line))
+                continue
+            try:
+                value = parse_ciphertext(line)
+            except ValueError:
+                value = None
+            values.append(value if isinstance(value, int) else None)
+    return values
+
+
+def parse_files(key_paths: Sequence[str]) -> List[Tuple[int, int, List[Optional[int]], str]]:
+    """工作进程：解析一批公钥和对应的密文文件，返回 [(n, e, 密文列表, 公钥路径)]，跳过无法解析的文件。"""
+    parsed = []
+    for key_path in key_paths:
+        ciphertext_path = key_path[:-len(KEY_SUFFIX)] + CIPHERTEXT_SUFFIX
+        try:
+            with open(key_path, "rb") as f:
+                pubkey = rsa.PublicKey.load_pkcs1(f.read())
+            ciphertexts = read_ciphertexts(ciphertext_path) if os.path.exists(ciphertext_path) else []
+        except Exception:
+            continue  # 跳过无法读取或不是 PKCS#1 公钥的文件
+        parsed.append((pubkey.n, pubkey.e, ciphertexts, key_path))
+    return parsed
+
+
+def build_index(directory: str, executor=None, ctx=None) -> Dict[Tuple[int, int], List[CorpusEntry]]:
+    """
+    扫描目录（含子目录）建立索引 {(n, 消息槽): [CorpusEntry]}。
+    executor 为进程池时按 PARSE_CHUNK 个文件一块并行解析 PEM。
+    """
+    key_paths = sorted(os.path.join(root, name) for root, _, names in os.walk(directory)
+                       for name in names if name.lower().endswith(KEY_SUFFIX))
+    chunks = [key_paths[i:i + PARSE_CHUNK] for i in range(0, len(key_paths), PARSE_CHUNK)]
+    results = map(parse_files, chunks) if executor is None else executor.map(parse_files, chunks)
+
+    index: Dict[Tuple[int, int], List[CorpusEntry]] = defaultdict(list)
+    for done, parsed in enumerate(results, 1):
+        for n, e, ciphertexts, key_path in parsed:
+            for slot, c in enumerate(ciphertexts):
+                if c is not None:
+                    index[(n, slot)].append(CorpusEntry(e, c, os.path.relpath(key_path, directory)))
+        if ctx is not None:
+            ctx.check()
+            ctx.report(done, len(chunks), f"解析公钥 {min(done * PARSE_CHUNK, len(key_paths))}/{len(key_paths)}")
+    return dict(index)
+
+
+def shared_groups(index: Dict[Tuple[int, int], List[CorpusEntry]]) -> List[Tuple[int, int, List[CorpusEntry]]]:
+    """挑出至少有两个不同指数的分组，返回 [(n, 消息槽, 条目)]。"""
+    groups = []
+    for (n, slot), entries in index.items():
+        unique = {}
+        for entry in entries:
+            unique.setdefault(entry.e, entry)  # 同一指数的重复密文只保留一条
+        if len(unique) >= 2:
+            groups.append((n, slot, list(unique.values())))
+    return groups
+
+
+def _factor_with(n: int, factor: int, entries: Sequence[CorpusEntry]) -> Optional[Tuple[int, RecoveredKey]]:
+    """密文与 n 不互质时得到 n 的因子：恢复私钥并用任一可逆的指数解密，返回 (明文, 私钥参数)。"""
+    p, q = factor, n // factor
+    phi_n = (p - 1) * (q - 1)
+    for entry in entries:
+        if gcd(entry.e, phi_n) == 1:
+            d = int(invert(entry.e, phi_n))
+            return int(powmod(entry.c, d, n)), RecoveredKey(p, q, d)
+    return None
+
+
+def attack_group(n: int, slot: int, entries: Sequence[CorpusEntry]) -> CorpusResult:
+    """
+    对一个共享模数的分组执行共模攻击。
+    优先选一对互质的指数；找不到时按指数顺序合并三个或更多指数，直到 gcd 不再变小。
+    """
+    for entry in entries:
+        factor = gcd(entry.c, n)
+        if 1 < factor < n:
+            recovered = _factor_with(n, factor, entries)
+            if recovered is not None:
+                plaintext, key = recovered
+                return CorpusResult(n, slot, tuple(item.source for item in entries), 1, plaintext,
+                                    plaintext, key)
+
+    chosen = list(entries)
+    for i, first in enumerate(entries):
+        partner = next((other for other in entries[i + 1:] if gcd(first.e, other.e) == 1), None)
+        if partner is not None:
+            chosen = [first, partner]
+            break
+
+    sources = tuple(entry.source for entry in chosen)
+    try:
+        g, power = combine_exponents(n, [(entry.e, entry.c) for entry in chosen])
+    except ValueError as e:
+        # 退化的密文（如 c ≡ 0 mod n）只让这个分组失败，不能中断整个语料库的攻击
+        return CorpusResult(n, slot, sources, reduce(gcd, (entry.e for entry in chosen)), None, None, reason=str(e))
+    return CorpusResult(n, slot, sources, g, power, root_of_power(g, power, n))
+
+
+def attack_groups(groups: Sequence[Tuple[int, int, List[CorpusEntry]]]) -> List[CorpusResult]:
+    """工作进程：依次攻击一批分组。"""
+    return [attack_group(n, slot, entries) for n, slot, entries in groups]
+
+
+def attack_corpus(directory: str, executor=None, ctx=None) -> List[CorpusResult]:
+    """
+    语料库模式：扫描目录、按模数建立索引，并在进程池中并行攻击所有共享模数的分组。
+    返回每个分组的结果，按模数和消息槽排序。
+    """
+    index = build_index(directory, executor, ctx)
+    groups = shared_groups(index)
+    chunks = [groups[i:i + GROUP_CHUNK] for i in range(0, len(groups), GROUP_CHUNK)]
+    outcomes = map(attack_groups, chunks) if executor is None else executor.map(attack_groups, chunks)
+
+    results = []
+    for done, chunk_results in enumerate(outcomes, 1):
+        results.extend(chunk_results)
+        if ctx is not None:
+            ctx.check()
+            ctx.report(done, len(chunks), f"攻击分组 {len(results)}/{len(groups)}")
+    results.sort(key=lambda result: (result.n, result.slot))
+    return results
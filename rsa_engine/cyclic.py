@@ -0,0 +1,77 @@
+# 循环加密攻击
+# 对密文反复做公钥加密：c, c^e, c^(e^2), ... (mod n)，序列回到 c 时前一项就是明文。
+# 广义版本在迭代过程中检查 gcd(c^(e^i) - c, n)：序列在模 p 或模 q 下先于模 n 回到 c 时即可分解 n。
+# 差值累乘后每 gcd_interval 步才求一次 gcd，把 gcd 的开销摊薄到一次模乘。
+from dataclasses import dataclass
+from typing import Optional
+
+from gmpy2 import gcd, invert, mpz, powmod
+
+from .attacks import RecoveredKey
+
+# 默认迭代上限
+DEFAULT_CYCLE_ITERATIONS = 1_000_000
+# 每多少步累乘差值后求一次 gcd，同时检查取消和上报进度
+GCD_INTERVAL = 256
+
+
+@dataclass(frozen=True)
+class CyclicResult:
+    """循环加密攻击的结果：明文整数、用掉的迭代次数，以及分解出 n 时恢复的私钥参数。"""
+    plaintext: int
+    iterations: int
+    key: Optional[RecoveredKey] = None
+
+
+def _factor_result(g, n, e, c, iterations) -> CyclicResult:
+    """由 n 的非平凡因子 g 恢复私钥并解密 c。"""
+    p, q = int(g), int(n // g)
+    d = int(invert(e, (p - 1) * (q - 1)))
+    return CyclicResult(int(powmod(c, d, n)), iterations, RecoveredKey(p, q, d))
+
+
+def cyclic_attack(n: int, e: int, c: int, max_iterations: int = DEFAULT_CYCLE_ITERATIONS,
+                  gcd_interval: Optional[int] = GCD_INTERVAL, ctx=None) -> Optional[CyclicResult]:
+    """
+    循环加密攻击：找到最小的 i 使 c^(e^i) ≡ c (mod n)，则 m = c^(e^(i-1))。
+    gcd_interval 不为 None 时使用广义版本，序列先在模 p 或模 q 下闭合时直接分解 n。
+    超出 max_iterations 仍未闭合时返回 None。
+    """
+    n, e = mpz(n), mpz(e)
+    c = mpz(c) % n
+    current = c
+    product = mpz(1)
+    pending = []  # 自上次求 gcd 以来的序列项，累乘结果为 0 时逐个回溯
+
+    def check_gcd(iterations):
+        g = gcd(product, n)
+        if g == n:
+            # 同一批里分别出现了 p 和 q 的因子，逐项求 gcd 找到单独的那个
+            for value in pending:
+                g = gcd(value - c, n)
+                if g != 1:
+                    break
+        if 1 < g < n:
+            return _factor_result(g, n, e, c, iterations)
+        return None
+
+    for i in range(1, max_iterations + 1):
+        following = powmod(current, e, n)
+        if following == c:
+            return CyclicResult(int(current), i)  # 序列回到 c，上一项就是明文
+        if gcd_interval is not None:
+            product = product * (following - c) % n
+            pending.append(following)
+            if i % gcd_interval == 0:
+                found = check_gcd(i)
+                if found is not None:
+                    return found
+                product = mpz(1)
+                pending.clear()
+        if ctx is not None and i % GCD_INTERVAL == 0:
+            ctx.check()
+            ctx.report(i, max_iterations, f"第 {i} 次迭代")
+        current = following
+
+    # 最后一批不足 gcd_interval 项
+    return check_gcd(max_iterations) if pending else None
@@ -0,0 +1,466 @@
+# 整数分解
+# 小素数试除 + Pollard rho（Brent 变体），用于分解攻击中出现的中等大小的整数并枚举其因子；
+# 以及 Pollard p-1、Williams p+1 和椭圆曲线法（ECM），由 factor_race 在进程池中同时对同一个 n 运行，
+# 先找到因子的方法胜出，其余子任务随即停止。
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from math import prod
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import gmpy2
+from gmpy2 import gcd, invert, isqrt, mpz, powmod
+
+from .attacks import RecoveredKey
+from .primes import SMALL_PRIME_LIMIT, SMALL_PRIMES, is_probable_prime
+
+# Brent 算法中每批累乘多少个差值后再求一次 gcd
+RHO_BATCH = 128
+# prime_range 用 SMALL_PRIMES 筛选，能处理的上界
+PRIME_RANGE_LIMIT = SMALL_PRIME_LIMIT * SMALL_PRIME_LIMIT
+# 第一阶段每批相乘的素数幂个数（每批之后求一次 gcd 并检查是否该停止），第二阶段每段筛选的区间长度
+STAGE1_CHUNK = 256
+STAGE2_SEGMENT = 1 << 15
+# p-1 / p+1 第一轮的 B1，以后每轮扩大 BOUND_GROWTH 倍；p-1 第二阶段的上界为 PM1_B2_RATIO × B1
+PM1_B1 = 10_000
+PP1_B1 = 10_000
+BOUND_GROWTH = 4
+PM1_B2_RATIO = 100
+# Williams p+1 同时尝试的几个起始值（各自对应不同的二次扩域，至少一个能让 p+1 生效的概率较大）
+PP1_SEEDS = (3, 5, 7)
+# ECM 第一条曲线的 B1、每换一条曲线 B1 的增长率，以及第二阶段的上界倍数
+ECM_B1 = 2_000
+ECM_B1_GROWTH = 1.1
+ECM_B2_RATIO = 50
+# 分解调度中每个方法默认的时间预算（秒），以及子任务查询跨进程停止事件的最短间隔（秒）
+DEFAULT_METHOD_BUDGET = 10.0
+EVENT_POLL_INTERVAL = 0.05
+
+
+def pollard_rho_brent(n, c=1, max_steps=None, stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Pollard rho 的 Brent 变体：返回 n 的一个非平凡因子（n 必须是奇合数）。
+    差值先累乘再求 gcd，累乘结果为 0 时回退到逐步求 gcd。
+    max_steps 限制迭代总步数，超出或 stop() 返回 True 时返回 None。
+    """
+    n = mpz(n)
+    steps = 0
+    while True:
+        y, r, q, g = mpz(2), 1, mpz(1), mpz(1)
+        x = ys = y
+        while g == 1:
+            if max_steps is not None and steps >= max_steps:
+                return None
+            steps += 2 * r
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(RHO_BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += RHO_BATCH
+                if stop is not None and g == 1 and stop():
+                    return None
+            r *= 2
+        if g == n:
+            # 批量累乘越过了因子，从最近的检查点逐步重算
+            while True:
+                ys = (ys * ys + c) % n
+                g = gcd(abs(x - ys), n)
+                if g > 1:
+                    break
+        if g != n:
+            return int(g)
+        c += 1  # 这条序列失败，换一个多项式常数重试
+
+
+def factorint(n, max_steps=None) -> Optional[Dict[int, int]]:
+    """
+    分解 n（n ≥ 1），返回 {素因子: 指数}。
+    max_steps 限制每次 Pollard rho 的步数，某个因子在限制内分解不出来时返回 None。
+    """
+    n = mpz(n)
+    factors: Dict[int, int] = {}
+    twos = gmpy2.bit_scan1(n) if n else 0  # SMALL_PRIMES 只含奇素数，2 的幂单独处理
+    if twos:
+        factors[2] = twos
+        n >>= twos
+    for p in SMALL_PRIMES:
+        if p * p > n:
+            break
+        if n % p == 0:
+            count = 0
+            while n % p == 0:
+                n //= p
+                count += 1
+            factors[p] = count
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if m < SMALL_PRIMES[-1] ** 2 or is_probable_prime(m):
+            # 试除已经排除了所有小素因子，剩下不超过最大小素数平方的数必为素数
+            factors[int(m)] = factors.get(int(m), 0) + 1
+            continue
+        if gmpy2.is_square(m):
+            root = gmpy2.isqrt(m)
+            stack.extend((root, root))
+            continue
+        d = pollard_rho_brent(m, max_steps=max_steps)
+        if d is None:
+            return None
+        stack.extend((mpz(d), m // d))
+    return factors
+
+
+def divisors(factors: Dict[int, int]) -> List[int]:
+    """由 {素因子: 指数} 生成全部因子（升序）。"""
+    result = [1]
+    for p, count in factors.items():
+        result = [d * p ** i for d in result for i in range(count + 1)]
+    return sorted(result)
+
+
+def prime_range(lo: int, hi: int) -> List[int]:
+    """[lo, hi) 内的全部素数，用 SMALL_PRIMES 分段筛出；hi 不能超过 PRIME_RANGE_LIMIT。"""
+    lo = max(lo, 2)
+    if hi <= lo:
+        return []
+    if hi > PRIME_RANGE_LIMIT:
+        raise ValueError(f"素数区间上界不能超过 {PRIME_RANGE_LIMIT}")
+    flags = bytearray(b"\x01") * (hi - lo)
+    limit = int(isqrt(hi - 1))
+    for p in [2] + SMALL_PRIMES:
+        if p > limit:
+            break
+        start = max(p * p, -(-lo // p) * p)
+        flags[start - lo::p] = bytes(len(range(start, hi, p)))
+    return [lo + i for i, flag in enumerate(flags) if flag]
+
+
+def _exponent(p: int, bound: int) -> int:
+    """使 p^k ≤ bound 的最大 k。"""
+    k, power = 0, p
+    while power <= bound:
+        k += 1
+        power *= p
+    return k
+
+
+def prime_power_chunks(lo: int, hi: int) -> Iterator[List[int]]:
+    """
+    把第一阶段的指数从 B1 = lo 扩展到 B1 = hi 所需的素数幂，按 STAGE1_CHUNK 个一组给出。
+    (lo, hi] 内的素数取不超过 hi 的最高次幂；不超过 lo 的小素数补上从 lo 到 hi 增加的次数。
+    """
+    powers = []
+    for p in prime_range(2, min(lo, int(isqrt(hi))) + 1):
+        extra = _exponent(p, hi) - _exponent(p, lo)
+        if extra:
+            powers.append(p ** extra)
+    for segment in range(lo + 1, hi + 1, STAGE2_SEGMENT):
+        for p in prime_range(segment, min(segment + STAGE2_SEGMENT, hi + 1)):
+            powers.append(p ** _exponent(p, hi))
+            if len(powers) == STAGE1_CHUNK:
+                yield powers
+                powers = []
+    if powers:
+        yield powers
+
+
+def _stage2_primes(lo: int, hi: int) -> Iterator[List[int]]:
+    """第二阶段：(lo, hi] 内的素数，按 STAGE2_SEGMENT 分段给出。"""
+    hi = min(hi, PRIME_RANGE_LIMIT - 1)
+    for segment in range(lo + 1, hi + 1, STAGE2_SEGMENT):
+        yield prime_range(segment, min(segment + STAGE2_SEGMENT, hi + 1))
+
+
+def pollard_pm1(n, b1: int = PM1_B1, stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Pollard p-1：n 的某个素因子 p 满足 p - 1 是 B1-光滑数（第二阶段允许再多一个不超过 B2 的素因子）时找到 p。
+    B1 从 b1 开始每轮扩大 BOUND_GROWTH 倍，直到 stop() 返回 True；第一阶段的结果在轮次之间累积。
+    """
+    n = mpz(n)
+    a = mpz(2)
+    lo, bound = 0, b1
+    while bound < PRIME_RANGE_LIMIT:
+        for powers in prime_power_chunks(lo, bound):
+            previous = a
+            a = powmod(a, prod(powers), n)
+            g = gcd(a - 1, n)
+            if g == n:
+                # 这一批里同时覆盖了 p - 1 和 q - 1，逐个素数幂回退
+                for power in powers:
+                    previous = powmod(previous, power, n)
+                    g = gcd(previous - 1, n)
+                    if g != 1:
+                        break
+            if g != 1:
+                return int(g) if g != n else None
+            if stop is not None and stop():
+                return None
+
+        # 第二阶段：a^q，q 为 (B1, B2] 内的素数，相邻素数之差的幂缓存起来连乘
+        steps = {}
+        x, previous_q, accumulated = None, None, mpz(1)
+        for primes in _stage2_primes(bound, bound * PM1_B2_RATIO):
+            for q in primes:
+                if x is None:
+                    x = powmod(a, q, n)
+                else:
+                    gap = q - previous_q
+                    step = steps.get(gap)
+                    if step is None:
+                        step = steps[gap] = powmod(a, gap, n)
+                    x = x * step % n
+                previous_q = q
+                accumulated = accumulated * (x - 1) % n
+            g = gcd(accumulated, n)
+            if 1 < g < n:
+                return int(g)
+            if g == n or (stop is not None and stop()):
+                return None
+        lo, bound = bound, bound * BOUND_GROWTH
+    return None
+
+
+def _lucas(v, k, n):
+    """Lucas 序列 V_k(v) mod n（V_0 = 2，V_1 = v），Montgomery 阶梯。"""
+    x, y = v, (v * v - 2) % n
+    for i in range(k.bit_length() - 2, -1, -1):
+        if gmpy2.bit_test(k, i):
+            x, y = (x * y - v) % n, (y * y - 2) % n
+        else:
+            x, y = (x * x - 2) % n, (x * y - v) % n
+    return x
+
+
+def williams_pp1(n, b1: int = PP1_B1, seeds=PP1_SEEDS, stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+    """
+    Williams p+1：起始值 v 使 v² - 4 为模 p 的二次非剩余、且 p + 1 是 B1-光滑数时找到 p
+    （v² - 4 为二次剩余时退化为 p - 1）。几个起始值同时推进，B1 每轮扩大 BOUND_GROWTH 倍。
+    """
+    n = mpz(n)
+    values = [mpz(seed) for seed in seeds]
+    lo, bound = 0, b1
+    while values and bound < PRIME_RANGE_LIMIT:
+        for powers in prime_power_chunks(lo, bound):
+            exponent = mpz(prod(powers))
+            survivors = []
+            for v in values:
+                v = _lucas(v, exponent, n)
+                g = gcd(v - 2, n)
+                if 1 < g < n:
+                    return int(g)
+                if g == 1:
+                    survivors.append(v)  # g == n 时这个起始值已经退化，丢弃
+            values = survivors
+            if not values or (stop is not None and stop()):
+                return None
+        lo, bound = bound, bound * BOUND_GROWTH
+    return None
+
+
+def _xdbl(x, z, a24, n):
+    """Montgomery 曲线上的 x 坐标倍点（射影坐标）。"""
+    s = (x + z) * (x + z)
+    d = (x - z) * (x - z)
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _xadd(x1, z1, x2, z2, xd, zd, n):
+    """已知 P1 - P2 = (xd : zd) 时求 P1 + P2。"""
+    u = (x1 - z1) * (x2 + z2)
+    v = (x1 + z1) * (x2 - z2)
+    return zd * (u + v) * (u + v) % n, xd * (u - v) * (u - v) % n
+
+
+def _ladder(x, z, k, a24, n):
+    """Montgomery 阶梯计算 [k](x : z)。"""
+    x1, z1 = x, z
+    x2, z2 = _xdbl(x, z, a24, n)
+    for i in range(k.bit_length() - 2, -1, -1):
+        if gmpy2.bit_test(k, i):
+            x1, z1 = _xadd(x2, z2, x1, z1, x, z, n)
+            x2, z2 = _xdbl(x2, z2, a24, n)
+        else:
+            x2, z2 = _xadd(x1, z1, x2, z2, x, z, n)
+            x1, z1 = _xdbl(x1, z1, a24, n)
+    return x1, z1
+
+
+def ecm(n, b1: int = ECM_B1, stop: Optional[Callable[[], bool]] = None, rng=None) -> Optional[int]:
+    """
+    椭圆曲线分解（Montgomery 曲线，Suyama 参数化）。
+    每条随机曲线做第一阶段（B1）和第二阶段（B2 = ECM_B2_RATIO × B1），失败后换一条曲线并把 B1 提高 ECM_B1_GROWTH 倍，
+    直到 stop() 返回 True。
+    """
+    n = mpz(n)
+    rng = rng or random.Random()
+    bound = b1
+    while bound < PRIME_RANGE_LIMIT:
+        sigma = mpz(rng.randrange(6, n - 1))
+        u = (sigma * sigma - 5) % n
+        v = 4 * sigma % n
+        denominator = 16 * powmod(u, 3, n) * v % n
+        g = gcd(denominator, n)
+        if g != 1:
+            if g != n:
+                return int(g)
+            bound = int(bound * ECM_B1_GROWTH)
+            continue
+        a24 = powmod(v - u, 3, n) * (3 * u + v) * invert(denominator, n) % n
+        x, z = powmod(u, 3, n), powmod(v, 3, n)
+
+        for powers in prime_power_chunks(0, bound):
+            x, z = _ladder(x, z, mpz(prod(powers)), a24, n)
+            if stop is not None and stop():
+                return None
+        g = gcd(z, n)
+        if 1 < g < n:
+            return int(g)
+
+        if g == 1:
+            # 第二阶段：依次走过 B1 之后的奇数 m，R_(m+2) = R_m + [2]Q（差为 R_(m-2)），m 为素数时累乘 Z(R_m)
+            x2, z2 = _xdbl(x, z, a24, n)
+            m = bound + 1 + bound % 2
+            rx, rz = _ladder(x, z, mpz(m), a24, n)
+            px, pz = _ladder(x, z, mpz(m - 2), a24, n)
+            accumulated = mpz(1)
+            for primes in _stage2_primes(bound, bound * ECM_B2_RATIO):
+                for q in primes:
+                    while m < q:
+                        rx, rz, px, pz = *_xadd(rx, rz, x2, z2, px, pz, n), rx, rz
+                        m += 2
+                    accumulated = accumulated * rz % n
+                g = gcd(accumulated, n)
+                if g != 1 or (stop is not None and stop()):
+                    break
+            if 1 < g < n:
+                return int(g)
+            if stop is not None and stop():
+                return None
+        bound = int(bound * ECM_B1_GROWTH)
+    return None
+
+
+# 分解调度中可用的方法
+FACTOR_METHODS = {
+    "Pollard rho": pollard_rho_brent,
+    "Pollard p-1": pollard_pm1,
+    "Williams p+1": williams_pp1,
+    "ECM": ecm,
+}
+
+
+def budget_stop(budget: float, stop_event=None) -> Callable[[], bool]:
+    """返回一个停止条件：超出时间预算，或跨进程停止事件已置位（事件最多每 EVENT_POLL_INTERVAL 秒查询一次）。"""
+    deadline = time.perf_counter() + budget
+    next_poll = 0.0
+
+    def stop():
+        nonlocal next_poll
+        now = time.perf_counter()
+        if now >= deadline:
+            return True
+        if stop_event is not None and now >= next_poll:
+            next_poll = now + EVENT_POLL_INTERVAL
+            return stop_event.is_set()
+        return False
+
+    return stop
+
+
+def run_method(method: str, n: int, budget: float, stop_event=None) -> Optional[int]:
+    """子任务：在时间预算内用指定的方法分解 n，返回一个非平凡因子或 None。"""
+    factor = FACTOR_METHODS[method](n, stop=budget_stop(budget, stop_event))
+    return factor if factor is not None and 1 < factor < n else None
+
+
+def _easy_factor(n: int) -> Optional[int]:
+    """偶数、含小素因子或完全平方数的 n 不必启动调度。"""
+    if n % 2 == 0:
+        return 2
+    for p in SMALL_PRIMES:
+        if n % p == 0 and p < n:
+            return p
+    if gmpy2.is_square(n):
+        return int(isqrt(n))
+    return None
+
+
+def factor_race(n: int, executor=None, manager=None, budgets: Optional[Dict[str, float]] = None,
+                ctx=None) -> Optional[Tuple[str, int]]:
+    """
+    同时用多种方法分解 n，返回 (方法名, 非平凡因子)；所有方法都在各自的时间预算内失败时返回 None。
+    budgets 为 {方法名: 秒数}，默认 FACTOR_METHODS 中的每个方法各 DEFAULT_METHOD_BUDGET 秒。
+    executor 为进程池时每个方法一个子任务，先返回因子的胜出，随即置位停止事件并撤销其余子任务；
+    executor 为 None 时在当前进程中依次尝试。n 为素数时抛出 ValueError。
+    """
+    n = int(n)
+    if n < 4 or is_probable_prime(n):
+        raise ValueError("n 是素数（或小于 4），无法分解")
+    factor = _easy_factor(n)
+    if factor is not None:
+        return "试除", factor
+    budgets = budgets or {method: DEFAULT_METHOD_BUDGET for method in FACTOR_METHODS}
+    total = max(budgets.values())
+    started = time.perf_counter()
+
+    if executor is None:
+        for index, (method, budget) in enumerate(budgets.items()):
+            if ctx is not None:
+                ctx.check()
+                ctx.report(index, len(budgets), method)
+            factor = run_method(method, n, budget)
+            if factor is not None:
+                return method, factor
+        return None
+
+    stop_event = manager.Event() if manager is not None else None
+    running = {executor.submit(run_method, method, n, budget, stop_event): method
+               for method, budget in budgets.items()}
+    try:
+        pending = set(running)
+        while pending:
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                factor = future.result()
+                if factor is not None:
+                    return running[future], factor
+            if ctx is not None:
+                ctx.check()
+                elapsed = time.perf_counter() - started
+                names = "、".join(sorted(running[future] for future in pending))
+                ctx.report(int(min(elapsed, total) * 1000), int(total * 1000), f"运行中：{names}")
+        return None
+    finally:
+        # 找到因子、取消或异常时通知所有子任务停止
+        if stop_event is not None:
+            stop_event.set()
+        for future in running:
+            future.cancel()
+
+
+def factor_attack(e: int, n: int, executor=None, manager=None, budget: float = DEFAULT_METHOD_BUDGET,
+                  ctx=None) -> Optional[Tuple[str, RecoveredKey]]:
+    """
+    用 factor_race 分解 n（每个方法 budget 秒）并计算私钥 d，返回 (胜出的方法名, RecoveredKey)。
+    n 不是两个素数的乘积或 e 与 φ(n) 不互质时抛出 ValueError。
+    """
+    found = factor_race(n, executor, manager, {method: budget for method in FACTOR_METHODS}, ctx)
+    if found is None:
+        return None
+    method, p = found
+    q = n // p
+    p, q = min(p, q), max(p, q)
+    if not (is_probable_prime(p) and is_probable_prime(q)):
+        raise ValueError(f"{method} 找到了因子 {p}，但 n 不是两个素数的乘积")
+    # n = p² 时 φ(n) = p(p - 1)
+    phi_n = p * (p - 1) if p == q else (p - 1) * (q - 1)
+    if gcd(e, phi_n) != 1:
+        raise ValueError("已分解 n，但 e 与 φ(n) 不互质，无法计算私钥 d")
+    return method, RecoveredKey(p, q, int(invert(e, phi_n)))
@@ -0,0 +1,85 @@
+# Fermat 分解
+# p、q 很接近时，n = a² - b²，其中 a = (p + q) / 2、b = (q - p) / 2，从 a = ⌈√n⌉ 开始向上找使 a² - n 为完全平方数的 a。
+# |q - p| ≤ 2^(bits/4) 时第一个候选 a 就能命中，间距更大时需要的步数约为 (q - p)² / (8√n)。
+# 候选先经过二次剩余筛：a² - n 必须是模 WHEEL 和模若干小素数的平方剩余，
+# 只有通过筛选的少数候选才做大整数的平方判断。
+import time
+from typing import Optional, Tuple
+
+from gmpy2 import gcd, invert, is_square, isqrt, mpz
+
+from .attacks import RecoveredKey
+
+# 轮子模数 16·9·5·7：按轮子跳过所有 a² - n 不是平方剩余的 a
+WHEEL = 5040
+# 轮子之后再逐个检查的小素数模
+FILTER_MODULI = (11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+# 默认的时间预算（秒）
+DEFAULT_FERMAT_BUDGET = 10.0
+
+
+def _residue_table(n, m: int) -> bytes:
+    """返回长度为 m 的表，第 r 项为 1 表示 a ≡ r (mod m) 时 a² - n 是模 m 的平方剩余。"""
+    squares = bytearray(m)
+    for x in range(m):
+        squares[x * x % m] = 1
+    n_mod = int(n % m)
+    return bytes(squares[(r * r - n_mod) % m] for r in range(m))
+
+
+def fermat_factor(n: int, budget: float = DEFAULT_FERMAT_BUDGET, ctx=None) -> Optional[Tuple[int, int]]:
+    """
+    Fermat 分解，返回 (p, q)，p ≤ q。
+    超出时间预算 budget（秒）或 n 没有除 1 和自身以外的因子时返回 None。
+    """
+    n = mpz(n)
+    if n < 4:
+        return None
+    if n % 2 == 0:
+        return 2, int(n // 2)
+    a0 = isqrt(n)
+    if a0 * a0 == n:
+        return int(a0), int(a0)
+    a0 += 1
+
+    # 从 a0 出发，一圈轮子内所有可能的偏移
+    wheel = _residue_table(n, WHEEL)
+    start = int(a0 % WHEEL)
+    steps = [d for d in range(WHEEL) if wheel[(start + d) % WHEEL]]
+    filters = [(m, _residue_table(n, m), int(a0 % m)) for m in FILTER_MODULI]
+    # a > (n + 9) / 6 时对应的 p < 3，奇数 n 不必再找
+    limit = (n + 9) // 6 - a0
+
+    started = time.perf_counter()
+    base = 0
+    while base <= limit:
+        for d in steps:
+            offset = base + d
+            if not all(table[(r + offset) % m] for m, table, r in filters):
+                continue
+            a = a0 + offset
+            b2 = a * a - n
+            if is_square(b2):
+                b = isqrt(b2)
+                if a - b > 1:
+                    return int(a - b), int(a + b)
+        base += WHEEL
+        elapsed = time.perf_counter() - started
+        if elapsed > budget:
+            return None
+        if ctx is not None:
+            ctx.check()
+            ctx.report(int(elapsed * 1000), int(budget * 1000), f"a = ⌈√n⌉ + {base}")
+    return None
+
+
+def fermat_attack(e: int, n: int, budget: float = DEFAULT_FERMAT_BUDGET, ctx=None) -> Optional[RecoveredKey]:
+    """用 Fermat 分解 n 并计算私钥 d，找到时返回 RecoveredKey，超出时间预算时返回 None。"""
+    factors = fermat_factor(n, budget, ctx)
+    if factors is None:
+        return None
+    p, q = factors
+    phi_n = p * (p - 1) if p == q else (p - 1) * (q - 1)
+    if gcd(e, phi_n) != 1:
+        raise ValueError("已分解 n，但 e 与 φ(n) 不互质，无法计算私钥 d")
+    return RecoveredKey(p, q, int(invert(e, phi_n)))
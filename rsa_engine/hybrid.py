@@ -0,0 +1,125 @@
+# RSA + AES-GCM 混合文件加密
+# 用 RSA 公钥封装随机会话密钥，文件内容按固定大小分块流式地用 AES-GCM 加密。
+# 输入文件通过 mmap 读取，输出使用带缓冲的写入，内存占用与文件大小无关。
+# 文件格式：
+#   magic(4) | 封装密钥长度(2) | 分块大小(4) | nonce 前缀(4) | 封装密钥 | 分块密文 1 | 分块密文 2 | ...
+# 每个分块密文为 明文 + 16 字节认证标签，除最后一块外明文长度都等于分块大小。
+# 第 i 块的 nonce 为 nonce 前缀 + i（8 字节），附加数据为文件头 + i + 是否最后一块，
+# 因此分块被截断、重排或替换都会导致认证失败。
+import mmap
+import os
+import struct
+
+import rsa
+import rsa.common
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+HYBRID_MAGIC = b"RSH1"
+HYBRID_HEADER = struct.Struct(">4sHI4s")
+CHUNK_AAD = struct.Struct(">Q?")
+DEFAULT_CHUNK_SIZE = 1 << 20
+TAG_SIZE = 16
+# 输出缓冲区大小
+WRITE_BUFFER = 1 << 20
+
+
+def session_key_size(pubkey) -> int:
+    """公钥能够封装的最大 AES 密钥长度（PKCS#1 v1.5 需要 11 字节填充）。"""
+    capacity = rsa.common.byte_size(pubkey.n) - 11
+    for size in (32, 16):
+        if capacity >= size:
+            return size
+    raise ValueError("公钥太短，无法封装 AES 会话密钥")
+
+
+def _chunk_nonce(prefix, index):
+    return prefix + index.to_bytes(8, "big")
+
+
+class _MappedInput:
+    """以 mmap 打开输入文件；空文件无法映射，退化为空字节串。"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.size:
+            self.data.close()
+        self._file.close()
+
+
+def _report(ctx, done, total):
+    if ctx is not None:
+        ctx.check()
+        ctx.report(done, total, f"{done / 1048576:.1f} / {total / 1048576:.1f} MB")
+
+
+def encrypt_file(src, dst, pubkey, chunk_size=DEFAULT_CHUNK_SIZE, ctx=None):
+    """流式加密文件，返回写入的密文字节数。"""
+    session_key = AESGCM.generate_key(bit_length=session_key_size(pubkey) * 8)
+    wrapped = rsa.encrypt(session_key, pubkey)
+    prefix = os.urandom(4)
+    header = HYBRID_HEADER.pack(HYBRID_MAGIC, len(wrapped), chunk_size, prefix) + wrapped
+    aead = AESGCM(session_key)
+
+    with _MappedInput(src) as source, open(dst, "wb", buffering=WRITE_BUFFER) as out:
+        out.write(header)
+        written = len(header)
+        index = 0
+        offset = 0
+        while True:
+            chunk = source.data[offset:offset + chunk_size]
+            offset += len(chunk)
+            final = offset >= source.size
+            sealed = aead.encrypt(_chunk_nonce(prefix, index), chunk, header + CHUNK_AAD.pack(index, final))
+            out.write(sealed)
+            written += len(sealed)
+            _report(ctx, offset, source.size)
+            if final:
+                return written
+            index += 1
+
+
+def decrypt_file(src, dst, privkey, ctx=None):
+    """
+    流式解密文件，返回写入的明文字节数。
+    先写入临时文件，全部分块认证通过后再改名为 dst，失败时不留下不完整的明文。
+    """
+    tmp_path = dst + ".part"
+    try:
+        with _MappedInput(src) as source, open(tmp_path, "wb", buffering=WRITE_BUFFER) as out:
+            data = source.data
+            if source.size < HYBRID_HEADER.size or data[:len(HYBRID_MAGIC)] != HYBRID_MAGIC:
+                raise ValueError("不是有效的混合加密文件")
+            _, wrapped_size, chunk_size, prefix = HYBRID_HEADER.unpack(data[:HYBRID_HEADER.size])
+            header_size = HYBRID_HEADER.size + wrapped_size
+            header = data[:header_size]
+            aead = AESGCM(rsa.decrypt(header[HYBRID_HEADER.size:], privkey))
+
+            sealed_size = chunk_size + TAG_SIZE
+            written = 0
+            index = 0
+            offset = header_size
+            while True:
+                sealed = data[offset:offset + sealed_size]
+                offset += len(sealed)
+                final = offset >= source.size
+                if len(sealed) < TAG_SIZE:
+                    raise ValueError("密文文件被截断")
+                chunk = aead.decrypt(_chunk_nonce(prefix, index), sealed, header + CHUNK_AAD.pack(index, final))
+                out.write(chunk)
+                written += len(chunk)
+                _report(ctx, offset, source.size)
+                if final:
+                    break
+                index += 1
+        os.replace(tmp_path, dst)
+        return written
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,235 @@
+# 后台任务子系统
+# 把耗时的密钥生成、攻击等操作放到线程池或进程池中执行，
+# 通过 poll() 在调用方线程（通常是 Tk 主循环里的 master.after 回调）中分发进度和结果。
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .tracing import tracer
+
+# 进度上报的最小间隔（秒），避免工作进程频繁跨进程写队列
+PROGRESS_INTERVAL = 0.05
+
+
+class JobCancelled(Exception):
+    """任务被取消时由 JobContext.check() 抛出。"""
+
+
+class JobContext:
+    """
+    传给任务函数的上下文对象。
+    任务函数通过 report() 上报进度，通过 check() 或 cancelled 响应取消。
+    线程任务使用 threading.Event / queue，进程任务使用 Manager 代理对象，两者都可以被 pickle。
+    """
+
+    def __init__(self, job_id, cancel_event, progress_queue):
+        self.job_id = job_id
+        self._cancel_event = cancel_event
+        self._progress_queue = progress_queue
+        self._last_report = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check(self):
+        """如果任务已被取消，抛出 JobCancelled。"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, done, total=None, message=""):
+        """上报进度；除最终进度外按 PROGRESS_INTERVAL 节流。"""
+        now = time.monotonic()
+        if total is not None and done >= total or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self._progress_queue.put((self.job_id, done, total, message))
+
+
+def _run_job(fn, ctx, args, kwargs):
+    """在工作线程/进程中执行任务函数，并注入上下文。"""
+    ctx.check()
+    return fn(*args, ctx=ctx, **kwargs)
+
+
+class Job:
+    """一个已提交的后台任务。"""
+
+    def __init__(self, job_id, name, future, ctx, cancel_event, on_done, on_error, on_progress):
+        self.id = job_id
+        self.name = name
+        self.future = future
+        self.ctx = ctx
+        self._cancel_event = cancel_event
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.status = "running"
+        self.done = 0
+        self.total = None
+        self.message = ""
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def _finished(self, _future):
+        """future 完成时（在完成它的线程中）记下耗时，不受 poll() 间隔影响。"""
+        self.elapsed = time.perf_counter() - self.started
+
+    def cancel(self):
+        """请求取消任务：尚未开始的直接撤销，已在运行的由任务函数自行检查退出。"""
+        self._cancel_event.set()
+        self.future.cancel()
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """当前进度比例，总量未知时返回 None。"""
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+
+class JobRunner:
+    """
+    后台任务调度器。
+    mode='thread' 的任务在线程池中运行，适合 I/O 或释放 GIL 的计算；
+    mode='process' 的任务在进程池中运行，可以占满所有核心，任务函数必须是可 pickle 的模块级函数。
+    任务函数签名为 fn(*args, ctx=JobContext, **kwargs)。
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._processes = None
+        self._manager = None
+        self._thread_progress = queue.SimpleQueue()
+        self._process_progress = None
+        self._jobs: Dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ensure_processes(self):
+        """进程池和 Manager 都按需创建，不使用进程任务时不付出启动代价。"""
+        if self._processes is None:
+            self._manager = multiprocessing.Manager()
+            self._process_progress = self._manager.Queue()
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._processes
+
+    @property
+    def processes(self) -> ProcessPoolExecutor:
+        """共享的进程池，供需要自行拆分子任务的引擎函数使用。"""
+        return self._ensure_processes()
+
+    @property
+    def manager(self):
+        """与进程池配套的 Manager，用于创建跨进程的 Event 等共享对象。"""
+        self._ensure_processes()
+        return self._manager
+
+    def submit(self, fn: Callable, *args, name: str = "", mode: str = "thread",
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_progress: Optional[Callable[[Job], None]] = None, **kwargs) -> Job:
+        """提交一个任务，回调都在 poll() 的调用线程中执行。"""
+        job_id = next(self._ids)
+        if mode == "process":
+            executor = self._ensure_processes()
+            cancel_event = self._manager.Event()
+            ctx = JobContext(job_id, cancel_event, self._process_progress)
+        elif mode == "thread":
+            executor = self._threads
+            cancel_event = threading.Event()
+            ctx = JobContext(job_id, cancel_event, self._thread_progress)
+        else:
+            raise ValueError(f"未知的任务模式: {mode}")
+
+        future = executor.submit(_run_job, fn, ctx, args, kwargs)
+        job = Job(job_id, name or getattr(fn, "__name__", "job"), future, ctx, cancel_event,
+                  on_done, on_error, on_progress)
+        future.add_done_callback(job._finished)
+        with self._lock:
+            self._jobs[job_id] = job
+        return job
+
+    def _drain(self, progress_queue):
+        while True:
+            try:
+                job_id, done, total, message = progress_queue.get_nowait()
+            except (queue.Empty, EOFError, OSError):
+                return
+            job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            job.done, job.total, job.message = done, total, message
+            if job.on_progress:
+                try:
+                    job.on_progress(job)
+                except Exception:
+                    traceback.print_exc()
+
+    def poll(self) -> int:
+        """分发进度和完成回调，返回仍在运行的任务数。"""
+        self._drain(self._thread_progress)
+        if self._process_progress is not None:
+            self._drain(self._process_progress)
+
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.future.done()]
+            for job in finished:
+                del self._jobs[job.id]
+
+        for job in finished:
+            if not job.elapsed:
+                job.elapsed = time.perf_counter() - job.started  # 完成回调还没来得及运行
+            try:
+                result = job.future.result()
+            except (JobCancelled, CancelledError):
+                job.status = "cancelled"
+            except Exception as exc:
+                job.status = "failed"
+                self._report_error(job, exc)
+            else:
+                job.status = "done"
+                tracer.record(job.name, job.elapsed)  # 成功完成的后台任务计入该操作的耗时分布
+                if job.on_done:
+                    try:
+                        job.on_done(result)
+                    except Exception as exc:
+                        # 处理结果时出错（如解密结果不是 UTF-8）也算任务失败，不能影响其他任务的回调
+                        job.status = "failed"
+                        self._report_error(job, exc)
+
+        return len(self._jobs)
+
+    @staticmethod
+    def _report_error(job: Job, exc: Exception):
+        """交给任务的 on_error；没有 on_error 或 on_error 本身出错时打印到标准错误。"""
+        if job.on_error is None:
+            traceback.print_exception(exc)
+            return
+        try:
+            job.on_error(exc)
+        except Exception:
+            traceback.print_exc()
+
+    def running(self) -> List[Job]:
+        """按提交顺序返回未完成的任务。"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel_all(self):
+        for job in self.running():
+            job.cancel()
+
+    def shutdown(self):
+        """取消所有任务并关闭线程池、进程池。"""
+        self.cancel_all()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
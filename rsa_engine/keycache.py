@@ -0,0 +1,128 @@
+# 私钥缓存与 CRT 快速解密
+# 按 PEM 文本的指纹缓存解析后的私钥，预先计算 CRT 参数 dp、dq、qinv，
+# 解密时用 gmpy2.powmod 做两次半长度的模幂，并保留与 rsa 库相同的盲化保护。
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+import rsa
+import rsa.common
+from gmpy2 import invert, mpz, powmod
+
+from .tracing import span
+
+# 缓存的私钥数量上限
+KEY_CACHE_SIZE = 16
+
+
+def fingerprint(pem) -> str:
+    """PEM 文本（忽略首尾空白）的 SHA-256 指纹。"""
+    if isinstance(pem, str):
+        pem = pem.encode("utf-8")
+    return hashlib.sha256(pem.strip()).hexdigest()
+
+
+class CachedPrivateKey:
+    """预计算了 CRT 参数的私钥，key 属性保留原始的 rsa.PrivateKey。"""
+
+    def __init__(self, privkey: rsa.PrivateKey):
+        self.key = privkey
+        self.n = mpz(privkey.n)
+        self.e = mpz(privkey.e)
+        self.p = mpz(privkey.p)
+        self.q = mpz(privkey.q)
+        self.dp = mpz(privkey.d) % (self.p - 1)
+        self.dq = mpz(privkey.d) % (self.q - 1)
+        self.qinv = invert(self.q, self.p)
+        self.byte_size = rsa.common.byte_size(privkey.n)
+        self._lock = threading.Lock()
+        self._new_blinding()
+
+    def _new_blinding(self):
+        while True:
+            r = mpz(secrets.randbelow(int(self.n) - 2) + 2)
+            try:
+                self._blind_inv = invert(r, self.n)
+            except ZeroDivisionError:
+                continue
+            self._blind = powmod(r, self.e, self.n)
+            return
+
+    def _next_blinding(self):
+        """取出当前盲化因子对，并以平方方式更新，避免每次都重新求逆。"""
+        with self._lock:
+            blind, blind_inv = self._blind, self._blind_inv
+            self._blind = blind * blind % self.n
+            self._blind_inv = blind_inv * blind_inv % self.n
+        return blind, blind_inv
+
+    def decrypt_int(self, c) -> mpz:
+        """CRT 模幂：m1 = c^dp mod p，m2 = c^dq mod q，m = m2 + q·(qinv·(m1 - m2) mod p)。"""
+        blind, blind_inv = self._next_blinding()
+        c = mpz(c) * blind % self.n
+        m1 = powmod(c, self.dp, self.p)
+        m2 = powmod(c, self.dq, self.q)
+        h = self.qinv * (m1 - m2) % self.p
+        return (m2 + h * self.q) * blind_inv % self.n
+
+    def decrypt(self, ciphertext) -> bytes:
+        """解密 PKCS#1 v1.5 密文（字节串或整数），行为与 rsa.decrypt 一致。"""
+        c = int.from_bytes(ciphertext, "big") if isinstance(ciphertext, (bytes, bytearray)) else ciphertext
+        if c >= self.n or (isinstance(ciphertext, (bytes, bytearray)) and len(ciphertext) > self.byte_size):
+            raise rsa.DecryptionError("Decryption failed")
+        with span("powmod"):
+            cleartext = int(self.decrypt_int(c)).to_bytes(self.byte_size, "big")
+        with span("unpad"):
+            # 00 02 | 至少 8 字节非零填充 | 00 | 明文
+            separator = cleartext.find(b"\x00", 2)
+            if cleartext[:2] != b"\x00\x02" or separator < 10:
+                raise rsa.DecryptionError("Decryption failed")
+            return cleartext[separator + 1:]
+
+
+class KeyCache:
+    """按 PEM 指纹缓存解析后的私钥，超出容量时淘汰最久未用的条目。"""
+
+    def __init__(self, maxsize=KEY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_private(self, pem) -> CachedPrivateKey:
+        """返回缓存的私钥，未命中时解析 PEM 并预计算 CRT 参数。"""
+        key_id = fingerprint(pem)
+        with self._lock:
+            cached = self._keys.get(key_id)
+            if cached is not None:
+                self._keys.move_to_end(key_id)
+                return cached
+
+        if isinstance(pem, str):
+            pem = pem.encode("utf-8")
+        with span("load-key"):
+            cached = CachedPrivateKey(rsa.PrivateKey.load_pkcs1(pem.strip()))
+        with self._lock:
+            self._keys[key_id] = cached
+            while len(self._keys) > self.maxsize:
+                self._keys.popitem(last=False)
+        return cached
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+# 工作进程内按密钥参数缓存，子任务每次收到的是 pickle 后的新 rsa.PrivateKey 对象
+_worker_keys = OrderedDict()
+
+
+def cached_private_key(privkey: rsa.PrivateKey) -> CachedPrivateKey:
+    """返回与 privkey 对应的 CachedPrivateKey，同一进程内只预计算一次。"""
+    key_id = (privkey.n, privkey.d)
+    cached = _worker_keys.get(key_id)
+    if cached is None:
+        cached = _worker_keys[key_id] = CachedPrivateKey(privkey)
+        while len(_worker_keys) > KEY_CACHE_SIZE:
+            _worker_keys.popitem(last=False)
+    return cached
@@ -0,0 +1,147 @@
+# 预生成密钥池
+# 为每种模数比特数预先准备若干密钥对，取用时 O(1) 返回，低于低水位后在后台进程中补充。
+import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Optional
+
+import rsa
+from pyasn1.error import PyAsn1Error
+
+from .keys import KeyPair, generate_keypair
+
+# 持久化文件格式版本
+POOL_FILE_VERSION = 1
+# 持久化文件的权限：其中是明文私钥，只允许当前用户读写
+POOL_FILE_MODE = 0o600
+
+
+class KeyPool:
+    """
+    按模数比特数分组的密钥池。
+    target 为每组保持的密钥数，队列长度（含正在生成的）低于 low_water 时开始补充到 target。
+    path 不为空时启动时载入上次剩余的密钥，close() 时写回；
+    载入后立即删除文件，程序异常退出时也不会把已经取出的密钥再次发出。
+    文件损坏时报告原因并以空池启动。
+    """
+
+    def __init__(self, sizes: Iterable[int] = (), target: int = 4, low_water: int = 2,
+                 path: Optional[str] = None, workers: int = 1, generator=generate_keypair):
+        if not 0 <= low_water <= target:
+            raise ValueError("低水位必须在 0 到 target 之间")
+        self.target = target
+        self.low_water = low_water
+        self.path = path
+        self._generator = generator
+        self._pools: Dict[int, Deque[KeyPair]] = {}
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        for bit_size in sizes:
+            self._track(bit_size)
+        if path:
+            self.load(path)
+        # 补充任务使用独立的小进程池，避免挤占用户前台任务；在载入之后创建，载入出错时不会遗留进程池
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+
+    def _track(self, bit_size):
+        self._pools.setdefault(bit_size, deque())
+        self._pending.setdefault(bit_size, 0)
+
+    def take(self, bit_size: int) -> Optional[KeyPair]:
+        """取出一个密钥对；池为空或未管理该比特数时返回 None，调用方应退回到直接生成。"""
+        with self._lock:
+            pool = self._pools.get(bit_size)
+            keys = pool.popleft() if pool else None
+        if pool is not None:
+            self.refill(bit_size)
+        return keys
+
+    def available(self, bit_size: int) -> int:
+        """当前可以立即取出的密钥数。"""
+        with self._lock:
+            return len(self._pools.get(bit_size, ()))
+
+    def refill(self, bit_size: Optional[int] = None):
+        """检查指定（默认全部）比特数的低水位，必要时提交后台生成任务。"""
+        with self._lock:
+            if self._closed:
+                return
+            sizes = list(self._pools) if bit_size is None else [bit_size]
+            for size in sizes:
+                level = len(self._pools[size]) + self._pending[size]
+                if level >= self.low_water and level > 0:
+                    continue
+                for _ in range(self.target - level):
+                    self._pending[size] += 1
+                    future = self._executor.submit(self._generator, size)
+                    future.add_done_callback(lambda f, size=size: self._on_generated(size, f))
+
+    def _on_generated(self, bit_size, future):
+        with self._lock:
+            self._pending[bit_size] -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._pools[bit_size].append(future.result())
+
+    def load(self, path: str):
+        """载入持久化的密钥并删除文件；文件不存在、版本不符或无法解析时不载入任何密钥。"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"无法读取密钥池文件 {path}: {e}", file=sys.stderr)
+            return
+        if not isinstance(data, dict) or data.get("version") != POOL_FILE_VERSION:
+            return
+
+        # 全部解析成功后才放入池中，文件损坏时不会只载入一部分
+        try:
+            loaded = {}
+            for size, pems in data.get("keys", {}).items():
+                privkeys = [rsa.PrivateKey.load_pkcs1(pem.encode("utf-8")) for pem in pems]
+                loaded[int(size)] = [(rsa.PublicKey(privkey.n, privkey.e), privkey) for privkey in privkeys]
+        except (ValueError, KeyError, TypeError, IndexError, AttributeError, PyAsn1Error) as e:
+            print(f"密钥池文件 {path} 已损坏，忽略其中的密钥: {e or type(e).__name__}", file=sys.stderr)
+            return
+        try:
+            os.remove(path)
+        except OSError as e:
+            # 删不掉文件时不取用其中的密钥，以免下次启动再次发出
+            print(f"无法删除密钥池文件 {path}，忽略其中的密钥: {e}", file=sys.stderr)
+            return
+
+        with self._lock:
+            for size, keys in loaded.items():
+                self._track(size)
+                self._pools[size].extend(keys)
+
+    def save(self, path: str):
+        """把池中剩余的密钥以 PEM 形式写入文件（先写临时文件再替换），文件权限为 POOL_FILE_MODE。"""
+        with self._lock:
+            keys = {str(size): [privkey.save_pkcs1().decode("utf-8") for _, privkey in pool]
+                    for size, pool in self._pools.items() if pool}
+        tmp_path = path + ".tmp"
+        # 删除残留的临时文件，保证新建时使用私有权限，而不是沿用旧文件的权限
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, POOL_FILE_MODE)
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": POOL_FILE_VERSION, "keys": keys}, f)
+        os.replace(tmp_path, path)
+
+    def close(self):
+        """停止补充任务，并在配置了 path 时保存剩余密钥。"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.path:
+            self.save(self.path)
@@ -0,0 +1,139 @@
+# 密钥生成
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from math import gcd
+from typing import List, Optional, Sequence, Tuple
+
+import rsa
+import rsa.common
+
+from .primes import generate_prime, is_probable_prime
+
+KeyPair = Tuple[rsa.PublicKey, rsa.PrivateKey]
+
+# 默认公钥指数，与 rsa.newkeys 保持一致
+DEFAULT_EXPONENT = 65537
+# 每个素数搜索子任务尝试的筛窗口数，找到素数或收到停止信号时提前返回
+PRIME_SEARCH_WINDOWS = 1
+
+
+def build_keypair(p: int, q: int, exponent: int = DEFAULT_EXPONENT) -> Optional[KeyPair]:
+    """由两个素数构造密钥对；p、q 不可用（相等或 e 与 φ(n) 不互质）时返回 None。"""
+    p, q = int(p), int(q)
+    phi_n = (p - 1) * (q - 1)
+    if p == q or gcd(exponent, phi_n) != 1:
+        return None
+    n = p * q
+    d = rsa.common.inverse(exponent, phi_n)
+    return rsa.PublicKey(n, exponent), rsa.PrivateKey(n, exponent, d, p, q)
+
+
+def generate_keypair(bit_size: int, kind: str = "normal", exponent: int = DEFAULT_EXPONENT, ctx=None) -> KeyPair:
+    """单进程生成指定模数比特数的 RSA 密钥对，返回 (公钥, 私钥)。每次尝试一对素数前检查 ctx 是否已取消。"""
+    pbits, qbits = split_prime_bits(bit_size)
+    while True:
+        if ctx is not None:
+            ctx.check()
+        keys = build_keypair(generate_prime(pbits, kind), generate_prime(qbits, kind), exponent)
+        if keys is not None:
+            return keys
+
+
+def split_prime_bits(bit_size: int) -> Tuple[int, int]:
+    """
+    按 rsa.find_p_q 的方式拆分 p、q 的比特数，p 比 q 多 2 × (bit_size // 32) 位，
+    避免 p、q 过于接近而被费马分解。
+    """
+    shift = bit_size // 32
+    pbits = (bit_size + 1) // 2 + shift
+    return pbits, bit_size - pbits
+
+
+def search_prime(bits: int, windows: Optional[int], stop=None, kind: str = "normal") -> Optional[int]:
+    """
+    在 windows 个随机筛窗口内搜索素数，返回找到的素数或 None。
+    stop 为跨进程的 Event，其他子任务已找到素数时立即退出。
+    """
+    prime = generate_prime(bits, kind, windows, stop)
+    return None if prime is None else int(prime)
+
+
+def find_primes_parallel(bit_sizes: Sequence[int], executor, manager, workers: Optional[int] = None,
+                         kind: str = "normal", ctx=None) -> List[int]:
+    """
+    在进程池中同时搜索多个素数（例如 p 和 q），每个素数占用 workers 个并行子任务。
+    某个素数被找到后置位它的停止事件，其余子任务在下一个候选前退出。
+    返回与 bit_sizes 顺序一致的素数列表。
+    """
+    workers = workers or os.cpu_count() or 1
+    stops = [manager.Event() for _ in bit_sizes]
+    found = [None] * len(bit_sizes)
+    running = {}
+
+    def launch(index):
+        future = executor.submit(search_prime, bit_sizes[index], PRIME_SEARCH_WINDOWS, stops[index], kind)
+        running[future] = index
+
+    for index in range(len(bit_sizes)):
+        for _ in range(workers):
+            launch(index)
+
+    try:
+        while running:
+            done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+            if ctx is not None:
+                ctx.check()
+                ctx.report(sum(p is not None for p in found), len(found), "搜索素数")
+            for future in done:
+                index = running.pop(future)
+                prime = future.result()
+                if found[index] is not None:
+                    continue
+                if prime is not None:
+                    found[index] = prime
+                    stops[index].set()
+                else:
+                    launch(index)
+    finally:
+        # 取消或异常时通知所有子任务停止
+        for stop in stops:
+            stop.set()
+        for future in running:
+            future.cancel()
+
+    return found
+
+
+def generate_keypair_parallel(bit_size: int, executor, manager, workers: Optional[int] = None, kind: str = "normal",
+                              exponent: int = DEFAULT_EXPONENT, ctx=None) -> KeyPair:
+    """
+    多核并行生成 RSA 密钥对：p、q 的素数搜索同时进行，各自分散到进程池的所有核心上。
+    executor 为 ProcessPoolExecutor，manager 用于创建跨进程的停止事件。
+    """
+    pbits, qbits = split_prime_bits(bit_size)
+    while True:
+        p, q = find_primes_parallel((pbits, qbits), executor, manager, workers, kind, ctx)
+        keys = build_keypair(p, q, exponent)
+        # 极少数情况下 e 与 φ(n) 不互质，重新搜索一对素数
+        if keys is not None:
+            return keys
+
+
+def keys_from_parameters(n: int, e: int, p: Optional[int] = None,
+                         q: Optional[int] = None) -> Tuple[rsa.PublicKey, Optional[rsa.PrivateKey]]:
+    """
+    由手动输入的参数构造密钥：总是返回公钥，同时提供 p、q 时还返回私钥。
+    参数不合法时抛出 ValueError。
+    """
+    if p is None or q is None:
+        return rsa.PublicKey(n, e), None
+    if p * q != n:
+        raise ValueError("p 和 q 的乘积必须等于 n。")
+    # p、q 必须是素数，否则计算出的私钥无法正确解密
+    if not (is_probable_prime(p) and is_probable_prime(q)):
+        raise ValueError("p 和 q 必须都是素数。")
+    phi_n = (p - 1) * (q - 1)
+    if gcd(e, phi_n) != 1:
+        raise ValueError("e 必须与 φ(n) 互质")
+    d = rsa.common.inverse(e, phi_n)
+    return rsa.PublicKey(n, e), rsa.PrivateKey(n, e, d, p, q)
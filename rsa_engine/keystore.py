@@ -0,0 +1,192 @@
+# 密钥库
+# 每个密钥对作为一条记录追加到同一个数据文件中，不会覆盖以前保存的密钥：
+#   记录头（魔数、公钥 DER 的 SHA-256 指纹、模数比特数、创建时间、各段长度）| 标签 | 公钥 DER | 私钥 DER
+# 打开时通过 mmap 只扫描记录头，在内存中按指纹建立索引；读取某个密钥时直接从映射中切出 DER，
+# 用一个只认 INTEGER 序列的 DER 解析器取出各个整数，跳过 Base64/PEM 和通用 ASN.1 解码。
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import rsa
+
+# 记录头：魔数 | 指纹（32 字节）| 模数比特数 | 创建时间（Unix 秒）| 标签长度 | 公钥 DER 长度 | 私钥 DER 长度（0 表示没有私钥）
+RECORD_MAGIC = b"RKS1"
+RECORD_HEADER = struct.Struct(">4s32sIdIII")
+
+
+@dataclass(frozen=True)
+class KeyEntry:
+    """密钥库中的一条记录（不含密钥本身）。"""
+    fingerprint: str
+    bits: int
+    created: float
+    label: str
+    has_private: bool
+
+
+def key_fingerprint(pubkey: rsa.PublicKey) -> str:
+    """公钥的指纹：PKCS#1 DER 编码的 SHA-256。"""
+    return hashlib.sha256(pubkey.save_pkcs1("DER")).hexdigest()
+
+
+def der_integers(blob) -> List[int]:
+    """解析由 INTEGER 组成的 DER SEQUENCE（PKCS#1 公钥和私钥都是这种结构），返回其中的整数。"""
+
+    def read_length(offset):
+        length = blob[offset]
+        if length < 0x80:
+            return length, offset + 1
+        count = length & 0x7F
+        return int.from_bytes(blob[offset + 1:offset + 1 + count], "big"), offset + 1 + count
+
+    if blob[0] != 0x30:
+        raise ValueError("不是 DER SEQUENCE")
+    length, offset = read_length(1)
+    end = offset + length
+    values = []
+    while offset < end:
+        if blob[offset] != 0x02:
+            raise ValueError("DER SEQUENCE 中包含非 INTEGER 元素")
+        length, offset = read_length(offset + 1)
+        values.append(int.from_bytes(blob[offset:offset + length], "big", signed=True))
+        offset += length
+    return values
+
+
+class KeyStore:
+    """
+    追加写入的密钥库。同一个公钥只保存一次，add 重复的密钥时返回已有的记录。
+    path 所在的文件不存在时在第一次 add 时创建；文件末尾不完整的记录（写入时程序中断）在打开时截掉。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, KeyEntry] = {}
+        self._offsets: Dict[str, int] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _remap(self):
+        """重新映射数据文件（追加记录后映射的长度需要更新）。"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _scan(self):
+        """扫描所有记录头建立索引。"""
+        self._remap()
+        if self._map is None:
+            return
+        offset, size = 0, len(self._map)
+        while offset + RECORD_HEADER.size <= size:
+            magic, digest, bits, created, label_len, pub_len, priv_len = RECORD_HEADER.unpack_from(self._map, offset)
+            end = offset + RECORD_HEADER.size + label_len + pub_len + priv_len
+            if magic != RECORD_MAGIC or end > size:
+                break
+            label = self._map[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + label_len].decode("utf-8")
+            fingerprint = digest.hex()
+            self._entries[fingerprint] = KeyEntry(fingerprint, bits, created, label, priv_len > 0)
+            self._offsets[fingerprint] = offset
+            offset = end
+        if offset < size:
+            # 末尾是不完整的记录，截掉后后续追加的记录才能被正确扫描
+            self._map.close()
+            self._map = None
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+            self._remap()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._entries
+
+    def entries(self) -> List[KeyEntry]:
+        """全部记录，按创建时间从新到旧排列。"""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry.created, reverse=True)
+
+    def search(self, text: str) -> List[KeyEntry]:
+        """按指纹前缀、标签或模数比特数搜索（不区分大小写），空字符串返回全部记录。"""
+        text = text.strip().lower()
+        if not text:
+            return self.entries()
+        return [entry for entry in self.entries()
+                if entry.fingerprint.startswith(text) or text in entry.label.lower() or text == str(entry.bits)]
+
+    def add(self, pubkey: rsa.PublicKey, privkey: Optional[rsa.PrivateKey] = None, label: str = "") -> KeyEntry:
+        """追加一个密钥对（privkey 可以为空），返回对应的记录。"""
+        if privkey is not None and (privkey.n, privkey.e) != (pubkey.n, pubkey.e):
+            raise ValueError("公钥和私钥不匹配")
+        pub_der = pubkey.save_pkcs1("DER")
+        priv_der = privkey.save_pkcs1("DER") if privkey is not None else b""
+        digest = hashlib.sha256(pub_der).digest()
+        fingerprint = digest.hex()
+        label_bytes = label.encode("utf-8")
+        with self._lock:
+            existing = self._entries.get(fingerprint)
+            if existing is not None and (existing.has_private or privkey is None):
+                return existing
+            # 已有的记录只有公钥而这次带了私钥：追加新记录，索引指向新的那条
+            entry = KeyEntry(fingerprint, pubkey.n.bit_length(), time.time(), label, privkey is not None)
+            header = RECORD_HEADER.pack(RECORD_MAGIC, digest, entry.bits, entry.created, len(label_bytes),
+                                        len(pub_der), len(priv_der))
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(header + label_bytes + pub_der + priv_der)
+            self._entries[fingerprint] = entry
+            self._offsets[fingerprint] = offset
+            return entry  # 映射在下次读取到新记录时才更新
+
+    def add_pem(self, pub_pem, priv_pem=None, label: str = "") -> KeyEntry:
+        """解析 PEM 文本后追加；priv_pem 为空或不是 PEM 私钥时只保存公钥。"""
+        if isinstance(pub_pem, str):
+            pub_pem = pub_pem.encode("utf-8")
+        if isinstance(priv_pem, str):
+            priv_pem = priv_pem.encode("utf-8")
+        pubkey = rsa.PublicKey.load_pkcs1(pub_pem.strip())
+        privkey = rsa.PrivateKey.load_pkcs1(priv_pem.strip()) if priv_pem and b"PRIVATE KEY" in priv_pem else None
+        return self.add(pubkey, privkey, label)
+
+    def resolve(self, prefix: str) -> str:
+        """把指纹前缀解析为完整指纹；找不到或不唯一时抛出 KeyError。"""
+        prefix = prefix.strip().lower()
+        if prefix in self._entries:
+            return prefix
+        matches = [fingerprint for fingerprint in self._entries if fingerprint.startswith(prefix)]
+        if len(matches) != 1:
+            raise KeyError(f"没有唯一匹配 {prefix} 的密钥" if matches else f"密钥库中没有 {prefix}")
+        return matches[0]
+
+    def get(self, fingerprint: str) -> Tuple[rsa.PublicKey, Optional[rsa.PrivateKey]]:
+        """按指纹（或唯一前缀）读取密钥对，直接从映射中解析 DER。"""
+        with self._lock:
+            fingerprint = self.resolve(fingerprint)
+            offset = self._offsets[fingerprint]
+            if self._map is None or offset >= len(self._map):
+                self._remap()
+            _, _, _, _, label_len, pub_len, priv_len = RECORD_HEADER.unpack_from(self._map, offset)
+            start = offset + RECORD_HEADER.size + label_len
+            n, e = der_integers(self._map[start:start + pub_len])
+            pubkey = rsa.PublicKey(n, e)
+            if not priv_len:
+                return pubkey, None
+            values = der_integers(self._map[start + pub_len:start + pub_len + priv_len])
+            # version, n, e, d, p, q, dp, dq, qinv
+            return pubkey, rsa.PrivateKey(*values[1:6])
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
@@ -0,0 +1,179 @@
+# k 空间搜索（循环攻击面板）
+# 对每个 k 分解 e·k - 1，把它的偶数因子当作 φ(n) 的候选求解 p、q。
+# k 按区间拆分到进程池中并行搜索，任一区间找到结果即停止其余子任务；
+# 已连续完成的区间写入检查点文件，下次以相同的 e、n 搜索时从检查点继续。
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterator, Optional
+
+from gmpy2 import isqrt
+
+from .attacks import RecoveredKey, mod_inverse, solve_quadratic
+from .factor import divisors, factorint
+
+# 每个子任务搜索的 k 个数
+K_RANGE_SIZE = 2000
+# 默认搜索上限
+DEFAULT_K_BOUND = 1_000_000
+# 子任务每处理多少个 k 检查一次停止事件（跨进程 Event 的查询有 IPC 开销）
+STOP_CHECK_INTERVAL = 64
+# 分解 e·k - 1 时每次 Pollard rho 的步数上限，分解不出来的 k 直接跳过
+FACTOR_MAX_STEPS = 1 << 14
+# 检查点文件格式版本
+CHECKPOINT_VERSION = 1
+
+
+def phi_bounds(n: int):
+    """
+    φ(n) 的取值范围。φ(n) = n - (p + q) + 1：
+    p + q ≥ 2√n，因此 φ(n) ≤ n - 2√n + 1；3 ≤ p ≤ q 时 φ(n) ≥ 2n/3 - 2。
+    """
+    return 2 * n // 3 - 2, n - 2 * int(isqrt(n)) + 1
+
+
+def first_k(e: int, n: int) -> int:
+    """φ(n) 整除 e·k - 1，所以 e·k - 1 ≥ φ(n) 的下界，更小的 k 不必搜索。"""
+    lower, _ = phi_bounds(n)
+    return max(1, -(-(lower + 1) // e))
+
+
+def phi_candidates(e: int, k: int, n: int) -> Iterator[int]:
+    """由 e·k - 1 的完整分解枚举 φ(n) 的候选：落在 phi_bounds 范围内的偶数因子。"""
+    candidate = e * k - 1
+    if candidate <= 0 or candidate % 2:
+        return  # 必须是偶数
+    factors = factorint(candidate, FACTOR_MAX_STEPS)
+    if factors is None:
+        return  # 含有过大的因子，无法在步数上限内分解
+    lower, upper = phi_bounds(n)
+    for phi_n in divisors(factors):
+        if phi_n > upper:
+            break
+        if phi_n >= lower and phi_n % 2 == 0:
+            yield phi_n
+
+
+def check_k(e: int, n: int, k: int) -> Optional[RecoveredKey]:
+    """检查单个 k，找到时返回 RecoveredKey。"""
+    for phi_n in phi_candidates(e, k, n):
+        p = solve_quadratic(phi_n, n)
+        if p is not None:
+            q = n // p
+            # 找到 p, q，计算私钥 d
+            d = mod_inverse(e, (p - 1) * (q - 1))
+            return RecoveredKey(p, q, d, k)
+    return None
+
+
+def search_k_range(e: int, n: int, start: int, stop: int, stop_event=None) -> Optional[RecoveredKey]:
+    """
+    子任务：依次检查 [start, stop) 内的 k。
+    stop_event 为跨进程的 Event，其他子任务已找到结果时提前返回 None。
+    """
+    for k in range(start, stop):
+        if stop_event is not None and (k - start) % STOP_CHECK_INTERVAL == 0 and stop_event.is_set():
+            return None
+        found = check_k(e, n, k)
+        if found is not None:
+            return found
+    return None
+
+
+def load_checkpoint(path: Optional[str], e: int, n: int) -> int:
+    """读取检查点，返回下一个待搜索的 k；文件不存在、已损坏或属于其他 e、n 时返回 1。"""
+    if not path or not os.path.exists(path):
+        return 1
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == CHECKPOINT_VERSION and data["e"] == str(e) and data["n"] == str(n):
+            return max(1, int(data["next_k"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return 1
+
+
+def save_checkpoint(path: str, e: int, n: int, next_k: int):
+    """原子地写入检查点（先写临时文件再替换）。"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION, "e": str(e), "n": str(n), "next_k": next_k}, f)
+    os.replace(tmp_path, path)
+
+
+def cycle_attack(e: int, n: int, max_k: int = 10000, ctx=None) -> Optional[RecoveredKey]:
+    """
+    单进程遍历 k ∈ [first_k, max_k)，从 e·k - 1 的因子中寻找 φ(n)，进而恢复 p、q、d。
+    找到时返回 RecoveredKey，否则返回 None。
+    """
+    start = first_k(e, n)
+    for k in range(start, max_k):  # 遍历可能的 k 值
+        if ctx is not None:
+            ctx.check()
+            ctx.report(k - start + 1, max_k - start, f"k = {k}")
+        found = check_k(e, n, k)
+        if found is not None:
+            return found
+    return None
+
+
+def cycle_attack_parallel(e: int, n: int, executor, manager, bound: int = DEFAULT_K_BOUND,
+                          workers: Optional[int] = None, checkpoint: Optional[str] = None,
+                          range_size: int = K_RANGE_SIZE, ctx=None) -> Optional[RecoveredKey]:
+    """
+    在进程池中并行搜索 k ∈ [first_k, bound)。
+    每个子任务负责 range_size 个 k，同时最多提交 2 × workers 个子任务；
+    找到结果后置位停止事件并撤销尚未开始的子任务。
+    checkpoint 不为空时从检查点继续，并在连续完成的区间推进后写回；找到结果后删除检查点。
+    """
+    workers = workers or os.cpu_count() or 1
+    first = max(load_checkpoint(checkpoint, e, n), first_k(e, n))
+    next_start = watermark = first
+    stop_event = manager.Event()
+    running = {}
+    finished = set()  # 已完成但前面还有未完成区间的起点
+    started = time.perf_counter()
+    found = None
+
+    def launch():
+        nonlocal next_start
+        end = min(next_start + range_size, bound)
+        running[executor.submit(search_k_range, e, n, next_start, end, stop_event)] = (next_start, end)
+        next_start = end
+
+    try:
+        while running or next_start < bound:
+            while next_start < bound and len(running) < 2 * workers:
+                launch()
+            done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = running.pop(future)
+                result = future.result()
+                if result is not None:
+                    found = result
+                    return found
+                finished.add(start)
+            # 推进连续完成的水位线并写检查点
+            advanced = False
+            while watermark in finished:
+                finished.discard(watermark)
+                watermark = min(watermark + range_size, bound)
+                advanced = True
+            if advanced and checkpoint:
+                save_checkpoint(checkpoint, e, n, watermark)
+            if ctx is not None:
+                ctx.check()
+                rate = (watermark - first) / (time.perf_counter() - started or 1e-9)
+                ranges = sorted(running.values())
+                current = f"{ranges[0][0]}–{ranges[-1][1] - 1}" if ranges else "-"
+                ctx.report(watermark - first, bound - first, f"{rate:.0f} k/秒，当前范围 {current}")
+        return None
+    finally:
+        # 找到结果、取消或异常时通知所有子任务停止
+        stop_event.set()
+        for future in running:
+            future.cancel()
+        if found is not None and checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
@@ -0,0 +1,59 @@
+# PEM 读写
+import base64
+
+import rsa
+from pyasn1.codec.der import encoder as der_encoder
+from pyasn1.type import namedtype, univ
+
+from .tracing import span
+
+
+# 定义一个ASN.1结构体，表示RSA公钥
+class RSAPublicKey(univ.Sequence):
+    # 定义序列中包含的组件类型
+    componentType = namedtype.NamedTypes(
+        # 模数（大整数）
+        namedtype.NamedType('modulus', univ.Integer()),
+        # 公共指数
+        namedtype.NamedType('publicExponent', univ.Integer())
+    )
+
+
+def create_pem_public_key(e: int, n: int) -> str:
+    """由 e 和 n 构造 PKCS#1 格式的 PEM 公钥。"""
+    # 创建一个空的RSA公钥实例并设置模数和公共指数
+    rsa_pub_key = RSAPublicKey()
+    rsa_pub_key.setComponentByName('modulus', n)
+    rsa_pub_key.setComponentByName('publicExponent', e)
+
+    # 将ASN.1对象编码为DER格式，再进行Base64编码
+    der_encoded = der_encoder.encode(rsa_pub_key)
+    b64_encoded = base64.b64encode(der_encoded).decode('utf-8')
+
+    # 构造PEM格式的字符串
+    return f"-----BEGIN RSA PUBLIC KEY-----\n{b64_encoded}\n-----END RSA PUBLIC KEY-----"
+
+
+def load_public_key(path: str) -> rsa.PublicKey:
+    """从 PEM 文件读取 PKCS#1 公钥。"""
+    with span("read"), open(path, 'rb') as f:
+        data = f.read()
+    with span("parse"):
+        return rsa.PublicKey.load_pkcs1(data)
+
+
+def load_private_key(path: str) -> rsa.PrivateKey:
+    """从 PEM 文件读取 PKCS#1 私钥。"""
+    with span("read"), open(path, 'rb') as f:
+        data = f.read()
+    with span("parse"):
+        return rsa.PrivateKey.load_pkcs1(data)
+
+
+def save_keys(pub_pem: str, priv_pem: str, pub_path: str = "public.pem", priv_path: str = "private.pem"):
+    """把 PEM 文本分别写入公钥和私钥文件。"""
+    with span("write"):
+        with open(pub_path, "w", encoding="utf-8") as pub_file:
+            pub_file.write(pub_pem)
+        with open(priv_path, "w", encoding="utf-8") as priv_file:
+            priv_file.write(priv_pem)
@@ -0,0 +1,172 @@
+# 素数生成
+# 先用小素数筛批量排除候选，再用 gmpy2 做费马和 Miller–Rabin 测试，
+# 支持普通素数、强素数（Gordon 算法）和安全素数。
+import secrets
+from math import gcd
+from typing import List, Optional
+
+import gmpy2
+from gmpy2 import mpz, powmod
+
+# 小素数筛的上界，以及每个筛窗口包含的奇数个数
+SMALL_PRIME_LIMIT = 1 << 14
+SIEVE_WINDOW = 2048
+# Miller–Rabin 轮数
+PRIME_TEST_ROUNDS = 25
+# 支持的素数类型
+PRIME_KINDS = ("normal", "strong", "safe")
+# 强素数的最小比特数，保证 Gordon 算法中的辅助素数都大于筛表上界
+STRONG_PRIME_MIN_BITS = 60
+
+
+def _small_primes(limit):
+    """埃拉托斯特尼筛法求 limit 以内的奇素数。"""
+    flags = bytearray(b"\x01") * limit
+    flags[0:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if flags[i]:
+            flags[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(3, limit) if flags[i]]
+
+
+SMALL_PRIMES = _small_primes(SMALL_PRIME_LIMIT)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+
+
+def is_probable_prime(n) -> bool:
+    """费马 base-2 快速排除后再用 gmpy2.is_prime 做 Miller–Rabin。"""
+    if n < SMALL_PRIME_LIMIT:
+        return n == 2 or n in _SMALL_PRIME_SET
+    if not n & 1 or powmod(2, n - 1, n) != 1:
+        return False
+    return gmpy2.is_prime(n, PRIME_TEST_ROUNDS)
+
+
+def random_odd(bits) -> mpz:
+    """最高两位为 1 的随机奇数，保证两个这样的数相乘恰好得到两者比特数之和。"""
+    return mpz(secrets.randbits(bits - 2)) | (mpz(3) << (bits - 2)) | 1
+
+
+def sieve_window(start, window=SIEVE_WINDOW, safe=False) -> List[int]:
+    """
+    对奇数 start + 2i（0 <= i < window）做小素数筛，返回存活的偏移 i。
+    safe 为 True 时把 start + 2i 当作安全素数 p = 2q + 1 中的 q，
+    同时排除 q ≡ 0 和 q ≡ (sp - 1) / 2（即 p ≡ 0）的候选。
+    """
+    flags = bytearray(b"\x01") * window
+    for sp in SMALL_PRIMES:
+        half = (sp + 1) // 2  # 2 在模 sp 下的逆元
+        r = int(start % sp)
+        for residue in ((0, half - 1) if safe else (0,)):
+            # start + 2i ≡ residue (mod sp)  =>  i ≡ (residue - start) / 2
+            i = (residue - r) * half % sp
+            flags[i::sp] = bytes(len(range(i, window, sp)))
+    return [i for i in range(window) if flags[i]]
+
+
+def find_prime(bits, windows=None, stop=None) -> Optional[mpz]:
+    """
+    从随机起点按窗口筛选并测试候选，返回最高两位为 1 的 bits 位素数。
+    windows 限制尝试的窗口数（用完返回 None），stop 为可选的停止事件。
+    """
+    attempt = 0
+    while windows is None or attempt < windows:
+        attempt += 1
+        start = random_odd(bits)
+        for i in sieve_window(start):
+            if stop is not None and stop.is_set():
+                return None
+            candidate = start + 2 * i
+            if candidate.bit_length() == bits and is_probable_prime(candidate):
+                return candidate
+    return None
+
+
+def find_safe_prime(bits, windows=None, stop=None) -> Optional[mpz]:
+    """安全素数 p = 2q + 1（q 也是素数），p 与 q 的候选在同一个筛窗口中一起筛选。"""
+    attempt = 0
+    while windows is None or attempt < windows:
+        attempt += 1
+        start = random_odd(bits - 1)
+        for i in sieve_window(start, safe=True):
+            if stop is not None and stop.is_set():
+                return None
+            q = start + 2 * i
+            p = 2 * q + 1
+            # 先对 p 做费马测试，大部分合数在这里被排除
+            if p.bit_length() == bits and powmod(2, p - 1, p) == 1 \
+                    and is_probable_prime(q) and gmpy2.is_prime(p, PRIME_TEST_ROUNDS):
+                return p
+    return None
+
+
+def find_strong_prime(bits, windows=None, stop=None) -> Optional[mpz]:
+    """
+    Gordon 算法生成强素数 p：p - 1 有大素因子 r，p + 1 有大素因子 s，r - 1 有大素因子 t。
+    s 约占 3/8、r 约占 3/8 的比特数，剩余约 1/4 留给最后一步 p 的搜索；
+    windows 和 stop 作用于 r 和 p 的搜索。
+    """
+    if bits < STRONG_PRIME_MIN_BITS:
+        raise ValueError(f"强素数至少需要 {STRONG_PRIME_MIN_BITS} 位")
+    s = find_prime(bits * 3 // 8, stop=stop)
+    t = find_prime(bits // 4, stop=stop)
+    if s is None or t is None:
+        return None
+
+    # r = 2·i·t + 1 为素数
+    i = mpz(secrets.randbits(bits // 8)) | (mpz(1) << (bits // 8))
+    r = 2 * i * t + 1
+    while not is_probable_prime(r):
+        if stop is not None and stop.is_set():
+            return None
+        r += 2 * t
+
+    # p0 ≡ 1 (mod r)，p0 ≡ -1 (mod s)，在 p0 + j·2rs 中寻找最高两位为 1 的 bits 位素数
+    p0 = 2 * powmod(s, r - 2, r) * s - 1
+    step = 2 * r * s
+    lower = mpz(3) << (bits - 2)
+    attempt = 0
+    while windows is None or attempt < windows:
+        attempt += 1
+        j = (lower + mpz(secrets.randbits(bits - 3)) - p0) // step + 1
+        for _ in range(SIEVE_WINDOW):
+            if stop is not None and stop.is_set():
+                return None
+            p = p0 + j * step
+            if p.bit_length() == bits and is_probable_prime(p):
+                return p
+            j += 1
+    return None
+
+
+def generate_prime(bits, kind="normal", windows=None, stop=None) -> Optional[mpz]:
+    """按素数类型分派；windows 为 None 时一直搜索到找到为止。"""
+    if kind == "normal":
+        return find_prime(bits, windows, stop)
+    if kind == "strong":
+        return find_strong_prime(bits, windows, stop)
+    if kind == "safe":
+        return find_safe_prime(bits, windows, stop)
+    raise ValueError(f"未知的素数类型: {kind}")
+
+
+def check_prime_pair(p, q, e=None, n=None) -> List[str]:
+    """
+    检查手动输入的 p、q 是否适合构造 RSA 密钥，返回问题描述列表（为空表示通过）。
+    """
+    problems = []
+    if not is_probable_prime(p):
+        problems.append("p 不是素数")
+    if not is_probable_prime(q):
+        problems.append("q 不是素数")
+    if p == q:
+        problems.append("p 和 q 不能相等")
+    if n is not None and p * q != n:
+        problems.append("p 和 q 的乘积必须等于 n")
+    if e is not None and gcd(e, (p - 1) * (q - 1)) != 1:
+        problems.append("e 必须与 φ(n) 互质")
+    # |p - q| 过小时 n 可以被费马分解快速分解
+    bits = max(p.bit_length(), q.bit_length())
+    if p != q and abs(p - q).bit_length() <= bits // 2:
+        problems.append("p 和 q 过于接近，容易被费马分解")
+    return problems
@@ -0,0 +1,611 @@
+# 本地 JSON-RPC 服务
+# 常驻进程通过 Unix 套接字或本机 TCP 端口提供密钥生成、加解密和攻击，省去每次启动程序的导入和生成密钥的开销。
+# 协议：每行一个 JSON-RPC 2.0 请求或批量请求（数组），响应同样每行一个。同一连接上可以不等响应连续发送请求（流水线），
+# 各请求并发执行、完成即返回，按 id 对应；批量请求在全部完成后整体返回。
+# 前端是单线程的 asyncio，CPU 密集的运算都交给进程池：同一轮事件循环中到达的、使用同一密钥的加密（或解密）请求
+# 合并成一个子任务，摊薄进程间通信的开销；解析过的密钥按指纹保存在内存中，工作进程内再缓存 CRT 参数。
+# 整数参数可以是 JSON 整数或十进制 / 0x 十六进制字符串；结果中的大整数以十进制字符串返回，避免其他语言的 JSON 解析器丢失精度。
+# 服务没有身份验证：Unix 套接字靠文件权限（0600）限制只有当前用户可以连接；TCP 端口本机的任何用户和进程都能连接，
+# 并能取用服务中的私钥，只应在单用户的机器上或没有 Unix 套接字的平台上使用。
+import asyncio
+import base64
+import binascii
+import inspect
+import json
+import os
+import stat
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import rsa
+import rsa.common
+from pyasn1.error import PyAsn1Error
+
+from .batch import encrypt_chunk
+from .blockmode import block_capacity
+from .cipher import CIPHERTEXT_FORMATS, decrypt_ciphertext, encrypt_bytes, format_ciphertext, parse_ciphertext
+from .keycache import cached_private_key
+from .keystore import key_fingerprint
+from .tracing import span, tracer
+
+JSONRPC_VERSION = "2.0"
+# 单行请求的最大字节数
+MAX_LINE = 64 * 1024 * 1024
+# 每个连接同时处理的请求数上限，达到上限时暂停读取，客户端的发送随之被 TCP / 套接字缓冲区阻塞
+MAX_IN_FLIGHT = 1024
+# 同一密钥的加解密请求合并成一个子任务的最大条数
+COALESCE_LIMIT = 256
+# 内存中保存的已解析密钥数
+SERVICE_KEY_LIMIT = 4096
+# 默认的 Unix 套接字文件名，放在 $XDG_RUNTIME_DIR（未设置时为用户主目录）下
+SERVICE_SOCKET_NAME = "rsa-service.sock"
+# 没有 Unix 套接字的平台上默认使用的本机 TCP 端口
+SERVICE_PORT = 8765
+# 创建 Unix 套接字时的 umask：套接字文件权限为 0600
+SOCKET_UMASK = 0o177
+# 服务启动时预生成密钥的比特数
+SERVICE_POOL_SIZES = (1024, 2048)
+# 循环攻击默认的 k 搜索上限（单个工作进程）
+SERVICE_CYCLE_BOUND = 10000
+
+# JSON-RPC 错误码：标准错误 | 应用错误（运算失败、密钥不存在）
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+OPERATION_FAILED = -32000
+KEY_NOT_FOUND = -32001
+# rsa 库的 DecryptionError 不区分原因，统一返回这条说明
+DECRYPTION_FAILED = "解密失败：密文与私钥不匹配或填充无效"
+
+
+class RpcError(Exception):
+    """带 JSON-RPC 错误码的异常，服务端和客户端共用。"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+# region 工作进程任务
+
+def encrypt_batch(pubkey, items):
+    """
+    工作进程：用同一个公钥加密一批 (明文, 格式)，单个分组的消息一起填充和模幂，更长的消息使用分组模式。
+    返回 [(密文文本, 错误)]。
+    """
+    block_size = rsa.common.byte_size(pubkey.n)
+    capacity = block_capacity(pubkey)
+    ciphertexts = iter(encrypt_chunk([data for data, _ in items if len(data) <= capacity], pubkey.e, pubkey.n,
+                                     block_size))
+    results = []
+    for data, fmt in items:
+        try:
+            ciphertext = next(ciphertexts) if len(data) <= capacity else encrypt_bytes(data, pubkey)
+            results.append((format_ciphertext(ciphertext, fmt, block_size), None))
+        except (ValueError, OverflowError) as e:
+            results.append((None, str(e)))
+    return results
+
+
+def decrypt_batch(privkey, texts):
+    """工作进程：用同一个私钥解密一批密文文本（格式自动识别），返回 [(明文字节串, 错误)]。"""
+    key = cached_private_key(privkey)
+    results = []
+    for text in texts:
+        try:
+            results.append((decrypt_ciphertext(parse_ciphertext(text), key), None))
+        except rsa.DecryptionError:
+            results.append((None, DECRYPTION_FAILED))
+        except ValueError as e:
+            results.append((None, str(e)))
+    return results
+
+
+def _run_attack(name, *args):
+    """工作进程：执行一次攻击（按名称导入，服务前端不必加载攻击模块）。"""
+    if name == "common_modulus":
+        from .attacks import common_modulus_attack
+        return common_modulus_attack(*args)
+    if name == "wiener":
+        from .attacks import wiener_attack
+        return wiener_attack(*args)
+    if name == "fermat":
+        from .fermat import fermat_factor
+        return fermat_factor(*args)
+    if name == "cycle":
+        from .ksearch import cycle_attack
+        return cycle_attack(*args)
+    if name == "hastad":
+        from .broadcast import hastad_attack
+        return hastad_attack(*args)
+    raise ValueError(f"未知的攻击 {name}")
+
+
+def _generate(bits, kind):
+    from .keys import generate_keypair
+    return generate_keypair(bits, kind)
+
+# endregion
+
+
+def _integer(value, name: str) -> int:
+    """整数参数：JSON 整数，或十进制 / 0x 十六进制字符串。"""
+    if isinstance(value, bool):
+        raise RpcError(INVALID_PARAMS, f"{name} 必须是整数")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value, 16) if value[:2].lower() == "0x" else int(value)
+        except ValueError:
+            pass
+    raise RpcError(INVALID_PARAMS, f"{name} 必须是整数或整数字符串")
+
+
+def _ciphertext_int(value, name: str) -> int:
+    """单个分组的密文：整数或任意格式的密文文本。"""
+    if isinstance(value, str):
+        try:
+            value = parse_ciphertext(value)
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, f"{name}: {e}") from None
+        if not isinstance(value, int):
+            raise RpcError(INVALID_PARAMS, f"{name} 必须是单个分组的密文")
+        return value
+    return _integer(value, name)
+
+
+def _plaintext(m: int) -> Dict[str, Any]:
+    """恢复出的明文整数：十进制字符串、Base64 字节串，以及能按 UTF-8 解码时的文本。"""
+    from .attacks import int_to_bytes
+    data = int_to_bytes(m)
+    return {"plaintext": str(m), **_data_result(data)}
+
+
+def _data_result(data: bytes) -> Dict[str, Any]:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = None
+    return {"data": base64.b64encode(data).decode("ascii"), "text": text}
+
+
+def _recovered(found, e: int) -> Optional[Dict[str, Any]]:
+    if found is None:
+        return None
+    return {"p": str(found.p), "q": str(found.q), "d": str(found.d),
+            "private_pem": found.private_key(e).save_pkcs1().decode("utf-8")}
+
+
+class RsaService:
+    """
+    JSON-RPC 方法的实现，与传输层无关：handle(消息) 返回响应（通知返回 None）。
+    executor 为执行运算的进程池（测试时也可以是线程池）；key_pool 为可选的预生成密钥池，
+    key_store 为可选的 KeyStore，内存中找不到的 key_id 会到密钥库中查找。
+    """
+
+    def __init__(self, executor, key_pool=None, key_store=None, coalesce_limit: int = COALESCE_LIMIT):
+        self.executor = executor
+        self.key_pool = key_pool
+        self.key_store = key_store
+        self.coalesce_limit = coalesce_limit
+        self.requests = 0
+        # key_id -> (公钥, 私钥或 None)；PEM 文本 -> key_id，同一段 PEM 只解析一次
+        self._keys: "OrderedDict[str, Tuple[rsa.PublicKey, Optional[rsa.PrivateKey]]]" = OrderedDict()
+        self._pem_ids: "OrderedDict[str, str]" = OrderedDict()
+        # (工作函数, key_id) -> 本轮事件循环中等待合并的 [(参数, future)]
+        self._batches: Dict[Tuple[Any, str], List[Tuple[Any, asyncio.Future]]] = {}
+        self._methods = {name[len("rpc_"):]: getattr(self, name) for name in dir(self) if name.startswith("rpc_")}
+
+    # region 请求分发
+
+    async def handle(self, message):
+        """处理一个已解析的请求或批量请求，返回响应对象、响应列表或 None（全部是通知）。"""
+        if isinstance(message, list):
+            if not message:
+                return self._error(None, INVALID_REQUEST, "批量请求不能为空")
+            responses = await asyncio.gather(*(self._handle_one(item) for item in message))
+            responses = [response for response in responses if response is not None]
+            return responses or None
+        return await self._handle_one(message)
+
+    async def handle_line(self, line: bytes) -> Optional[bytes]:
+        """处理一行请求，返回一行响应（不含换行）或 None。"""
+        try:
+            message = json.loads(line)
+        except (ValueError, UnicodeDecodeError) as e:
+            return self.encode(self._error(None, PARSE_ERROR, f"无法解析 JSON: {e}"))
+        response = await self.handle(message)
+        return None if response is None else self.encode(response)
+
+    @staticmethod
+    def encode(response) -> bytes:
+        return json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> Dict[str, Any]:
+        return {"jsonrpc": JSONRPC_VERSION, "id": request_id, "error": {"code": code, "message": message}}
+
+    async def _handle_one(self, request):
+        if not isinstance(request, dict) or request.get("jsonrpc") != JSONRPC_VERSION \
+                or not isinstance(request.get("method"), str):
+            return self._error(request.get("id") if isinstance(request, dict) else None, INVALID_REQUEST,
+                               "不是有效的 JSON-RPC 2.0 请求")
+        self.requests += 1
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        method = request["method"]
+        params = request.get("params", {})
+        try:
+            handler = self._methods.get(method)
+            if handler is None:
+                raise RpcError(METHOD_NOT_FOUND, f"没有方法 {method}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "参数必须按名称传递（JSON 对象）")
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError:
+                expected = ", ".join(inspect.signature(handler).parameters)
+                raise RpcError(INVALID_PARAMS, f"{method} 的参数不正确，可用参数：{expected}") from None
+            with span(method):
+                result = await handler(**params)
+        except RpcError as e:
+            return None if is_notification else self._error(request_id, e.code, e.message)
+        except rsa.DecryptionError:
+            return None if is_notification else self._error(request_id, OPERATION_FAILED, DECRYPTION_FAILED)
+        except (ValueError, OverflowError, ArithmeticError) as e:
+            return None if is_notification else self._error(request_id, OPERATION_FAILED, str(e))
+        except Exception as e:
+            return None if is_notification else self._error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        return None if is_notification else {"jsonrpc": JSONRPC_VERSION, "id": request_id, "result": result}
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _submit(self, fn, key_id: str, key, item) -> asyncio.Future:
+        """把一条加解密请求加入 (fn, key_id) 的合并批次，批次在本轮事件循环结束或达到上限时提交。"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = (fn, key_id)
+        batch = self._batches.get(group)
+        if batch is None:
+            batch = self._batches[group] = []
+            loop.call_soon(self._flush, group, key)
+        batch.append((item, future))
+        if len(batch) >= self.coalesce_limit:
+            self._flush(group, key)
+        return future
+
+    def _flush(self, group, key):
+        batch = self._batches.pop(group, None)
+        if not batch:
+            return
+        task = asyncio.get_running_loop().run_in_executor(self.executor, group[0], key, [item for item, _ in batch])
+
+        def deliver(task):
+            error = None if task.cancelled() else task.exception()
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if task.cancelled():
+                    future.cancel()
+                elif error is not None:
+                    future.set_exception(error)
+                else:
+                    value, reason = task.result()[index]
+                    if reason is None:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(RpcError(OPERATION_FAILED, reason))
+
+        task.add_done_callback(deliver)
+
+    # endregion
+
+    # region 密钥表
+
+    def _remember(self, pubkey: rsa.PublicKey, privkey: Optional[rsa.PrivateKey] = None) -> str:
+        key_id = key_fingerprint(pubkey)
+        existing = self._keys.get(key_id)
+        if existing is None or privkey is not None or existing[1] is None:
+            self._keys[key_id] = (pubkey, privkey if privkey is not None else existing and existing[1])
+        self._keys.move_to_end(key_id)
+        while len(self._keys) > SERVICE_KEY_LIMIT:
+            self._keys.popitem(last=False)
+        return key_id
+
+    def _parse_pem(self, pem: str) -> str:
+        """解析 PEM 公钥或私钥并加入密钥表，返回 key_id；同一段 PEM 只解析一次。"""
+        if not isinstance(pem, str):
+            raise RpcError(INVALID_PARAMS, "PEM 必须是字符串")
+        key_id = self._pem_ids.get(pem)
+        if key_id is not None and key_id in self._keys:
+            self._pem_ids.move_to_end(pem)
+            return key_id
+        data = pem.strip().encode("utf-8")
+        with span("load-key"):
+            try:
+                if b"PRIVATE KEY" in data:
+                    privkey = rsa.PrivateKey.load_pkcs1(data)
+                    key_id = self._remember(rsa.PublicKey(privkey.n, privkey.e), privkey)
+                else:
+                    key_id = self._remember(rsa.PublicKey.load_pkcs1(data))
+            except (ValueError, IndexError, TypeError, PyAsn1Error) as e:
+                raise RpcError(INVALID_PARAMS, f"无法解析 PEM 密钥: {str(e) or type(e).__name__}") from None
+        self._pem_ids[pem] = key_id
+        while len(self._pem_ids) > SERVICE_KEY_LIMIT:
+            self._pem_ids.popitem(last=False)
+        return key_id
+
+    def _lookup(self, key_id: str) -> str:
+        """按完整指纹或唯一前缀查找密钥，内存中没有时到密钥库中查找。"""
+        if not isinstance(key_id, str) or not key_id:
+            raise RpcError(INVALID_PARAMS, "key_id 必须是非空字符串")
+        key_id = key_id.lower()
+        if key_id in self._keys:
+            self._keys.move_to_end(key_id)
+            return key_id
+        matches = [candidate for candidate in self._keys if candidate.startswith(key_id)]
+        if len(matches) == 1:
+            return matches[0]
+        if len(matches) > 1:
+            raise RpcError(KEY_NOT_FOUND, f"没有唯一匹配 {key_id} 的密钥")
+        if self.key_store is not None:
+            try:
+                pubkey, privkey = self.key_store.get(key_id)
+            except KeyError as e:
+                raise RpcError(KEY_NOT_FOUND, e.args[0]) from None
+            return self._remember(pubkey, privkey)
+        raise RpcError(KEY_NOT_FOUND, f"没有密钥 {key_id}")
+
+    def _key(self, key_id, pem, need_private: bool) -> Tuple[str, Any]:
+        if (key_id is None) == (pem is None):
+            raise RpcError(INVALID_PARAMS, "需要 key_id 或 PEM 二者之一")
+        key_id = self._lookup(key_id) if pem is None else self._parse_pem(pem)
+        pubkey, privkey = self._keys[key_id]
+        if need_private and privkey is None:
+            raise RpcError(KEY_NOT_FOUND, f"密钥 {key_id[:16]} 没有私钥")
+        return key_id, privkey if need_private else pubkey
+
+    # endregion
+
+    # region RPC 方法
+
+    async def rpc_keygen(self, bits: int = 2048, kind: str = "normal"):
+        """生成密钥对（优先从预生成密钥池中取出），返回 key_id 和 PEM。"""
+        from .primes import PRIME_KINDS
+        bits = _integer(bits, "bits")
+        if kind not in PRIME_KINDS:
+            raise RpcError(INVALID_PARAMS, f"kind 必须是 {', '.join(PRIME_KINDS)} 之一")
+        if bits < 16:
+            raise RpcError(INVALID_PARAMS, "bits 至少为 16")
+        keys = self.key_pool.take(bits) if self.key_pool is not None and kind == "normal" else None
+        if keys is None:
+            keys = await self._run(_generate, bits, kind)
+        pubkey, privkey = keys
+        return {"key_id": self._remember(pubkey, privkey), "bits": pubkey.n.bit_length(),
+                "public_pem": pubkey.save_pkcs1().decode("utf-8"), "private_pem": privkey.save_pkcs1().decode("utf-8")}
+
+    async def rpc_load_key(self, pem: str):
+        """加载 PEM 公钥或私钥并常驻内存，返回 key_id。"""
+        key_id = self._parse_pem(pem)
+        pubkey, privkey = self._keys[key_id]
+        return {"key_id": key_id, "bits": pubkey.n.bit_length(), "has_private": privkey is not None}
+
+    async def rpc_encrypt(self, text: Optional[str] = None, data: Optional[str] = None, key_id: Optional[str] = None,
+                          public_pem: Optional[str] = None, format: str = "decimal"):
+        """加密 text（UTF-8）或 data（Base64），返回指定格式的密文文本。"""
+        if format not in CIPHERTEXT_FORMATS or format == "raw":
+            raise RpcError(INVALID_PARAMS, f"format 必须是 {', '.join(f for f in CIPHERTEXT_FORMATS if f != 'raw')} 之一")
+        if (text is None) == (data is None):
+            raise RpcError(INVALID_PARAMS, "需要 text 或 data 二者之一")
+        if text is not None:
+            if not isinstance(text, str):
+                raise RpcError(INVALID_PARAMS, "text 必须是字符串")
+            message = text.encode("utf-8")
+        else:
+            try:
+                message = base64.b64decode(data, validate=True)
+            except (binascii.Error, TypeError, ValueError):
+                raise RpcError(INVALID_PARAMS, "data 必须是 Base64 字符串") from None
+        key_id, pubkey = self._key(key_id, public_pem, need_private=False)
+        return {"ciphertext": await self._submit(encrypt_batch, key_id, pubkey, (message, format))}
+
+    async def rpc_decrypt(self, ciphertext: str, key_id: Optional[str] = None, private_pem: Optional[str] = None):
+        """解密任意格式的密文文本，返回 Base64 明文和能按 UTF-8 解码时的文本。"""
+        if not isinstance(ciphertext, str):
+            raise RpcError(INVALID_PARAMS, "ciphertext 必须是字符串")
+        key_id, privkey = self._key(key_id, private_pem, need_private=True)
+        return _data_result(await self._submit(decrypt_batch, key_id, privkey, ciphertext))
+
+    async def rpc_common_modulus(self, n, e1, e2, c1, c2):
+        """共模攻击，返回恢复出的明文。"""
+        m = await self._run(_run_attack, "common_modulus", _integer(n, "n"), _ciphertext_int(c1, "c1"),
+                            _ciphertext_int(c2, "c2"), _integer(e1, "e1"), _integer(e2, "e2"))
+        return _plaintext(m)
+
+    async def rpc_wiener(self, e, n):
+        """Wiener 攻击，成功时返回 p、q、d 和私钥 PEM，否则返回 null。"""
+        e = _integer(e, "e")
+        return _recovered(await self._run(_run_attack, "wiener", e, _integer(n, "n")), e)
+
+    async def rpc_fermat(self, n, budget: float = 10.0):
+        """Fermat 分解，返回 {"p", "q"}，超出时间预算时返回 null。"""
+        if not isinstance(budget, (int, float)) or budget <= 0:
+            raise RpcError(INVALID_PARAMS, "budget 必须是正数")
+        factors = await self._run(_run_attack, "fermat", _integer(n, "n"), float(budget))
+        return None if factors is None else {"p": str(factors[0]), "q": str(factors[1])}
+
+    async def rpc_cycle(self, e, n, bound: int = SERVICE_CYCLE_BOUND):
+        """循环攻击（单个工作进程搜索 k < bound），成功时返回 p、q、d 和私钥 PEM，否则返回 null。"""
+        e = _integer(e, "e")
+        return _recovered(await self._run(_run_attack, "cycle", e, _integer(n, "n"), _integer(bound, "bound")), e)
+
+    async def rpc_hastad(self, e, pairs: Sequence):
+        """Håstad 广播攻击，pairs 为 [[n, c], ...]，恢复失败时返回 null。"""
+        if not isinstance(pairs, list) or not all(isinstance(pair, list) and len(pair) == 2 for pair in pairs):
+            raise RpcError(INVALID_PARAMS, "pairs 必须是 [[n, c], ...]")
+        pairs = [(_integer(n, "n"), _ciphertext_int(c, "c")) for n, c in pairs]
+        m = await self._run(_run_attack, "hastad", _integer(e, "e"), pairs)
+        return None if m is None else _plaintext(m)
+
+    async def rpc_stats(self):
+        """服务统计：请求数、常驻密钥数，以及各方法的耗时分位数（秒）。"""
+        return {"requests": self.requests, "keys": len(self._keys),
+                "operations": [asdict(stats) for stats in tracer.stats()]}
+
+    # endregion
+
+    # region 连接
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个连接：逐行读取请求并发执行，连接关闭前等待已经收到的请求全部响应。"""
+        in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        tasks = set()
+
+        async def respond(line):
+            try:
+                response = await self.handle_line(line)
+                if response is not None and not writer.is_closing():
+                    writer.write(response + b"\n")
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 单行超过 MAX_LINE，无法再找到下一行的起点，只能关闭连接
+                    writer.write(self.encode(self._error(None, PARSE_ERROR, "请求过长")) + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                await in_flight.acquire()
+                task = asyncio.create_task(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # 服务停止时仍有连接打开：正常结束，否则 asyncio 会把被取消的连接任务当作错误打印出来
+            for task in tasks:
+                task.cancel()
+        finally:
+            writer.close()
+
+    # endregion
+
+
+def default_socket_path() -> str:
+    """serve 默认监听的 Unix 套接字路径。"""
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~"), SERVICE_SOCKET_NAME)
+
+
+def remove_socket(path: str) -> bool:
+    """删除 path 处的 Unix 套接字文件（例如上次异常退出留下的）；path 不存在或不是套接字时不删除，返回 False。"""
+    try:
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            return False
+    except FileNotFoundError:
+        return False
+    os.remove(path)
+    return True
+
+
+async def start_service(service: RsaService, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                        port: int = 0) -> asyncio.AbstractServer:
+    """
+    在 Unix 套接字（socket_path，仅当前用户可读写）或本机 TCP 端口（port 为 0 时随机分配）上启动服务。
+    """
+    if socket_path is not None:
+        if os.path.lexists(socket_path) and not remove_socket(socket_path):
+            raise FileExistsError(f"{socket_path} 已存在且不是套接字，拒绝覆盖")
+        # 在受限的 umask 下绑定，套接字文件从创建起就只有当前用户可以连接，而不是先以默认权限出现再 chmod
+        umask = os.umask(SOCKET_UMASK)
+        try:
+            return await asyncio.start_unix_server(service.serve_connection, socket_path, limit=MAX_LINE)
+        finally:
+            os.umask(umask)
+    return await asyncio.start_server(service.serve_connection, host, port, limit=MAX_LINE)
+
+
+class ServiceClient:
+    """
+    asyncio 客户端：同一连接上流水线发送请求，后台任务按 id 把响应分发给等待者。
+    用于测试和其他 Python 进程调用；其他语言按每行一个 JSON-RPC 请求直接读写套接字即可。
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                      port: Optional[int] = None) -> "ServiceClient":
+        if socket_path is not None:
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+        return cls(reader, writer)
+
+    async def _receive(self):
+        try:
+            while line := await self._reader.readline():
+                message = json.loads(line)
+                for response in message if isinstance(message, list) else [message]:
+                    future = self._waiting.pop(response.get("id"), None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in response:
+                        future.set_exception(RpcError(response["error"]["code"], response["error"]["message"]))
+                    else:
+                        future.set_result(response.get("result"))
+        finally:
+            # 连接断开：所有等待者收到 ConnectionError
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("服务连接已断开"))
+            self._waiting.clear()
+
+    def _request(self, method: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], asyncio.Future]:
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[self._next_id] = future
+        return {"jsonrpc": JSONRPC_VERSION, "id": self._next_id, "method": method, "params": params}, future
+
+    async def call(self, method: str, **params):
+        """调用一个方法并等待结果，出错时抛出 RpcError。可以在多个任务中并发调用（流水线）。"""
+        request, future = self._request(method, params)
+        self._writer.write(RsaService.encode(request) + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def batch(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """以一个批量请求发送多个调用，按顺序返回结果；失败的调用对应位置为 RpcError 实例。"""
+        requests, futures = zip(*(self._request(method, params) for method, params in calls))
+        self._writer.write(RsaService.encode(list(requests)) + b"\n")
+        await self._writer.drain()
+        return list(await asyncio.gather(*futures, return_exceptions=True))
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._receiver.cancel()
@@ -0,0 +1,128 @@
+# 操作追踪与性能分析
+# span(name) 记录一次操作或其中一个阶段的耗时；嵌套的 span 记为 "操作/阶段"（如 "加密/pad"），
+# 每个名称保留最近 HISTORY_SIZE 次耗时，用于计算 p50/p99。
+# arm_profile(name) 之后，下一次名为 name 的 span 会在 cProfile 下运行，结果写入 profile_dir 中的 .prof 文件。
+# 追踪状态按进程保存：进程池子任务内部的阶段不会汇总到界面进程，后台任务的总耗时由 JobRunner 记录。
+import contextvars
+import cProfile
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+# 每个操作保留的最近耗时样本数
+HISTORY_SIZE = 1024
+# 性能分析结果的默认目录
+PROFILE_DIR = "profiles"
+
+# 当前线程（或协程）中正在进行的 span 全名，以及是否已经在做性能分析
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span", default=None)
+_profiling: contextvars.ContextVar[bool] = contextvars.ContextVar("profiling", default=False)
+
+
+@dataclass(frozen=True)
+class OperationStats:
+    """一个操作最近 HISTORY_SIZE 次的耗时统计（秒），count 为累计次数。"""
+    name: str
+    count: int
+    p50: float
+    p99: float
+    mean: float
+    max: float
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """最近秩法求百分位数，sorted_values 必须已升序排列且非空。"""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Tracer:
+    """线程安全的耗时记录器。"""
+
+    def __init__(self, history: int = HISTORY_SIZE, profile_dir: str = PROFILE_DIR):
+        self.history = history
+        self.profile_dir = profile_dir
+        self.last_profile: Optional[str] = None
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._armed = set()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.history)
+            samples.append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def arm_profile(self, name: str):
+        """下一次名为 name（全名）的 span 运行时做一次 cProfile 分析。"""
+        with self._lock:
+            self._armed.add(name)
+
+    def _take_armed(self, name: str) -> bool:
+        with self._lock:
+            if name in self._armed:
+                self._armed.discard(name)
+                return True
+            return False
+
+    def _write_profile(self, name: str, profiler: cProfile.Profile) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        safe_name = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+        path = os.path.join(self.profile_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        profiler.dump_stats(path)
+        self.last_profile = path
+        return path
+
+    @contextmanager
+    def span(self, name: str):
+        """记录 with 块的耗时；在另一个 span 内部时名称前加上外层 span 的全名。"""
+        parent = _current_span.get()
+        full_name = f"{parent}/{name}" if parent else name
+        token = _current_span.set(full_name)
+        profiler = None
+        profiling_token = None
+        if not _profiling.get() and self._take_armed(full_name):
+            profiler = cProfile.Profile()
+            profiling_token = _profiling.set(True)
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                _profiling.reset(profiling_token)
+                self._write_profile(full_name, profiler)
+            _current_span.reset(token)
+            self.record(full_name, elapsed)
+
+    def stats(self) -> List[OperationStats]:
+        """按名称排列的各操作统计。"""
+        with self._lock:
+            snapshot = {name: (sorted(samples), self._counts[name]) for name, samples in self._samples.items()}
+        return [OperationStats(name, count, percentile(values, 0.5), percentile(values, 0.99),
+                               sum(values) / len(values), values[-1])
+                for name, (values, count) in sorted(snapshot.items())]
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+# 进程内共享的默认记录器
+tracer = Tracer()
+
+
+def span(name: str):
+    """在默认记录器上记录一个 span。"""
+    return tracer.span(name)
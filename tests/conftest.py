@@ -0,0 +1,5 @@
+# 测试从仓库根目录导入 rsa_engine，不需要先安装
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+import queue
+import random
+import threading
+from math import gcd
+
+import gmpy2
+import pytest
+import rsa
+
+from rsa_engine.attacks import wiener_attack
+from rsa_engine.jobs import JobCancelled, JobContext
+
+
+def _wiener_key(rng, bits=1024):
+    """q < p < 2q 且 d < n^(1/4) / 3 的弱密钥，返回 (e, n, p, q, d)。"""
+    half = bits // 2
+    p = int(gmpy2.next_prime(rng.getrandbits(half) | (3 << (half - 2))))
+    q = int(gmpy2.next_prime(rng.getrandbits(half) | (1 << (half - 1))))
+    n, phi_n = p * q, (p - 1) * (q - 1)
+    limit = int(gmpy2.iroot(n, 4)[0]) // 3
+    while True:
+        d = rng.randrange(limit // 2, limit) | 1
+        if gcd(d, phi_n) == 1:
+            return int(gmpy2.invert(d, phi_n)), n, p, q, d
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_wiener_recovers_small_d(seed):
+    e, n, p, q, d = _wiener_key(random.Random(seed))
+    found = wiener_attack(e, n)
+    assert found is not None
+    assert found.d == d and {found.p, found.q} == {p, q} and found.n == n
+    assert (e * d - 1) % found.k == 0 and (e * d - 1) // found.k == (p - 1) * (q - 1)
+    message = b"wiener"
+    assert rsa.decrypt(rsa.encrypt(message, rsa.PublicKey(n, e)), found.private_key(e)) == message
+
+
+def test_wiener_fails_on_normal_key():
+    pubkey, _ = rsa.newkeys(512)
+    assert wiener_attack(pubkey.e, pubkey.n) is None
+
+
+def test_wiener_reports_progress_and_cancels():
+    e, n, *_ = _wiener_key(random.Random(7))
+    progress = queue.Queue()
+    assert wiener_attack(e, n, JobContext(1, threading.Event(), progress)) is not None
+    assert progress.get_nowait()[:2] == (1, 1)  # 第一次上报不节流：(任务编号, 已检查的渐近分数个数)
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        wiener_attack(e, n, JobContext(1, cancel, progress))
@@ -0,0 +1,71 @@
+import pytest
+import rsa
+
+from rsa_engine.batch import (ESCAPED_LINE_PREFIX, decrypt_file_lines, encrypt_file_lines, encrypt_messages,
+                              line_plaintext, plaintext_line)
+
+# 反斜杠、看起来像转义序列的文本、以及以转义前缀开头的明文
+TRICKY_TEXTS = ["C:\\new", "b\\x", "\\\\", "\\n", "plain", "", "末尾反斜杠\\", "a\nb", "\r\n", "x\\ny\nz",
+                ESCAPED_LINE_PREFIX + "odd"]
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return rsa.newkeys(512)
+
+
+@pytest.mark.parametrize("text", TRICKY_TEXTS)
+def test_plaintext_line_round_trip(text):
+    line = plaintext_line(text)
+    assert "\n" not in line and "\r" not in line
+    assert line_plaintext(line) == text
+
+
+def test_lines_without_newlines_are_left_alone():
+    for text in ("C:\\new", "b\\x", "\\\\"):
+        assert plaintext_line(text) == text
+        assert line_plaintext(text) == text
+
+
+def test_file_round_trip_is_byte_exact(tmp_path, keypair):
+    pubkey, privkey = keypair
+    src = tmp_path / "plain.txt"
+    lines = ["C:\\new", "b\\x", "\\\\", "\\n", "plain", "", "末尾反斜杠\\"]
+    src.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+
+    encrypted, decrypted = tmp_path / "encrypted.txt", tmp_path / "decrypted.txt"
+    assert not encrypt_file_lines(str(src), str(encrypted), pubkey).failed
+    assert not decrypt_file_lines(str(encrypted), str(decrypted), privkey).failed
+    assert decrypted.read_bytes() == src.read_bytes()
+
+
+def test_embedded_newlines_survive_decrypt_encrypt_decrypt(tmp_path, keypair):
+    pubkey, privkey = keypair
+    messages = ["a\nb", "x\\ny\nz", "\r\n", ESCAPED_LINE_PREFIX + "odd", "C:\\new"]
+    ciphertexts = tmp_path / "ciphertexts.txt"
+    ciphertexts.write_text("".join(f"{c}\n" for c in encrypt_messages(messages, pubkey)), encoding="utf-8")
+
+    first, again, second = tmp_path / "first.txt", tmp_path / "again.txt", tmp_path / "second.txt"
+    decrypt_file_lines(str(ciphertexts), str(first), privkey)
+    out_lines = first.read_text(encoding="utf-8").split("\n")[:-1]
+    assert [line_plaintext(line) for line in out_lines] == messages
+
+    encrypt_file_lines(str(first), str(again), pubkey)
+    decrypt_file_lines(str(again), str(second), privkey)
+    assert second.read_bytes() == first.read_bytes()
+
+
+def test_non_utf8_line_is_reported_not_replaced(tmp_path, keypair):
+    pubkey, privkey = keypair
+    src = tmp_path / "plain.txt"
+    src.write_bytes(b"caf\xe9\nok\n")
+
+    encrypted, decrypted = tmp_path / "encrypted.txt", tmp_path / "decrypted.txt"
+    result = encrypt_file_lines(str(src), str(encrypted), pubkey)
+    assert [line for line, _ in result.failed] == [1]
+    assert "UTF-8" in result.failed[0][1]
+
+    result = decrypt_file_lines(str(encrypted), str(decrypted), privkey)
+    assert [line for line, _ in result.failed] == [1]
+    assert decrypted.read_bytes() == b"\nok\n"
+    assert b"\xef\xbf\xbd" not in decrypted.read_bytes()
@@ -0,0 +1,60 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from math import gcd, prod
+
+import gmpy2
+import pytest
+
+from rsa_engine.batchgcd import batch_gcd, shared_factors
+
+
+def _primes(rng, count, bits=64):
+    primes = set()
+    while len(primes) < count:
+        primes.add(int(gmpy2.next_prime(rng.getrandbits(bits) | (1 << (bits - 1)))))
+    return sorted(primes)
+
+
+def _moduli(seed, count, shared):
+    """count 个模数，其中 shared 对模数共用一个素因子。"""
+    rng = random.Random(seed)
+    primes = _primes(rng, 2 * count)
+    rng.shuffle(primes)
+    factors = [[primes[2 * i], primes[2 * i + 1]] for i in range(count)]
+    for i in range(shared):
+        factors[2 * i + 1][0] = factors[2 * i][0]
+    return [p * q for p, q in factors]
+
+
+def _naive(moduli):
+    return [gcd(n, prod(moduli[:i] + moduli[i + 1:])) for i, n in enumerate(moduli)]
+
+
+@pytest.mark.parametrize("count, shared, workers", [(2, 1, 1), (3, 0, 1), (17, 3, 1), (17, 3, 3), (64, 5, 4)])
+def test_batch_gcd_matches_pairwise(count, shared, workers):
+    moduli = _moduli(count, count, shared)
+    assert batch_gcd(moduli, workers=workers) == _naive(moduli)
+
+
+def test_batch_gcd_with_executor():
+    moduli = _moduli(7, 40, 4)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert batch_gcd(moduli, executor, workers=2) == _naive(moduli)
+
+
+def test_shared_factors_splits_moduli():
+    moduli = _moduli(11, 20, 3)
+    found = shared_factors(moduli, batch_gcd(moduli, workers=2))
+    assert sorted(item.index for item in found) == [0, 1, 2, 3, 4, 5]
+    for item in found:
+        assert item.p * item.q == item.n == moduli[item.index]
+        assert 1 < item.p < item.n
+
+
+def test_shared_factors_when_both_primes_are_shared():
+    p, q, r = _primes(random.Random(3), 3)
+    # p*q 的两个素因子都与其他模数共享，gcd 等于 n 本身，需要逐个求 gcd 才能分解
+    moduli = [p * q, p * r, q * r]
+    found = {item.index: item for item in shared_factors(moduli, batch_gcd(moduli))}
+    assert set(found) == {0, 1, 2}
+    assert all(item.p * item.q == item.n and item.p not in (1, item.n) for item in found.values())
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import rsa
+
+from rsa_engine.blockmode import (CHUNK_BLOCKS, block_capacity, decrypt_blocks, encrypt_blocks, pack_frame,
+                                  split_blocks, unpack_frame)
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return rsa.newkeys(512)
+
+
+def test_split_blocks():
+    assert split_blocks(b"", 5) == [b""]
+    assert split_blocks(b"abcdefg", 3) == [b"abc", b"def", b"g"]
+
+
+def test_frame_round_trip_and_validation():
+    frame = pack_frame(2, [b"ab", b"cd"])
+    assert unpack_frame(frame) == (2, [b"ab", b"cd"])
+    with pytest.raises(ValueError):
+        unpack_frame(frame[:-1])
+    with pytest.raises(ValueError):
+        unpack_frame(b"XXXX" + frame[4:])
+
+
+@pytest.mark.parametrize("blocks", [0, 1, 2, CHUNK_BLOCKS + 1])
+def test_block_round_trip(keypair, blocks):
+    pubkey, privkey = keypair
+    capacity = block_capacity(pubkey)
+    data = bytes(i % 251 for i in range(blocks * capacity + (7 if blocks else 0)))
+    frame = encrypt_blocks(data, pubkey)
+    assert decrypt_blocks(frame, privkey) == data
+
+
+def test_block_round_trip_with_executor(keypair):
+    pubkey, privkey = keypair
+    data = b"parallel " * 1000
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        frame = encrypt_blocks(data, pubkey, executor)
+        assert decrypt_blocks(frame, privkey, executor) == data
+
+
+def test_frame_from_another_key_size_is_rejected(keypair):
+    _, privkey = keypair
+    with pytest.raises(ValueError):
+        decrypt_blocks(pack_frame(128, [bytes(128)]), privkey)
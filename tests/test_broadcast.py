@@ -0,0 +1,48 @@
+import random
+from math import prod
+
+import pytest
+import rsa
+
+from rsa_engine.broadcast import crt, hastad_attack, product_tree
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5, 8, 13])
+def test_crt_matches_residues(count):
+    rng = random.Random(count)
+    moduli = [3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43][:count]
+    moduli = [m ** rng.randint(1, 3) for m in moduli]  # 两两互质但不一定是素数
+    x = rng.randrange(prod(moduli))
+    assert crt([x % m for m in moduli], moduli) == (x, prod(moduli))
+
+
+def test_product_tree_root_is_product():
+    values = list(range(2, 12))
+    tree = product_tree(values)
+    assert tree[0] == values and len(tree[-1]) == 1 and tree[-1][0] == prod(values)
+
+
+def test_crt_rejects_shared_factors():
+    with pytest.raises(ValueError):
+        crt([1, 2], [6, 9])
+    with pytest.raises(ValueError):
+        crt([], [])
+
+
+@pytest.fixture(scope="module")
+def moduli():
+    return [rsa.newkeys(256)[0].n for _ in range(5)]
+
+
+@pytest.mark.parametrize("e", [3, 5])
+def test_hastad_recovers_unpadded_message(moduli, e):
+    m = int.from_bytes(b"broadcast", "big")
+    m = m << (moduli[0].bit_length() - m.bit_length() - 8)  # 让 m^e 超过单个模数，必须用 CRT 合并
+    pairs = [(n, pow(m, e, n)) for n in moduli[:e]]
+    assert hastad_attack(e, pairs) == m
+    assert hastad_attack(e, pairs[:e - 1]) is None  # 密文不够时 m^e 不是完全 e 次方
+
+
+def test_hastad_single_short_message(moduli):
+    m = 12345
+    assert hastad_attack(3, [(moduli[0], pow(m, 3, moduli[0]))]) == m
@@ -0,0 +1,81 @@
+import base64
+
+import pytest
+import rsa
+
+from rsa_engine.blockmode import pack_frame
+from rsa_engine.cipher import (ciphertext_bytes, decrypt_ciphertext, detect_ciphertext_format, encrypt_bytes,
+                               format_ciphertext, parse_ciphertext)
+
+BLOCK = 64  # 512 位模数的分组字节数
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return rsa.newkeys(512)
+
+
+@pytest.mark.parametrize("text, fmt", [
+    ("12345", "decimal"),
+    (" 123\n45 ", "decimal"),
+    ("0xDEADbeef", "hex"),
+    ("deadbeef", "hex"),
+    ("q83v7w==", "base64"),
+    (base64.b64encode(pack_frame(2, [b"ab"])).decode("ascii"), "frame"),
+    (pack_frame(2, [b"ab"]), "raw"),
+    (b"\xff\x00\x01", "raw"),
+    (b"12345", "decimal"),
+])
+def test_detect_ciphertext_format(text, fmt):
+    assert detect_ciphertext_format(text) == fmt
+
+
+@pytest.mark.parametrize("text", ["", "  \n", "not a ciphertext!"])
+def test_unrecognised_ciphertext_raises(text):
+    with pytest.raises(ValueError):
+        parse_ciphertext(text)
+
+
+@pytest.mark.parametrize("text", ["0xabc", "ab cd e", "q83v7w="])
+def test_malformed_hex_and_base64_raise(text):
+    with pytest.raises(ValueError):
+        parse_ciphertext(text)
+
+
+@pytest.mark.parametrize("fmt", ["decimal", "hex", "base64", "frame"])
+@pytest.mark.parametrize("message", [b"", b"short", "中文明文".encode("utf-8"), bytes(range(256)) * 3])
+def test_format_round_trip(keypair, fmt, message):
+    pubkey, privkey = keypair
+    ciphertext = encrypt_bytes(message, pubkey)
+    text = format_ciphertext(ciphertext, fmt, BLOCK)
+    # 文本框自动换行后复制出来的密文同样可以解析
+    wrapped = "\n".join(text[i:i + 60] for i in range(0, len(text), 60))
+    for candidate in (text, wrapped):
+        parsed = parse_ciphertext(candidate)
+        assert decrypt_ciphertext(parsed, privkey) == message
+
+
+def test_raw_bytes_round_trip(keypair):
+    pubkey, privkey = keypair
+    for message in (b"x", b"y" * 500):
+        ciphertext = encrypt_bytes(message, pubkey)
+        data = ciphertext_bytes(ciphertext, BLOCK)
+        assert decrypt_ciphertext(parse_ciphertext(data), privkey) == message
+
+
+def test_small_integer_keeps_leading_zero_bytes():
+    assert ciphertext_bytes(1, 4) == b"\x00\x00\x00\x01"
+    assert parse_ciphertext(format_ciphertext(1, "hex", 4)) == 1
+    assert parse_ciphertext(format_ciphertext(1, "base64", 4)) == 1
+
+
+def test_decimal_beyond_int_string_limit():
+    value = 7 ** 20000  # 约 16900 位十进制，超过默认的 int_max_str_digits
+    assert parse_ciphertext(format_ciphertext(value, "decimal")) == value
+
+
+def test_text_formats_reject_raw():
+    with pytest.raises(ValueError):
+        format_ciphertext(1, "raw")
+    with pytest.raises(ValueError):
+        format_ciphertext(1, "frame")  # 打包单个分组需要分组字节数
@@ -0,0 +1,24 @@
+import rsa
+
+from rsa_engine.corpus import attack_corpus
+
+
+def _write_key(directory, name, n, e, ciphertexts):
+    (directory / f"{name}.pem").write_bytes(rsa.PublicKey(n, e).save_pkcs1())
+    (directory / f"{name}.txt").write_text("".join(f"{c}\n" for c in ciphertexts), encoding="utf-8")
+
+
+def test_degenerate_group_is_reported_not_raised(tmp_path):
+    n = rsa.newkeys(512)[0].n
+    m = int.from_bytes(b"common modulus", "big")
+    # 第 1 行是正常的密文；第 2 行是 c ≡ 0 (mod n) 的退化密文，合并指数时无法求模逆
+    _write_key(tmp_path, "a", n, 65537, [pow(m, 65537, n), 0])
+    _write_key(tmp_path, "b", n, 257, [pow(m, 257, n), 0])
+
+    results = attack_corpus(str(tmp_path))
+
+    assert [result.slot for result in results] == [0, 1]
+    recovered, degenerate = results
+    assert recovered.plaintext == m and recovered.reason is None
+    assert degenerate.plaintext is None and degenerate.power is None
+    assert degenerate.reason
@@ -0,0 +1,61 @@
+import queue
+import threading
+
+import pytest
+
+from rsa_engine.cyclic import cyclic_attack
+from rsa_engine.jobs import JobCancelled, JobContext
+
+E = 65537
+MESSAGE = 12345
+
+
+def _cycle_length(n, c):
+    """直接迭代求 c, c^e, c^(e^2), ... 回到 c 所需的次数。"""
+    value, steps = pow(c, E, n), 1
+    while value != c:
+        value, steps = pow(value, E, n), steps + 1
+    return steps
+
+
+def test_plain_cycle_recovers_plaintext():
+    n = 1009 * 1013
+    c = pow(MESSAGE, E, n)
+    result = cyclic_attack(n, E, c, gcd_interval=None)
+    assert result is not None and result.key is None
+    assert result.plaintext == MESSAGE
+    assert result.iterations == _cycle_length(n, c)
+
+
+@pytest.mark.parametrize("p, q", [(1009, 1013), (100003, 100019)])
+def test_generalized_cycle_factors_n(p, q):
+    n = p * q
+    c = pow(MESSAGE, E, n)
+    result = cyclic_attack(n, E, c, gcd_interval=16)
+    assert result is not None and result.plaintext == MESSAGE
+    # 序列在模 p 或模 q 下先闭合，在某个 gcd 检查点分解 n，远早于模 n 的循环
+    assert result.iterations % 16 == 0 and result.iterations < _cycle_length(n, c)
+    key = result.key
+    assert {key.p, key.q} == {p, q}
+    assert pow(c, key.d, n) == MESSAGE
+
+
+def test_gives_up_after_max_iterations():
+    n = 100003 * 100019
+    c = pow(MESSAGE, E, n)
+    assert cyclic_attack(n, E, c, max_iterations=50, gcd_interval=None) is None
+    assert cyclic_attack(n, E, c, max_iterations=50) is None  # 不足一个 gcd 间隔时最后补做一次检查
+
+
+def test_cancel_and_progress():
+    n = 10007 * 10009  # 模 n 的循环长度为 345138
+    c = pow(MESSAGE, E, n)
+    progress = queue.Queue()
+    assert cyclic_attack(n, E, c, max_iterations=1000, gcd_interval=None,
+                         ctx=JobContext(1, threading.Event(), progress)) is None
+    assert progress.get_nowait()[1:3] == (256, 1000)
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        cyclic_attack(n, E, c, gcd_interval=None, ctx=JobContext(1, cancel, progress))
@@ -0,0 +1,113 @@
+import random
+from math import prod
+
+import gmpy2
+import pytest
+
+from rsa_engine.factor import (budget_stop, divisors, ecm, factor_attack, factor_race, factorint, pollard_pm1,
+                               pollard_rho_brent, prime_range, williams_pp1)
+from rsa_engine.primes import is_probable_prime
+
+
+def _prime(rng, bits):
+    return int(gmpy2.next_prime(rng.getrandbits(bits) | (1 << (bits - 1))))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pollard_rho_splits_semiprimes(seed):
+    rng = random.Random(seed)
+    p, q = _prime(rng, 24), _prime(rng, 28)
+    d = pollard_rho_brent(p * q)
+    assert d in (p, q)
+
+
+@pytest.mark.parametrize("n", [1, 2, 97, 2 ** 20, 3 ** 5 * 7 ** 2, 1009 * 1013, 2 ** 3 * 65537 * 65537,
+                               600851475143, 999_999_000_001, (2 ** 31 - 1) * (2 ** 61 - 1)])
+def test_factorint_round_trip(n):
+    factors = factorint(n)
+    assert prod(p ** k for p, k in factors.items()) == n
+    assert all(is_probable_prime(p) for p in factors)
+
+
+def test_divisors():
+    assert divisors({2: 2, 3: 1}) == [1, 2, 3, 4, 6, 12]
+    assert divisors({}) == [1]
+
+
+def test_prime_range_matches_primality_test():
+    assert prime_range(0, 30) == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert prime_range(10_000, 10_200) == [p for p in range(10_000, 10_200) if is_probable_prime(p)]
+
+
+def _smooth_prime(rng, offset, bound=2000, bits=64, check=None):
+    """找一个素数 p，使 p - offset（offset 为 ±1）是互不相同的小于 bound 的素数之积，并满足 check(p)。"""
+    small = prime_range(3, bound)
+    while True:
+        k = 2
+        for factor in rng.sample(small, len(small)):
+            if k.bit_length() >= bits:
+                break
+            k *= factor
+        p = k + offset
+        if is_probable_prime(p) and (check is None or check(p)):
+            return p
+
+
+def _rough_prime(rng, bits=96):
+    """p - 1 和 p + 1 都有很大素因子的素数（不会被 p-1 / p+1 在小界内找到）。"""
+    while True:
+        r = _prime(rng, bits - 8)
+        for k in range(2, 256, 2):
+            p = k * r + 1
+            if is_probable_prime(p) and max(factorint(p + 1, max_steps=10_000) or {0: 1}) > 10 ** 6:
+                return p
+
+
+def test_pollard_pm1_finds_smooth_factor():
+    rng = random.Random(1)
+    p, q = _smooth_prime(rng, 1), _rough_prime(rng)
+    assert pollard_pm1(p * q, b1=1000, stop=budget_stop(10)) == p
+
+
+def test_williams_pp1_finds_smooth_factor():
+    rng = random.Random(2)
+    # 起始值 3：3² - 4 = 5 为模 p 的二次非剩余时，p + 1 光滑即可找到 p
+    p = _smooth_prime(rng, -1, check=lambda p: gmpy2.legendre(5, p) == -1)
+    q = _rough_prime(rng)
+    assert williams_pp1(p * q, b1=1000, seeds=(3,), stop=budget_stop(10)) == p
+
+
+def test_ecm_finds_small_factor():
+    rng = random.Random(3)
+    p, q = _prime(rng, 40), _prime(rng, 100)
+    assert ecm(p * q, stop=budget_stop(20), rng=random.Random(4)) == p
+
+
+def test_factor_race_serial_and_factor_attack():
+    rng = random.Random(5)
+    p, q = _smooth_prime(rng, 1, bits=256), _rough_prime(rng, 256)
+    n, e = p * q, 65537
+    method, factor = factor_race(n, budgets={"Pollard p-1": 10})
+    assert (method, factor) == ("Pollard p-1", p)
+
+    found = factor_attack(e, n, budget=1)  # 依次尝试：Pollard rho 用完预算后由 p-1 找到因子
+    assert found is not None
+    key = found[1]
+    assert (key.p, key.q) == (min(p, q), max(p, q))
+    assert e * key.d % ((p - 1) * (q - 1)) == 1
+
+
+def test_factor_attack_perfect_square():
+    p, e = int(gmpy2.next_prime(2 ** 200)), 65537
+    found = factor_attack(e, p * p, budget=1)
+    assert found is not None
+    key = found[1]
+    assert key.p == key.q == p
+    assert e * key.d % (p * (p - 1)) == 1
+    message = 123456789
+    assert pow(pow(message, e, p * p), key.d, p * p) == message
+
+
+def test_factor_race_rejects_primes():
+    with pytest.raises(ValueError):
+        factor_race(2 ** 61 - 1)
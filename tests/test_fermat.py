@@ -0,0 +1,33 @@
+import random
+
+import gmpy2
+import pytest
+
+from rsa_engine.fermat import fermat_attack, fermat_factor
+from rsa_engine.primes import is_probable_prime
+
+
+@pytest.mark.parametrize("bits, gap_bits", [(512, 8), (512, 130), (1024, 250), (1024, 268)])
+def test_close_primes(bits, gap_bits):
+    rng = random.Random(bits + gap_bits)
+    p = int(gmpy2.next_prime(rng.getrandbits(bits // 2) | (1 << (bits // 2 - 1))))
+    q = int(gmpy2.next_prime(p + rng.getrandbits(gap_bits)))
+    assert fermat_factor(p * q, budget=10) == (p, q)
+
+
+def test_small_numbers_match_trial_division():
+    for n in range(4, 500):
+        found = fermat_factor(n, budget=1)
+        if is_probable_prime(n):
+            assert found is None
+        else:
+            p, q = found
+            assert 1 < p <= q < n and p * q == n
+
+
+def test_fermat_attack_recovers_private_exponent():
+    p = int(gmpy2.next_prime(2 ** 255 + 12345))
+    q = int(gmpy2.next_prime(p + 2 ** 100))
+    key = fermat_attack(65537, p * q, budget=10)
+    assert (key.p, key.q) == (p, q)
+    assert 65537 * key.d % ((p - 1) * (q - 1)) == 1
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+import rsa
+from cryptography.exceptions import InvalidTag
+
+from rsa_engine.hybrid import HYBRID_HEADER, TAG_SIZE, decrypt_file, encrypt_file, session_key_size
+
+# 小分块，几百字节的文件就能覆盖多个分块
+CHUNK_SIZE = 64
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return rsa.newkeys(512)
+
+
+@pytest.fixture
+def encrypted(tmp_path, keypair):
+    """加密 3 个整块加 5 字节的随机内容，返回 (明文, 密文路径, 文件头长度)。"""
+    plaintext = os.urandom(3 * CHUNK_SIZE + 5)
+    src, dst = tmp_path / "plain.bin", tmp_path / "plain.bin.rsae"
+    src.write_bytes(plaintext)
+    encrypt_file(str(src), str(dst), keypair[0], CHUNK_SIZE)
+    return plaintext, dst, len(dst.read_bytes()) - (4 * TAG_SIZE + len(plaintext))
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE, 3 * CHUNK_SIZE + 5])
+def test_round_trip(tmp_path, keypair, size):
+    plaintext = os.urandom(size)
+    src, encrypted, decrypted = tmp_path / "plain.bin", tmp_path / "plain.rsae", tmp_path / "out.bin"
+    src.write_bytes(plaintext)
+    assert encrypt_file(str(src), str(encrypted), keypair[0], CHUNK_SIZE) == encrypted.stat().st_size
+    assert decrypt_file(str(encrypted), str(decrypted), keypair[1]) == size
+    assert decrypted.read_bytes() == plaintext
+
+
+def _assert_rejected(path, privkey, errors=(InvalidTag,)):
+    out = str(path) + ".out"
+    with pytest.raises(errors):
+        decrypt_file(str(path), out, privkey)
+    # 认证失败时不留下明文或临时文件
+    assert not os.path.exists(out) and not os.path.exists(out + ".part")
+
+
+@pytest.mark.parametrize("where", ["nonce_prefix", "first_chunk", "last_tag"])
+def test_tampered_file_is_rejected(keypair, encrypted, where):
+    _, path, header_size = encrypted
+    data = bytearray(path.read_bytes())
+    position = {"nonce_prefix": HYBRID_HEADER.size - 1, "first_chunk": header_size, "last_tag": len(data) - 1}[where]
+    data[position] ^= 1
+    path.write_bytes(bytes(data))
+    _assert_rejected(path, keypair[1])
+
+
+def test_reordered_chunks_are_rejected(keypair, encrypted):
+    _, path, header_size = encrypted
+    data = path.read_bytes()
+    sealed = CHUNK_SIZE + TAG_SIZE
+    first, second = data[header_size:header_size + sealed], data[header_size + sealed:header_size + 2 * sealed]
+    path.write_bytes(data[:header_size] + second + first + data[header_size + 2 * sealed:])
+    _assert_rejected(path, keypair[1])
+
+
+@pytest.mark.parametrize("cut", ["last_chunk", "partial_tag"])
+def test_truncated_file_is_rejected(keypair, encrypted, cut):
+    _, path, _ = encrypted
+    data = path.read_bytes()
+    # 正好去掉最后一块时，剩下的都是完整分块，只能靠“是否最后一块”的附加数据发现
+    path.write_bytes(data[:-(5 + TAG_SIZE)] if cut == "last_chunk" else data[:-3])
+    _assert_rejected(path, keypair[1])
+
+
+def test_wrong_key_and_foreign_file_are_rejected(tmp_path, encrypted):
+    _, path, _ = encrypted
+    _assert_rejected(path, rsa.newkeys(512)[1], (rsa.DecryptionError,))
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"not a hybrid file")
+    _assert_rejected(foreign, rsa.newkeys(512)[1], (ValueError,))
+
+
+def test_session_key_size():
+    assert session_key_size(rsa.newkeys(512)[0]) == 32
+    assert session_key_size(rsa.PublicKey(2 ** 255 + 1, 65537)) == 16
+    with pytest.raises(ValueError):
+        session_key_size(rsa.PublicKey(2 ** 127 + 1, 65537))
@@ -0,0 +1,59 @@
+import time
+
+from rsa_engine.jobs import JobRunner
+
+
+def _value(value, ctx=None):
+    return value
+
+
+def _fail(ctx=None):
+    raise ValueError("任务失败")
+
+
+def _poll_until_idle(runner, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while runner.poll() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_failing_callback_does_not_skip_other_jobs():
+    runner = JobRunner(max_workers=2)
+    done, errors = [], []
+
+    def broken(result):
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    try:
+        first = runner.submit(_value, 1, on_done=broken, on_error=errors.append)
+        second = runner.submit(_value, 2, on_done=done.append, on_error=errors.append)
+        third = runner.submit(_fail, on_error=errors.append)
+        for job in (first, second, third):
+            job.future.exception(timeout=5)
+        _poll_until_idle(runner)
+    finally:
+        runner.shutdown()
+
+    assert done == [2]
+    assert sorted(type(exc).__name__ for exc in errors) == ["UnicodeDecodeError", "ValueError"]
+    assert (first.status, second.status, third.status) == ("failed", "done", "failed")
+
+
+def test_failing_error_callback_is_contained(capsys):
+    runner = JobRunner(max_workers=1)
+    done = []
+
+    def broken(exc):
+        raise RuntimeError("弹窗失败")
+
+    try:
+        failed = runner.submit(_fail, on_error=broken)
+        failed.future.exception(timeout=5)
+        ok = runner.submit(_value, 3, on_done=done.append)
+        ok.future.result(timeout=5)
+        _poll_until_idle(runner)
+    finally:
+        runner.shutdown()
+
+    assert done == [3]
+    assert "RuntimeError" in capsys.readouterr().err
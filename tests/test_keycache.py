@@ -0,0 +1,49 @@
+import os
+
+import pytest
+import rsa
+
+from rsa_engine.keycache import CachedPrivateKey, KeyCache, cached_private_key
+
+
+@pytest.fixture(scope="module")
+def keypair():
+    return rsa.newkeys(512)
+
+
+def test_crt_decrypt_matches_rsa(keypair):
+    pubkey, privkey = keypair
+    key = CachedPrivateKey(privkey)
+    for size in (0, 1, 17, 53):
+        message = os.urandom(size)
+        ciphertext = rsa.encrypt(message, pubkey)
+        assert key.decrypt(ciphertext) == message
+        assert key.decrypt(int.from_bytes(ciphertext, "big")) == message
+
+
+def test_blinding_does_not_change_the_result(keypair):
+    _, privkey = keypair
+    key = CachedPrivateKey(privkey)
+    # 盲化因子每次解密都会更新，原始 RSA 结果必须始终等于 c^d mod n
+    for c in (2, 3, privkey.n - 1, 123456789):
+        for _ in range(3):
+            assert key.decrypt_int(c) == pow(c, privkey.d, privkey.n)
+
+
+def test_invalid_ciphertexts_raise_decryption_error(keypair):
+    pubkey, privkey = keypair
+    key = CachedPrivateKey(privkey)
+    for bad in (privkey.n, b"\x01" * 65, 12345):
+        with pytest.raises(rsa.DecryptionError):
+            key.decrypt(bad)
+
+
+def test_key_cache_reuses_parsed_keys(keypair):
+    _, privkey = keypair
+    pem = privkey.save_pkcs1()
+    cache = KeyCache(maxsize=1)
+    first = cache.get_private(pem)
+    assert cache.get_private(pem.decode("ascii") + "\n") is first  # 首尾空白不影响指纹
+    cache.get_private(rsa.newkeys(512)[1].save_pkcs1())
+    assert cache.get_private(pem) is not first  # 超出容量后被淘汰
+    assert cached_private_key(privkey) is cached_private_key(rsa.PrivateKey.load_pkcs1(pem))
@@ -0,0 +1,56 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+import rsa
+
+from rsa_engine.jobs import JobCancelled, JobContext
+from rsa_engine.keys import find_primes_parallel, generate_keypair, generate_keypair_parallel, split_prime_bits
+from rsa_engine.primes import is_probable_prime
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor, manager
+
+
+def test_generate_keypair():
+    pubkey, privkey = generate_keypair(256, ctx=JobContext(1, threading.Event(), queue.Queue()))
+    assert pubkey.n.bit_length() == 256 and pubkey.e == 65537
+    assert privkey.p * privkey.q == pubkey.n
+    assert (privkey.p.bit_length(), privkey.q.bit_length()) in (split_prime_bits(256), split_prime_bits(256)[::-1])
+
+
+def test_generate_keypair_cancelled():
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        generate_keypair(256, ctx=JobContext(1, cancel, queue.Queue()))
+
+
+@pytest.mark.parametrize("kind", ["normal", "strong"])
+def test_find_primes_parallel(pool, kind):
+    executor, manager = pool
+    primes = find_primes_parallel((128, 136), executor, manager, workers=2, kind=kind)
+    assert [p.bit_length() for p in primes] == [128, 136]
+    assert all(is_probable_prime(p) for p in primes)
+
+
+def test_generate_keypair_parallel(pool):
+    executor, manager = pool
+    pubkey, privkey = generate_keypair_parallel(512, executor, manager, workers=2)
+    assert pubkey.n.bit_length() == 512 and privkey.p * privkey.q == pubkey.n
+    assert rsa.decrypt(rsa.encrypt(b"parallel", pubkey), privkey) == b"parallel"
+
+
+def test_generate_keypair_parallel_cancelled(pool):
+    executor, manager = pool
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        generate_keypair_parallel(2048, executor, manager, workers=2, ctx=JobContext(1, cancel, queue.Queue()))
+    # 取消后进程池中的子任务都已停止，仍然可以继续使用
+    assert len(find_primes_parallel((64,), executor, manager, workers=2)) == 1
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+import rsa
+
+from rsa_engine.keystore import KeyStore, der_integers, key_fingerprint
+
+
+@pytest.fixture(scope="module")
+def keypairs():
+    return [rsa.newkeys(512) for _ in range(3)]
+
+
+def test_der_integers_matches_pkcs1(keypairs):
+    pubkey, privkey = keypairs[0]
+    assert der_integers(pubkey.save_pkcs1("DER")) == [pubkey.n, pubkey.e]
+    values = der_integers(privkey.save_pkcs1("DER"))
+    assert values == [0, privkey.n, privkey.e, privkey.d, privkey.p, privkey.q,
+                      privkey.exp1, privkey.exp2, privkey.coef]
+
+
+def test_der_integers_long_form_lengths_and_signs():
+    # 0x80 需要前导 0 才是正数；200 字节的整数使用长格式长度（0x81 0xC8）
+    big = int.from_bytes(b"\x7f" + b"\x01" * 199, "big")
+    blob = bytes([0x02, 0x02, 0x00, 0x80, 0x02, 0x01, 0xff, 0x02, 0x81, 0xc8]) + big.to_bytes(200, "big")
+    assert der_integers(bytes([0x30, 0x81, len(blob)]) + blob) == [128, -1, big]
+    with pytest.raises(ValueError):
+        der_integers(b"\x04\x00")
+
+
+def test_append_and_reload(tmp_path, keypairs):
+    path = str(tmp_path / "keystore.dat")
+    store = KeyStore(path)
+    entries = [store.add(pub, priv, f"key {i}") for i, (pub, priv) in enumerate(keypairs[:2])]
+    public_only = store.add(keypairs[2][0])
+    assert store.add(*keypairs[0]) is entries[0]  # 重复的密钥不再追加
+    store.close()
+
+    reopened = KeyStore(path)
+    assert len(reopened) == 3
+    for entry, (pubkey, privkey) in zip(entries, keypairs):
+        assert entry.fingerprint == key_fingerprint(pubkey)
+        assert reopened.get(entry.fingerprint[:12]) == (pubkey, privkey)
+    assert reopened.get(public_only.fingerprint) == (keypairs[2][0], None)
+    assert [entry.label for entry in reopened.search("key 1")] == ["key 1"]
+
+    # 只有公钥的记录之后补上私钥：追加新记录，索引指向新的那条
+    upgraded = reopened.add(*keypairs[2])
+    assert upgraded.has_private
+    reopened.close()
+    assert KeyStore(path).get(public_only.fingerprint) == keypairs[2]
+
+
+def test_truncated_tail_is_discarded(tmp_path, keypairs):
+    path = str(tmp_path / "keystore.dat")
+    store = KeyStore(path)
+    first = store.add(*keypairs[0])
+    size = os.path.getsize(path)
+    second = store.add(*keypairs[1])
+    store.close()
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)  # 第二条记录写到一半中断
+
+    store = KeyStore(path)
+    assert len(store) == 1 and os.path.getsize(path) == size
+    assert store.add(*keypairs[1]).fingerprint == second.fingerprint
+    assert len(store) == 2
+    store.close()
+    reopened = KeyStore(path)
+    assert reopened.get(first.fingerprint) == keypairs[0]
+    assert reopened.get(second.fingerprint) == keypairs[1]
+
+
+def test_unknown_or_ambiguous_prefix(tmp_path, keypairs):
+    store = KeyStore(str(tmp_path / "keystore.dat"))
+    for pub, priv in keypairs:
+        store.add(pub, priv)
+    with pytest.raises(KeyError):
+        store.get("zz")
+    with pytest.raises(KeyError):
+        store.resolve("")  # 空前缀匹配所有密钥
+    store.close()
@@ -0,0 +1,93 @@
+import json
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from math import gcd
+
+import gmpy2
+import pytest
+
+from rsa_engine.ksearch import CHECKPOINT_VERSION, cycle_attack, cycle_attack_parallel, load_checkpoint, \
+    save_checkpoint
+
+# 每个子任务 50 个 k，检查点的水位线按 50 推进
+RANGE_SIZE = 50
+
+
+@pytest.fixture(scope="module")
+def weak_key():
+    """d 很小的密钥：循环攻击在 k = d 时找到 φ(n)。返回 (e, n, d)。"""
+    p, q = int(gmpy2.next_prime(3 << 30)), int(gmpy2.next_prime(5 << 30))
+    phi_n = (p - 1) * (q - 1)
+    d = next(d for d in range(301, phi_n, 2) if gcd(d, phi_n) == 1)
+    return int(gmpy2.invert(d, phi_n)), p * q, d
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with multiprocessing.Manager() as manager, ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor, manager
+
+
+def _search(pool, e, n, bound, checkpoint):
+    executor, manager = pool
+    return cycle_attack_parallel(e, n, executor, manager, bound, workers=2, checkpoint=str(checkpoint),
+                                 range_size=RANGE_SIZE)
+
+
+def _next_k(checkpoint):
+    return json.loads(checkpoint.read_text(encoding="utf-8"))["next_k"]
+
+
+def test_cycle_attack_finds_small_d(weak_key):
+    e, n, d = weak_key
+    assert cycle_attack(e, n, d) is None
+    found = cycle_attack(e, n, d + 1)
+    assert found is not None and found.k == d and found.n == n
+
+
+def test_watermark_resume_and_cleanup(tmp_path, pool, weak_key):
+    e, n, d = weak_key
+    checkpoint = tmp_path / "cycle.json"
+
+    # 搜索完 [first_k, bound) 仍未找到：水位线推进到 bound
+    assert _search(pool, e, n, 200, checkpoint) is None
+    assert _next_k(checkpoint) == 200
+
+    # 从检查点继续：提高上限后找到结果，并删除检查点
+    found = _search(pool, e, n, 400, checkpoint)
+    assert found is not None and found.k == d
+    assert not checkpoint.exists()
+
+
+def test_resume_skips_searched_range(tmp_path, pool, weak_key):
+    e, n, d = weak_key
+    checkpoint = tmp_path / "cycle.json"
+    # 检查点声称 d 之前（含 d）都已搜索过，继续搜索时不会再找到它
+    save_checkpoint(str(checkpoint), e, n, d + 1)
+    assert _search(pool, e, n, d + 1 + 2 * RANGE_SIZE, checkpoint) is None
+    assert _next_k(checkpoint) == d + 1 + 2 * RANGE_SIZE
+
+
+def test_checkpoint_for_other_key_is_ignored(tmp_path, weak_key):
+    e, n, _ = weak_key
+    checkpoint = tmp_path / "cycle.json"
+    save_checkpoint(str(checkpoint), e, n, 1234)
+    assert load_checkpoint(str(checkpoint), e, n) == 1234
+    assert load_checkpoint(str(checkpoint), e + 2, n) == 1
+    assert load_checkpoint(str(checkpoint), e, n + 2) == 1
+    assert load_checkpoint(None, e, n) == load_checkpoint(str(tmp_path / "missing.json"), e, n) == 1
+
+    for content in ("{broken", json.dumps({"version": CHECKPOINT_VERSION + 1, "e": str(e), "n": str(n),
+                                            "next_k": 1234}), json.dumps({"version": CHECKPOINT_VERSION})):
+        checkpoint.write_text(content, encoding="utf-8")
+        assert load_checkpoint(str(checkpoint), e, n) == 1
+
+
+def test_checkpoint_for_other_key_restarts_search(tmp_path, pool, weak_key):
+    e, n, d = weak_key
+    checkpoint = tmp_path / "cycle.json"
+    # 其他 n 的检查点即使已经越过 d 也不影响这次搜索
+    save_checkpoint(str(checkpoint), e, n + 2, d + 1)
+    found = _search(pool, e, n, d + 1, checkpoint)
+    assert found is not None and found.k == d
+    assert not checkpoint.exists()
@@ -0,0 +1,74 @@
+import gmpy2
+import pytest
+
+from rsa_engine.primes import (SMALL_PRIMES, check_prime_pair, find_prime, find_safe_prime, find_strong_prime,
+                               generate_prime, is_probable_prime, random_odd, sieve_window)
+
+
+def _sieve(limit):
+    flags = bytearray(b"\x01") * limit
+    flags[:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if flags[i]:
+            flags[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return flags
+
+
+def test_is_probable_prime_matches_sieve():
+    # 同时覆盖查表（< SMALL_PRIME_LIMIT）和费马 + Miller–Rabin 两条路径
+    flags = _sieve(40_000)
+    assert [n for n in range(40_000) if is_probable_prime(n)] == [n for n in range(40_000) if flags[n]]
+
+
+@pytest.mark.parametrize("n", [561, 41041, 825265, 321197185, 5394826801, 232250619601])
+def test_carmichael_numbers_are_composite(n):
+    assert not is_probable_prime(n)
+
+
+def test_large_known_values():
+    assert is_probable_prime(2 ** 127 - 1)
+    assert not is_probable_prime(2 ** 127 + 1)
+    assert not is_probable_prime((2 ** 61 - 1) * (2 ** 89 - 1))
+
+
+@pytest.mark.parametrize("safe", [False, True])
+def test_sieve_window_only_removes_small_factors(safe):
+    start = random_odd(96)
+    survivors = set(sieve_window(start, safe=safe))
+    for i in range(2048):
+        candidates = [start + 2 * i] + ([2 * (start + 2 * i) + 1] if safe else [])
+        has_small_factor = any(c % p == 0 for c in candidates for p in SMALL_PRIMES)
+        assert (i in survivors) == (not has_small_factor)
+
+
+@pytest.mark.parametrize("bits", [64, 256])
+def test_find_prime(bits):
+    p = find_prime(bits)
+    assert p.bit_length() == bits and p >> (bits - 2) == 3 and is_probable_prime(p)
+
+
+def test_find_safe_prime():
+    p = find_safe_prime(96)
+    assert p.bit_length() == 96 and gmpy2.is_prime(p) and gmpy2.is_prime((p - 1) // 2)
+
+
+def test_find_strong_prime():
+    p = find_strong_prime(128)
+    assert p.bit_length() == 128 and is_probable_prime(p)
+    with pytest.raises(ValueError):
+        find_strong_prime(32)
+
+
+def test_generate_prime_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        generate_prime(64, "weird")
+
+
+def test_check_prime_pair():
+    p, q = 2 ** 127 - 1, int(gmpy2.next_prime(3 << 126))
+    assert check_prime_pair(p, q, 65537, p * q) == []
+    assert check_prime_pair(p * 3, q) == ["p 不是素数"]
+    assert "p 和 q 不能相等" in check_prime_pair(p, p)
+    assert check_prime_pair(p, q, n=p * q + 2) == ["p 和 q 的乘积必须等于 n"]
+    assert check_prime_pair(p, q, e=3) == ["e 必须与 φ(n) 互质"]  # 2^127 - 2 可以被 3 整除
+    assert check_prime_pair(p, int(gmpy2.next_prime(p + 1000))) == ["p 和 q 过于接近，容易被费马分解"]
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from rsa_engine.tracing import Tracer, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 1.0) == 100
+    assert percentile(values, 0.0) == 1
+    assert percentile([7.0], 0.99) == 7
+
+
+def test_stats_keep_recent_history():
+    tracer = Tracer(history=4)
+    for seconds in (10, 1, 2, 3, 4, 5):
+        tracer.record("op", float(seconds))
+    [stats] = tracer.stats()
+    # 只保留最近 4 个样本，累计次数不受影响
+    assert (stats.name, stats.count) == ("op", 6)
+    assert (stats.p50, stats.p99, stats.mean, stats.max) == (3, 5, 3.5, 5)
+    tracer.reset()
+    assert tracer.stats() == []
+
+
+def test_nested_spans_and_errors():
+    tracer = Tracer()
+    with tracer.span("加密"):
+        with tracer.span("pad"):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.span("模幂"):
+                raise ValueError("失败的阶段也会记录")
+    with tracer.span("pad"):
+        pass
+    assert {s.name: s.count for s in tracer.stats()} == {"加密": 1, "加密/pad": 1, "加密/模幂": 1, "pad": 1}
+    outer = next(s for s in tracer.stats() if s.name == "加密")
+    assert outer.max >= sum(s.max for s in tracer.stats() if s.name.startswith("加密/"))
+
+
+def test_spans_in_threads_and_tasks_do_not_nest():
+    tracer = Tracer()
+
+    def work():
+        with tracer.span("线程"):
+            pass
+
+    async def task(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(task("a"), task("b"))
+
+    with tracer.span("外层"):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    asyncio.run(main())
+    # 新线程和 asyncio 任务各自有独立的上下文，并发的 span 不会互相嵌套
+    assert sorted(s.name for s in tracer.stats()) == ["a", "b", "外层", "线程"]
+
+
+def test_armed_span_is_profiled_once(tmp_path):
+    tracer = Tracer(profile_dir=str(tmp_path))
+    tracer.arm_profile("解密")
+    tracer.arm_profile("解密/unpad")  # 已经在分析外层 span 时，内层不再单独分析
+    with tracer.span("解密"):
+        with tracer.span("unpad"):
+            sum(range(1000))
+    assert os.listdir(tmp_path) == [os.path.basename(tracer.last_profile)]
+    assert tracer.last_profile.endswith(".prof") and os.path.getsize(tracer.last_profile) > 0
+
+    with tracer.span("解密"):
+        pass
+    assert len(os.listdir(tmp_path)) == 1